@@ -0,0 +1,57 @@
+# app/api/routes_activity_api.py
+"""
+Rule Activity API
+-----------------
+Answers "which rules are active" questions from the in-memory activity index
+built over persisted rule events (no per-request database scans; one stamp
+query per request picks up events written by generation jobs).
+"""
+
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.services.activity_index import activity_index
+
+router = APIRouter(prefix="/api/activity", tags=["activity"])
+
+
+def _summary(rows):
+    return {
+        "rules": sorted({r["rule_id"] for r in rows if r["rule_id"]}),
+        "count": len(rows),
+        "events": rows,
+    }
+
+
+@router.get("/active")
+def active_on(on: date, provider: Optional[str] = None, db: Session = Depends(get_db)):
+    """Rules with an event interval containing the given date."""
+    activity_index.refresh(db)
+    return {"date": on.isoformat(), **_summary(activity_index.active_on(on, provider=provider))}
+
+
+@router.get("/between")
+def active_between(start_date: date, end_date: date, provider: Optional[str] = None, db: Session = Depends(get_db)):
+    """Rules with an event interval overlapping [start_date, end_date]."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be >= start_date")
+    activity_index.refresh(db)
+    rows = activity_index.active_between(start_date, end_date, provider=provider)
+    return {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(), **_summary(rows)}
+
+
+@router.get("/next")
+def next_activation(after: date, provider: Optional[str] = None, db: Session = Depends(get_db)):
+    """Rules whose next event starts soonest after the given date."""
+    activity_index.refresh(db)
+    rows = activity_index.next_activation(after, provider=provider)
+    return {"after": after.isoformat(), "date": rows[0]["start_date"] if rows else None, **_summary(rows)}
+
+
+@router.post("/reload")
+def reload_index(db: Session = Depends(get_db)):
+    """Rebuild the index from the database (e.g. after out-of-process writes)."""
+    return {"intervals": activity_index.load(db)}
@@ -0,0 +1,96 @@
+# backend/app/api/routes_astro_api.py
+"""
+Astro API
+---------
+Raw sky queries that are not tied to stored rules: the aspect grid (every
+active aspect between every planet pair over a date range) and the ingress /
+station calendar (sign and nakshatra ingresses, retrograde and direct stations).
+"""
+
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.services.aspect_grid import aspect_grid
+from app.core.services.astro_calendar import astro_calendars, build_from_params
+from app.core.common.logger import setup_logger
+from app.core.common.config import settings
+
+logger = setup_logger(settings.log_level)
+
+router = APIRouter(prefix="/api/astro", tags=["astro"])
+
+
+@router.get("/aspects", summary="Every active aspect over a date range")
+def get_aspect_grid(
+    start_date: date,
+    end_date: date,
+    planets: Optional[List[str]] = Query(default=None, description="Planets to include (default: all)"),
+    aspects: Optional[List[str]] = Query(default=None, description="Relation names, e.g. trine_with (default: all)"),
+    orb: float = Query(default=5.0, gt=0, description="Orb in degrees"),
+    provider: Optional[str] = None,
+    exchange: Optional[str] = None,
+):
+    """
+    Aspects between every pair of planets, one entry per stretch of consecutive
+    days in orb, with the day closest to exact. Computed from one all-pairs
+    distance matrix over the range.
+    """
+    try:
+        return aspect_grid(start_date, end_date, planets=planets, aspects=aspects, orb=orb,
+                           provider=provider, exchange=exchange)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Aspect grid failed")
+        raise HTTPException(status_code=500, detail=f"Aspect grid failed: {e}")
+
+
+class CalendarBuildRequest(BaseModel):
+    start_date: Optional[str] = Field(default=None, description="First day (default settings.calendar_start_date)")
+    end_date: Optional[str] = Field(default=None, description="Last day (default settings.calendar_end_date)")
+    provider: Optional[str] = Field(default=None, description="Astro provider (default settings.provider_type)")
+    planets: Optional[List[str]] = Field(default=None, description="Planets to build (default: all)")
+
+    model_config = {"extra": "ignore"}
+
+
+@router.post("/calendar", summary="Build (or rebuild) the ingress / station calendar")
+def build_calendar(req: CalendarBuildRequest, db: Session = Depends(get_db)):
+    """
+    Root-find every sign / nakshatra ingress and retrograde station over the span
+    and store it; rule evaluation then answers sign, nakshatra and retrograde
+    checks from it. Long spans belong in POST /jobs/build_calendar.
+    """
+    try:
+        return build_from_params(db, req.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/calendar", summary="Ingresses and stations over a date range")
+def get_calendar(
+    start_date: date,
+    end_date: date,
+    planets: Optional[List[str]] = Query(default=None, description="Planets (default: all in the calendar)"),
+    kinds: Optional[List[str]] = Query(default=None, description="sign | nakshatra | station (default: all)"),
+    provider: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Every ingress and station in [start_date, end_date] from the stored calendar, in time order."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be >= start_date")
+    provider = provider or settings.provider_type
+    astro_calendars.refresh(db)
+    try:
+        events = astro_calendars.events(provider, start_date, end_date, planets=planets, kinds=kinds)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=f"{e}; build it with POST /api/astro/calendar")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(), "provider": provider,
+            "count": len(events), "events": events}
+
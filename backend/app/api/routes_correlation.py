@@ -6,12 +6,19 @@ Runs statistical correlation checks between evaluated astro-rule events
 and subsequent market movements.
 """
 
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.core.db.db import get_db
+from app.core.services import correlation_cache
 from app.core.services.evaluation_service import evaluate_rules_for_range
 from app.core.analysis.correlation_analyzer import analyze_correlation
+from app.core.analysis.parameter_sweep import sweep_from_params
+from app.core.analysis.rule_mining import mine_from_params
+from app.core.market.trading_calendar import get_trading_calendar
 from app.core.common.schemas import CorrelationResult
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.core.common.logger import setup_logger
 from app.core.common.config import settings
 
@@ -25,20 +32,115 @@ class CorrelationRequest(BaseModel):
     end_date: str = Field(..., description="End date in YYYY-MM-DD format")
     ticker: Optional[str] = Field(default=settings.default_sector_ticker)
     lookahead_days: List[int] = Field(default=[1, 3, 5])
+    horizon_unit: Optional[str] = Field(default=None, description="Horizon unit: trading | calendar")
+    trading_days_only: Optional[bool] = Field(default=None, description="Evaluate rules on the ticker's trading days only")
+    detail: str = Field(default="full", description="Per-event records: full | sample | summary (stats only)")
+    sample_size: int = Field(default=20, ge=1, description="Records per rule when detail=sample")
+    use_cache: bool = Field(default=True, description="Answer from / store into the correlation result cache")
 
     model_config = {"extra": "ignore"}
 
 
+class SweepRequest(BaseModel):
+    template: Dict[str, Any] = Field(..., description="Swept condition: planet, relation (name), target, orb, value, "
+                                                      "effect, plus optional fixed 'conditions'")
+    grid: Dict[str, List[Any]] = Field(default_factory=dict, description="orbs / angles / targets to combine")
+    start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    ticker: Optional[str] = Field(default=settings.default_sector_ticker)
+    horizons: List[int] = Field(default=[1, 3, 5])
+    horizon_unit: Optional[str] = Field(default=None, description="Horizon unit: trading | calendar")
+    trading_days_only: Optional[bool] = Field(default=None, description="Evaluate on the ticker's trading days only")
+    provider: Optional[str] = Field(default=None, description="Astro provider (default settings.provider_type)")
+    workers: Optional[int] = Field(default=None, description="Worker processes (default settings.sweep_workers)")
+
+    model_config = {"extra": "ignore"}
+
+
+@router.post("/sweep")
+def run_parameter_sweep(req: SweepRequest):
+    """
+    Correlation stats for every combination of a rule template's parameter grid
+    (orbs x angles x targets) and horizons, in one pass over shared longitude and
+    forward-return arrays. For large grids prefer POST /jobs/sweep.
+    """
+    try:
+        return sweep_from_params(req.model_dump())
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Parameter sweep failed")
+        raise HTTPException(status_code=500, detail=f"Sweep failed: {e}")
+
+
+class MiningRequest(BaseModel):
+    start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    ticker: Optional[str] = Field(default=settings.default_sector_ticker)
+    horizons: List[int] = Field(default=[1, 3, 5])
+    horizon_unit: Optional[str] = Field(default=None, description="Horizon unit: trading | calendar")
+    trading_days_only: Optional[bool] = Field(default=None, description="Evaluate on the ticker's trading days only")
+    provider: Optional[str] = Field(default=None, description="Astro provider (default settings.provider_type)")
+    planets: Optional[List[str]] = Field(default=None, description="Planets to combine (default: all)")
+    relations: Optional[List[str]] = Field(default=None, description="Relation names to enumerate (default: all "
+                                                                     "without a value parameter)")
+    orb: Optional[float] = Field(default=None, gt=0, description="Orb of angular relations (default 5)")
+    min_days: Optional[int] = Field(default=None, ge=1, description="Fewest active days of a candidate (default 30)")
+    pair_pool: Optional[int] = Field(default=None, ge=0, description="Strongest singles combined into pairs (default 300)")
+    top: Optional[int] = Field(default=None, ge=1, description="Candidates returned (default 50)")
+    rank_horizon: Optional[int] = Field(default=None, description="Horizon ranked on (default: first horizon)")
+    workers: Optional[int] = Field(default=None, description="Worker processes (default settings.mining_workers)")
+
+    model_config = {"extra": "ignore"}
+
+
+@router.post("/mine")
+def run_rule_mining(req: MiningRequest):
+    """
+    Enumerate single- and two-condition candidate rules (planet pairs x angular
+    relations, planets x signs / nakshatra owners / retrograde / combust) and rank
+    them by the significance of their directional excess return. Full 40-year
+    searches belong in POST /jobs/mine_rules.
+    """
+    try:
+        return mine_from_params(req.model_dump())
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Rule mining failed")
+        raise HTTPException(status_code=500, detail=f"Rule mining failed: {e}")
+
+
 @router.post("/run", response_model=CorrelationResult)
-def run_correlation(req: CorrelationRequest):
+def run_correlation(req: CorrelationRequest, db: Session = Depends(get_db)):
     """
     Execute correlation analysis:
     - Evaluate rules for given date range
     - Fetch market data for ticker
     - Compute per-rule and aggregate post-event returns
+    Identical runs (same rules, range, ticker, horizons and market data) are served from the result cache.
     """
+    cache_key = None
+    if req.use_cache and settings.correlation_cache_enabled:
+        try:
+            cache_key = correlation_cache.correlation_cache_key(db, req.model_dump())
+            cached = correlation_cache.get_cached_result(db, cache_key)
+        except Exception:
+            logger.exception("Correlation cache lookup failed")
+            cache_key, cached = None, None
+        if cached is not None:
+            return CorrelationResult(**cached)
+
     try:
-        events = evaluate_rules_for_range(req.start_date, req.end_date)
+        calendar = None
+        if req.trading_days_only:
+            calendar = get_trading_calendar(
+                req.ticker,
+                datetime.fromisoformat(req.start_date).date(),
+                datetime.fromisoformat(req.end_date).date(),
+            )
+        events = evaluate_rules_for_range(req.start_date, req.end_date,
+                                          trading_days_only=req.trading_days_only, calendar=calendar)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -54,9 +156,28 @@ def run_correlation(req: CorrelationRequest):
         )
 
     try:
-        result = analyze_correlation(events, ticker=req.ticker, lookahead_days=req.lookahead_days)
+        result = analyze_correlation(events, ticker=req.ticker, lookahead_days=req.lookahead_days,
+                                     horizon_unit=req.horizon_unit, detail=req.detail,
+                                     sample_size=req.sample_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception("Correlation computation failed")
         raise HTTPException(status_code=500, detail=f"Correlation computation failed: {e}")
 
+    if cache_key is not None:
+        correlation_cache.store_result(db, cache_key, req.ticker, result)
     return CorrelationResult(**result)
+
+
+@router.get("/cache")
+def correlation_cache_stats(db: Session = Depends(get_db)):
+    """Entry count, stored bytes and hit total of the correlation result cache."""
+    return correlation_cache.cache_stats(db)
+
+
+@router.delete("/cache")
+def clear_correlation_cache(db: Session = Depends(get_db)):
+    deleted = correlation_cache.clear_cache(db)
+    logger.info(f"🗑️  Cleared {deleted} correlation cache entries")
+    return {"deleted": deleted}
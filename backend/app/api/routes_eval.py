@@ -6,7 +6,14 @@ Evaluate all active rules over a date range and return triggered events.
 """
 
 from fastapi import APIRouter, HTTPException
-from app.core.services.evaluation_service import evaluate_rules_for_range
+from fastapi.responses import StreamingResponse
+from app.core.services.evaluation_service import (
+    evaluate_rules_for_range,
+    evaluate_rules_for_exchanges,
+    iter_evaluated_events,
+)
+from app.core.common.serialization import iter_ndjson, NDJSON_MEDIA_TYPE
+from app.core.rules.engine.condition_stats import condition_stats
 from app.core.common.schemas import EvaluateRequest
 from app.core.common.logger import setup_logger
 from app.core.common.config import settings
@@ -21,9 +28,26 @@ def evaluate(req: EvaluateRequest):
     """
     Evaluate all enabled astrological rules between start_date and end_date.
     Returns a list of triggered events per rule per date.
+    With ``exchanges`` the events are grouped per exchange, evaluated at each session open.
     """
+    if req.exchanges:
+        try:
+            by_exchange = evaluate_rules_for_exchanges(
+                req.start_date, req.end_date, req.exchanges, trading_days_only=req.trading_days_only
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.exception("Evaluation failed")
+            raise HTTPException(status_code=500, detail=f"Evaluation failed: {e}")
+        return {
+            "count": sum(len(evs) for evs in by_exchange.values()),
+            "exchanges": {ex: {"count": len(evs), "events": evs} for ex, evs in by_exchange.items()},
+        }
+
     try:
-        events = evaluate_rules_for_range(req.start_date, req.end_date)
+        events = evaluate_rules_for_range(req.start_date, req.end_date,
+                                          trading_days_only=req.trading_days_only, exchange=req.exchange)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -35,3 +59,42 @@ def evaluate(req: EvaluateRequest):
 
     logger.info(f"Evaluated {len(events)} events from {req.start_date} to {req.end_date}")
     return {"count": len(events), "events": events}
+
+
+@router.post("/stream", summary="Stream evaluated events as NDJSON")
+def evaluate_stream(req: EvaluateRequest, gzip: bool = False):
+    """
+    Same evaluation as POST /evaluate, streamed as newline-delimited JSON (one event
+    per line) while evaluation proceeds date by date. Memory stays bounded by one
+    evaluation batch; with ``gzip=true`` the body is a gzip stream.
+    """
+    try:
+        events = iter_evaluated_events(
+            req.start_date, req.end_date, trading_days_only=req.trading_days_only,
+            exchanges=req.exchanges or [req.exchange],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Evaluation failed")
+        raise HTTPException(status_code=500, detail=f"Evaluation failed: {e}")
+
+    logger.info(f"Streaming evaluation from {req.start_date} to {req.end_date} (gzip={gzip})")
+    headers = {"Content-Encoding": "gzip"} if gzip else {}
+    return StreamingResponse(iter_ndjson(events, gzip=gzip), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/condition_stats", summary="Runtime pass rate and cost per rule condition")
+def get_condition_stats():
+    """
+    Statistics gathered by this process's rules engine, used to order each rule's
+    conditions cheapest and most selective first. Worker processes keep their own.
+    """
+    stats = condition_stats.snapshot()
+    return {"ordering": settings.condition_ordering, "count": len(stats), "conditions": stats}
+
+
+@router.delete("/condition_stats", summary="Reset condition statistics")
+def reset_condition_stats():
+    condition_stats.reset()
+    return {"reset": True}
@@ -0,0 +1,101 @@
+# app/api/routes_export_api.py
+"""
+Columnar Export API
+-------------------
+Evaluated events, persisted rule events and correlation per-event records as
+Arrow IPC streams (``format=arrow``) or Parquet files (``format=parquet``).
+"""
+
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.db.models import Rule
+from app.core.common.schemas import EvaluateRequest
+from app.api.routes_correlation import CorrelationRequest
+from app.core.services.evaluation_service import evaluate_rules_for_range, iter_evaluated_events
+from app.core.analysis.correlation_analyzer import compute_correlation_arrays
+from app.core.analysis import columnar_export
+from app.core.market.trading_calendar import get_trading_calendar
+from app.core.common.logger import setup_logger
+from app.core.common.config import settings
+
+logger = setup_logger(settings.log_level)
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _table_response(table, fmt: str, name: str) -> Response:
+    try:
+        payload = columnar_export.serialize_table(table, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type, ext = columnar_export.EXPORT_FORMATS[fmt]
+    logger.info(f"📦 Exported {table.num_rows} rows as {fmt} ({len(payload)} bytes)")
+    return Response(content=payload, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{name}.{ext}"'})
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in columnar_export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {fmt}")
+
+
+@router.post("/evaluate", summary="Evaluated events as Arrow / Parquet")
+def export_evaluation(req: EvaluateRequest, format: str = "arrow"):
+    _check_format(format)
+    try:
+        events = iter_evaluated_events(req.start_date, req.end_date, trading_days_only=req.trading_days_only,
+                                       exchanges=req.exchanges or [req.exchange])
+        table = columnar_export.events_table(events)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Evaluation export failed")
+        raise HTTPException(status_code=500, detail=f"Evaluation failed: {e}")
+    return _table_response(table, format, f"events_{req.start_date}_{req.end_date}")
+
+
+@router.get("/rule_events", summary="Persisted rule events as Arrow / Parquet")
+def export_rule_events(
+    format: str = "arrow",
+    rule_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    provider: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    _check_format(format)
+    rule_pk = None
+    if rule_id:
+        rule_pk = db.scalar(select(Rule.id).where(Rule.rule_id == rule_id))
+        if rule_pk is None:
+            raise HTTPException(status_code=404, detail="Rule not found")
+    table = columnar_export.rule_events_table(db, rule_pk, start_date, end_date, provider)
+    return _table_response(table, format, f"rule_events_{rule_id or 'all'}")
+
+
+@router.post("/correlation", summary="Correlation per-event records as Arrow / Parquet")
+def export_correlation(req: CorrelationRequest, format: str = "arrow"):
+    _check_format(format)
+    try:
+        calendar = None
+        if req.trading_days_only:
+            calendar = get_trading_calendar(
+                req.ticker,
+                datetime.fromisoformat(req.start_date).date(),
+                datetime.fromisoformat(req.end_date).date(),
+            )
+        events = evaluate_rules_for_range(req.start_date, req.end_date,
+                                          trading_days_only=req.trading_days_only, calendar=calendar)
+        arrays = compute_correlation_arrays(events, ticker=req.ticker, lookahead_days=req.lookahead_days,
+                                            horizon_unit=req.horizon_unit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Correlation export failed")
+        raise HTTPException(status_code=500, detail=f"Correlation computation failed: {e}")
+    return _table_response(columnar_export.correlation_records_table(arrays), format, f"correlation_{req.ticker}")
@@ -0,0 +1,144 @@
+# app/api/routes_jobs_api.py
+"""
+Background Jobs API
+-------------------
+Submit long evaluations, correlation runs and event generation as background
+jobs executed by the local worker pool, then poll status/progress, cancel, or
+fetch the (compressed) result.
+"""
+
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.db.models import Rule
+from app.core.db.models_jobs import JobStatus
+from app.core.common.schemas import EvaluateRequest, GenerateEventsRequest, GenerateBatchRequest
+from app.api.routes_correlation import CorrelationRequest, MiningRequest, SweepRequest
+from app.api.routes_astro_api import CalendarBuildRequest
+from app.core.services import job_service
+from app.core.common.logger import setup_logger
+from app.core.common.config import settings
+
+logger = setup_logger(settings.log_level)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _submit(db: Session, kind: str, params: dict, force: bool):
+    try:
+        job, created = job_service.submit_job(db, kind, params, force=force)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"created": created, **job.to_dict()}
+
+
+def _validate_range(start_date: str, end_date: str):
+    try:
+        if date.fromisoformat(end_date) < date.fromisoformat(start_date):
+            raise ValueError("end_date must be >= start_date")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _job_or_404(db: Session, job_id: str):
+    job = job_service.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/evaluate", status_code=202, summary="Evaluate all active rules as a background job")
+def submit_evaluate(req: EvaluateRequest, force: bool = False, db: Session = Depends(get_db)):
+    _validate_range(req.start_date, req.end_date)
+    return _submit(db, "evaluate", req.model_dump(), force)
+
+
+@router.post("/correlation", status_code=202, summary="Run correlation analysis as a background job")
+def submit_correlation(req: CorrelationRequest, force: bool = False, db: Session = Depends(get_db)):
+    _validate_range(req.start_date, req.end_date)
+    return _submit(db, "correlation", req.model_dump(), force)
+
+
+@router.post("/sweep", status_code=202, summary="Run a parameter sweep as a background job")
+def submit_sweep(req: SweepRequest, force: bool = False, db: Session = Depends(get_db)):
+    _validate_range(req.start_date, req.end_date)
+    return _submit(db, "sweep", req.model_dump(), force)
+
+
+@router.post("/mine_rules", status_code=202, summary="Mine candidate rules as a background job")
+def submit_mine_rules(req: MiningRequest, force: bool = False, db: Session = Depends(get_db)):
+    _validate_range(req.start_date, req.end_date)
+    return _submit(db, "mine_rules", req.model_dump(), force)
+
+
+@router.post("/build_calendar", status_code=202, summary="Build the ingress / station calendar as a background job")
+def submit_build_calendar(req: CalendarBuildRequest, force: bool = False, db: Session = Depends(get_db)):
+    if req.start_date and req.end_date:
+        _validate_range(req.start_date, req.end_date)
+    return _submit(db, "build_calendar", req.model_dump(), force)
+
+
+@router.post("/generate_events", status_code=202, summary="Generate rule events as a background job")
+def submit_generate_events(req: GenerateEventsRequest, force: bool = False, db: Session = Depends(get_db)):
+    _validate_range(req.start_date, req.end_date)
+    if db.scalar(select(Rule.id).where(Rule.rule_id == req.rule_id)) is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return _submit(db, "generate_events", req.model_dump(), force)
+
+
+@router.post("/generate_batch", status_code=202, summary="Regenerate events for many rules as a background job")
+def submit_generate_batch(req: GenerateBatchRequest, force: bool = False, db: Session = Depends(get_db)):
+    _validate_range(req.start_date, req.end_date)
+    return _submit(db, "generate_batch", req.model_dump(), force)
+
+
+@router.get("/")
+def list_jobs(status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50,
+              db: Session = Depends(get_db)):
+    try:
+        jobs = job_service.list_jobs(db, status=status, kind=kind, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [j.to_dict() for j in jobs]
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    return _job_or_404(db, job_id).to_dict()
+
+
+@router.get("/{job_id}/progress")
+def get_progress(job_id: str, db: Session = Depends(get_db)):
+    job = _job_or_404(db, job_id)
+    return {"id": job.id, "status": job.status.name, "progress": round(job.progress or 0.0, 2), "message": job.message}
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    _job_or_404(db, job_id)
+    try:
+        job = job_service.cancel_job(db, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"🛑 Cancel requested for job {job_id}")
+    return job.to_dict()
+
+
+@router.get("/{job_id}/result")
+def get_result(job_id: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Result document of a finished job. Clients accepting ``deflate`` receive the
+    stored zlib stream as-is (no server-side decompression).
+    """
+    job = _job_or_404(db, job_id)
+    if job.status != JobStatus.succeeded:
+        detail = job.error if job.status == JobStatus.failed else f"Job is {job.status.name}"
+        raise HTTPException(status_code=409, detail=detail)
+    if "deflate" in request.headers.get("accept-encoding", "").lower():
+        return Response(content=job.result_blob, media_type="application/json",
+                        headers={"Content-Encoding": "deflate"})
+    return job_service.job_result(job)
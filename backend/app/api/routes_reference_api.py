@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.core.db.enums import Planet, Relation, OutcomeEffect
+from app.core.market.exchanges import list_exchanges
 
 router = APIRouter(prefix="/api/reference", tags=["reference"])
 
@@ -8,6 +9,7 @@ def get_reference_data():
     return {
         "planets": [{"key": p.name, "label": p.value} for p in Planet],
         "relations": [{"key": r.name, "label": r.value} for r in Relation],
-        "effects": [{"key": e.name, "label": e.value} for e in OutcomeEffect]
+        "effects": [{"key": e.name, "label": e.value} for e in OutcomeEffect],
+        "exchanges": list_exchanges(),
     }
 
@@ -1,13 +1,16 @@
 from datetime import date
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
-from app.core.db.models_analysis import RuleEvent
+from app.core.services.rule_event_query_service import list_rule_events, active_events_on
 from app.core.analysis.event_generator import EventGeneratorService
+from app.core.analysis.batch_event_generator import generate_for_rules
+from app.core.common.schemas import GenerateBatchRequest
 from app.core.db.models import Rule
+from app.core.market.trading_calendar import exchange_calendar
 from app.core.common.logger import setup_logger
 from app.core.common.config import settings
 
@@ -22,6 +25,8 @@ def generate_events_for_rule(
     end_date: date,
     provider: str = "swisseph",
     overwrite: bool = False,
+    trading_days_only: bool = False,
+    exchange: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
     logger.info(f"▶️  Generating events for rule_id={rule_id}, provider={provider}, "
@@ -32,7 +37,9 @@ def generate_events_for_rule(
             logger.warning(f"❌ Rule not found for rule_id={rule_id}")
             raise HTTPException(status_code=404, detail="Rule not found")
 
-        service = EventGeneratorService(db, astro_provider_name=provider)
+        calendar = (exchange_calendar(exchange, start_date, end_date)
+                    if trading_days_only else None)
+        service = EventGeneratorService(db, astro_provider_name=provider, calendar=calendar, exchange=exchange)
         events = service.generate_for_rule(
             rule_id=rule.id,
             start_date=start_date,
@@ -46,12 +53,79 @@ def generate_events_for_rule(
         logger.exception(f"💥 Error generating events for rule_id={rule_id}: {e}")
         raise
 
+@router.post("/events/generate")
+def generate_events_for_rules(req: GenerateBatchRequest, db: Session = Depends(get_db)):
+    """
+    Regenerate events for several rules (default: all enabled), sharded by rule across
+    worker processes. A failing rule is reported under "failed" without aborting the batch.
+    For long runs prefer POST /jobs/generate_batch.
+    """
+    logger.info(f"▶️  Batch generating events rules={req.rule_ids or 'all enabled'}, provider={req.provider}, "
+                f"range=({req.start_date} → {req.end_date}), workers={req.workers}")
+    try:
+        start, end = date.fromisoformat(req.start_date), date.fromisoformat(req.end_date)
+        calendar = (exchange_calendar(req.exchange, start, end)
+                    if req.trading_days_only else None)
+        return generate_for_rules(
+            db,
+            start_date=start,
+            end_date=end,
+            rule_ids=req.rule_ids,
+            provider=req.provider,
+            overwrite=req.overwrite,
+            calendar=calendar,
+            exchange=req.exchange,
+            workers=req.workers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/events/active", response_model=List[dict])
+def list_events_active_on(on: date, provider: Optional[str] = None, db: Session = Depends(get_db)):
+    """Events (across all rules) whose interval contains the given date."""
+    rows = active_events_on(db, on, provider=provider)
+    logger.info(f"📤 Found {len(rows)} events active on {on}")
+    return rows
+
+
+def _rule_pk(db: Session, rule_id: str) -> int:
+    pk = db.scalar(select(Rule.id).where(Rule.rule_id == rule_id))
+    if pk is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return pk
+
+
 @router.get("/{rule_id}/events", response_model=List[dict])
-def list_events_for_rule(rule_id: str, db: Session = Depends(get_db)):
+def list_events_for_rule(
+    rule_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    provider: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     logger.info(f"📥 Listing events for rule_id={rule_id}")
-    rule = db.scalar(select(Rule).where(Rule.rule_id == rule_id))
-    if not rule:
-        raise HTTPException(status_code=404, detail="Rule not found")
-    rows = db.query(RuleEvent).filter(RuleEvent.rule_id == rule.id).order_by(RuleEvent.start_date).all()
+    rows, _ = list_rule_events(db, _rule_pk(db, rule_id), start=start_date, end=end_date, provider=provider)
     logger.info(f"📤 Found {len(rows)} events for rule_id={rule_id}")
-    return [r.to_dict() for r in rows]
+    return rows
+
+
+@router.get("/{rule_id}/events/page")
+def page_events_for_rule(
+    rule_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    provider: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Keyset-paginated listing; pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        rows, next_cursor = list_rule_events(
+            db, _rule_pk(db, rule_id), start=start_date, end=end_date,
+            provider=provider, cursor=cursor, limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"count": len(rows), "events": rows, "next_cursor": next_cursor}
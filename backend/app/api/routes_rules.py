@@ -1,12 +1,75 @@
 # app/api/routes_rules.py
+from datetime import date, datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from app.core.db import get_db
 from app.core.db.models import Rule, Condition, Outcome, Sector
+from app.core.services.activity_index import activity_index, bump_events_version
+from app.core.rules.engine.compiled_rules import compiled_rules
+from app.core.analysis import signal_materializer
+from app.core.analysis.event_generator import EventGeneratorService
+from app.core.market.trading_calendar import exchange_calendar
+from app.core.analysis.composite_rules import CompositeEvaluator, check_references, composite_cache
+from app.core.common.config import settings
+from app.core.common.schemas import CompositeExpression, RuleExpression
 
 router = APIRouter(prefix="/api/rules", tags=["rules"])
 
+_expression_adapter = TypeAdapter(Optional[RuleExpression])
+
+
+def _validated_expression(raw):
+    """Validate an and / or / not expression payload and return its JSON form (None clears it)."""
+    try:
+        expression = _expression_adapter.validate_python(raw)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid expression: {e}")
+    return _expression_adapter.dump_python(expression, exclude_none=True)
+
+
+_composite_adapter = TypeAdapter(Optional[CompositeExpression])
+
+
+def _validated_composite(db: Session, rule_id: str, raw):
+    """Validate a composite payload (shape, referenced rules exist, no self-reference); None clears it."""
+    try:
+        composite = _composite_adapter.dump_python(_composite_adapter.validate_python(raw), exclude_none=True)
+        if composite is not None:
+            check_references(db, rule_id, composite)
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid composite: {e}")
+    return composite
+
+
+# -----------------------------
+# COMPOSITE PREVIEW
+# -----------------------------
+@router.post("/composite/evaluate")
+def evaluate_composite(payload: dict, db: Session = Depends(get_db)):
+    """
+    Evaluate a composite expression over persisted events without saving a rule:
+    {"composite": {...}, "start_date", "end_date", "provider"?} -> active intervals.
+    """
+    composite = _validated_composite(db, "", payload.get("composite"))
+    if composite is None:
+        raise HTTPException(status_code=400, detail="composite is required")
+    try:
+        start = date.fromisoformat(payload["start_date"])
+        end = date.fromisoformat(payload["end_date"])
+        provider = payload.get("provider") or settings.provider_type
+        intervals = CompositeEvaluator(db, provider).evaluate(composite, start, end)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "provider": provider,
+        "days": intervals.days,
+        "intervals": [{"start_date": s.isoformat(), "end_date": e.isoformat()} for s, e in intervals.to_dates()],
+        "cache": composite_cache.stats(),
+    }
+
 
 # -----------------------------
 # CREATE
@@ -28,6 +91,8 @@ def create_rule(payload: dict, db: Session = Depends(get_db)):
         description=payload.get("description"),
         confidence=payload.get("confidence", 1.0),
         enabled=payload.get("enabled", True),
+        expression=_validated_expression(payload.get("expression")),
+        composite=_validated_composite(db, rule_id, payload.get("composite")),
     )
 
     for cond_data in payload.get("conditions", []):
@@ -47,6 +112,8 @@ def create_rule(payload: dict, db: Session = Depends(get_db)):
     db.add(rule)
     db.commit()
     db.refresh(rule)
+    # SQLite may reuse the pk of a deleted rule
+    compiled_rules.invalidate([rule.id])
     return {"id": rule.id, "rule_id": rule.rule_id}
 
 
@@ -65,6 +132,8 @@ def list_rules(db: Session = Depends(get_db)):
             "description": r.description,
             "confidence": r.confidence,
             "enabled": r.enabled,
+            "expression": r.expression,
+            "composite": r.composite,
             "conditions": [
                 {
                     "id": c.id,
@@ -100,6 +169,8 @@ def get_rule(rule_id:str, db: Session = Depends(get_db)):
             "description": r.description,
             "confidence": r.confidence,
             "enabled": r.enabled,
+            "expression": r.expression,
+            "composite": r.composite,
             "conditions": [
                 {
                     "id": c.id,
@@ -141,21 +212,53 @@ def update_rule(rule_id: str, payload: dict, db: Session = Depends(get_db)):
         rule.conditions.clear()
         for cond_data in payload["conditions"]:
             rule.conditions.append(Condition(**cond_data))
+    if "expression" in payload:
+        rule.expression = _validated_expression(payload["expression"])
+    if "composite" in payload:
+        rule.composite = _validated_composite(db, rule.rule_id, payload["composite"])
     if "outcomes" in payload:
         rule.outcomes.clear()
         for out_data in payload["outcomes"]:
             rule.outcomes.append(Outcome(**out_data))
+    # child-only edits do not trigger onupdate; the new stamp marks a new rule version
+    rule.updated_at = datetime.utcnow()
 
     db.commit()
     db.refresh(rule)
-    return {
+    compiled_rules.invalidate([rule.id])
+    if settings.materialize_signals and ("outcomes" in payload or "confidence" in payload or "enabled" in payload):
+        signal_materializer.refresh_for_span(db, signal_materializer.rule_event_span(db, rule.id))
+    response = {
         "id": rule.id,
         "rule_id": rule.rule_id,
         "name": rule.name,
         "description": rule.description,
+        "expression": rule.expression,
+        "composite": rule.composite,
         "conditions": [c.__dict__ for c in rule.conditions],
         "outcomes": [o.__dict__ for o in rule.outcomes],
     }
+    if payload.get("regenerate"):
+        response["regenerated"] = _regenerate(db, rule.id, payload["regenerate"])
+    return response
+
+
+def _regenerate(db: Session, rule_pk: int, spec: dict) -> dict:
+    """
+    Incrementally refresh the edited rule's events:
+    {"start_date", "end_date", "provider"?, "exchange"?, "trading_days_only"?}.
+    Only changed conditions are re-evaluated and events are updated by diff.
+    """
+    try:
+        start = date.fromisoformat(spec["start_date"])
+        end = date.fromisoformat(spec["end_date"])
+        calendar = (exchange_calendar(spec.get("exchange"), start, end)
+                    if spec.get("trading_days_only") else None)
+        service = EventGeneratorService(db, astro_provider_name=spec.get("provider") or settings.provider_type,
+                                        calendar=calendar, exchange=spec.get("exchange"))
+        return service.regenerate_incremental(rule_pk, start, end)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid regenerate request: {e}")
 
 
 # -----------------------------
@@ -167,6 +270,15 @@ def delete_rule(rule_id: str, db: Session = Depends(get_db)):
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
 
+    rule_pk = rule.id
+    span = signal_materializer.rule_event_span(db, rule_pk) if settings.materialize_signals else None
     db.delete(rule)
+    # the rule's events go with it
+    version = bump_events_version(db)
     db.commit()
+    compiled_rules.invalidate([rule_pk])
+    with activity_index.writing(version) as current:
+        if current:
+            activity_index.remove_rule_events(rule_pk)
+    signal_materializer.refresh_for_span(db, span)
     return {"deleted": rule_id}
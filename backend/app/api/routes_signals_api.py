@@ -0,0 +1,40 @@
+# app/api/routes_signals_api.py
+"""
+Sector Signals API
+------------------
+Serves the materialized daily sector signal table (net score, active rule count,
+bullish/bearish conflict counts per date and sector).
+"""
+
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.analysis import signal_materializer
+
+router = APIRouter(prefix="/signals", tags=["signals"])
+
+
+@router.get("/")
+def get_signals(
+    start_date: date,
+    end_date: date,
+    sector: Optional[str] = None,
+    provider: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Daily sector signals in [start_date, end_date]; days without active rules are omitted."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be >= start_date")
+    rows = signal_materializer.query_signals(db, start_date, end_date, sector=sector, provider=provider)
+    return {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(), "count": len(rows), "signals": rows}
+
+
+@router.post("/rebuild")
+def rebuild_signals(start_date: date, end_date: date, provider: Optional[str] = None, db: Session = Depends(get_db)):
+    """Recompute the signal table for a window (e.g. after out-of-process event writes)."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be >= start_date")
+    return {"rows": signal_materializer.refresh_signals(db, start_date, end_date, provider)}
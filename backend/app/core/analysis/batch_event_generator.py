@@ -0,0 +1,264 @@
+# backend/app/core/analysis/batch_event_generator.py
+"""
+Batch Event Generation
+----------------------
+Regenerates RuleEvents for many rules at once, sharded by rule across worker
+processes.
+
+Workers only compute: each one builds its own EventGeneratorService (and astro
+provider) once and runs ``detect_events`` for the rules it is handed, returning
+plain column dicts. Rules sharing a condition are handed to the same worker,
+which evaluates each shared condition once per day for all of them. The calling process is the single writer: as each rule's
+rows stream back it applies the overwrite delete and a bulk insert, so SQLite
+never sees concurrent writers. A rule that fails (in detection or while
+writing) is reported and skipped without aborting the rest of the batch.
+Sector signals and the activity index are refreshed once over the written span
+when the batch ends, also when it is aborted part-way.
+
+Composite rules read other rules' events, so they run in the calling process
+after every astro rule of the batch has been written, in dependency order.
+"""
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, or_, and_, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.db.models import Rule, Outcome
+from app.core.db.models_analysis import RuleEvent
+from app.core.analysis.event_generator import EventGeneratorService
+from app.core.analysis.composite_rules import dependency_order
+from app.core.rules.engine.compiled_rules import compiled_rules
+from app.core.analysis import signal_materializer
+from app.core.astro.ingress_calendar import AstroCalendar
+from app.core.market.trading_calendar import TradingCalendar
+from app.core.services.activity_index import activity_index, bump_events_version
+from app.core.services.astro_calendar import astro_calendars
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.eventgen.batch")
+
+# progress(done_rules, total_rules)
+ProgressCallback = Callable[[int, int], None]
+
+# per worker process: generator built once by the pool initializer
+_worker_generator: Optional[EventGeneratorService] = None
+
+
+def _init_worker(provider: str, calendar: Optional[TradingCalendar], exchange: Optional[str],
+                 astro_calendar: Optional[AstroCalendar] = None) -> None:
+    global _worker_generator
+    _worker_generator = EventGeneratorService(None, astro_provider_name=provider, calendar=calendar,
+                                              exchange=exchange, astro_calendar=astro_calendar)
+
+
+def _detect_rule(rule: Rule, start_date: date, end_date: date) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+    """(rule pk, event rows, error) — errors are returned, never raised."""
+    try:
+        return rule.id, _worker_generator.detect_events(rule, start_date, end_date), None
+    except Exception as e:
+        logger.exception(f"💥 Event detection failed for rule {rule.rule_id}")
+        return rule.id, [], f"{type(e).__name__}: {e}"
+
+
+def _detect_group(rules: List[Rule], start_date: date, end_date: date) -> List[Tuple[int, List[Dict[str, Any]], Optional[str]]]:
+    """Worker entry point: detect a group of rules, evaluating their shared conditions once per day."""
+    if len(rules) > 1:
+        _worker_generator.share_conditions(rules, start_date, end_date)
+    try:
+        return [_detect_rule(rule, start_date, end_date) for rule in rules]
+    finally:
+        _worker_generator.clear_shared_conditions()
+
+
+def _rule_groups(rules: List[Rule], workers: int) -> List[List[Rule]]:
+    """
+    Split rules into worker tasks so rules sharing a condition land in the same
+    task (connected components over condition keys). Components larger than an
+    even share per worker are chunked to keep every worker busy.
+    """
+    parent = list(range(len(rules)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: Dict[Tuple, int] = {}
+    for i, rule in enumerate(rules):
+        for cond in compiled_rules.get(rule).leaves:
+            j = owner.setdefault(cond.key, i)
+            parent[find(i)] = find(j)
+
+    components: Dict[int, List[Rule]] = {}
+    for i, rule in enumerate(rules):
+        components.setdefault(find(i), []).append(rule)
+    cap = max(1, math.ceil(len(rules) / workers))
+    groups: List[List[Rule]] = []
+    for members in components.values():
+        groups.extend(members[k: k + cap] for k in range(0, len(members), cap))
+    return groups
+
+
+def _load_rules(db: Session, rule_ids: Optional[Sequence[str]]) -> List[Rule]:
+    q = select(Rule).options(joinedload(Rule.outcomes).joinedload(Outcome.sector)).order_by(Rule.id)
+    if rule_ids:
+        q = q.where(Rule.rule_id.in_(list(rule_ids)))
+    else:
+        q = q.where(Rule.enabled == True)
+    rules = list(db.execute(q).unique().scalars().all())
+    if rule_ids:
+        missing = set(rule_ids) - {r.rule_id for r in rules}
+        if missing:
+            raise ValueError(f"Unknown rules: {', '.join(sorted(missing))}")
+    for r in rules:
+        db.expunge(r)
+    return rules
+
+
+def _write_rule_events(
+    db: Session,
+    rule_pk: int,
+    rows: List[Dict[str, Any]],
+    start_date: date,
+    end_date: date,
+    overwrite: bool,
+) -> Tuple[date, date]:
+    """Single-writer step for one rule. Returns the date span whose signals changed."""
+    span = (start_date, end_date)
+    if overwrite:
+        overlap = and_(
+            RuleEvent.rule_id == rule_pk,
+            RuleEvent.start_date <= end_date,
+            or_(RuleEvent.end_date == None, RuleEvent.end_date >= start_date),
+        )
+        for s, e in db.execute(select(RuleEvent.start_date, RuleEvent.end_date).where(overlap)).all():
+            span = (min(span[0], s), max(span[1], e or s))
+        db.execute(delete(RuleEvent).where(overlap))
+    if rows:
+        db.execute(insert(RuleEvent), rows)
+    if overwrite or rows:
+        bump_events_version(db)
+    db.commit()
+    return span
+
+
+def generate_for_rules(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    rule_ids: Optional[Sequence[str]] = None,
+    provider: str = "swisseph",
+    overwrite: bool = False,
+    calendar: Optional[TradingCalendar] = None,
+    exchange: Optional[str] = None,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Generate events for ``rule_ids`` (default: every enabled rule) over [start_date, end_date].
+
+    ``workers`` defaults to settings.generation_workers (0 = all cores); with one
+    worker the rules are processed in-process. Returns a summary:
+      { "rules", "succeeded", "events", "failed": {rule_code: error} }
+    """
+    if end_date < start_date:
+        raise ValueError("end_date must be >= start_date")
+    all_rules = _load_rules(db, rule_ids)
+    codes = {r.id: r.rule_id for r in all_rules}
+    composites = dependency_order([r for r in all_rules if r.composite])
+    rules = [r for r in all_rules if not r.composite]
+    workers = settings.generation_workers if workers is None else workers
+    if workers <= 0:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, len(rules) or 1))
+    logger.info(f"🚀 Batch generation: {len(all_rules)} rules ({len(composites)} composite), {start_date} → {end_date}, "
+                f"provider={provider}, workers={workers}, overwrite={overwrite}")
+
+    failed: Dict[str, str] = {}
+    written = 0
+    succeeded = 0
+    signal_window: Optional[Tuple[date, date]] = None
+
+    def _consume(rule_pk: int, rows: List[Dict[str, Any]], error: Optional[str]) -> None:
+        nonlocal written, succeeded, signal_window
+        if error is None:
+            try:
+                span = _write_rule_events(db, rule_pk, rows, start_date, end_date, overwrite)
+            except Exception as e:
+                db.rollback()
+                logger.exception(f"💥 Writing events failed for rule {codes[rule_pk]}")
+                error = f"{type(e).__name__}: {e}"
+            else:
+                written += len(rows)
+                succeeded += 1
+                signal_window = span if signal_window is None else (
+                    min(signal_window[0], span[0]), max(signal_window[1], span[1]))
+        if error is not None:
+            failed[codes[rule_pk]] = error
+        if progress is not None:
+            progress(succeeded + len(failed), len(all_rules))
+
+    # workers have no session: hand them the provider's ingress calendar
+    astro_calendars.refresh(db)
+    astro_calendar = astro_calendars.get(provider)
+    try:
+        if workers == 1:
+            _init_worker(provider, calendar, exchange, astro_calendar)
+            if len(rules) > 1:
+                _worker_generator.share_conditions(rules, start_date, end_date)
+            try:
+                for rule in rules:
+                    _consume(*_detect_rule(rule, start_date, end_date))
+            finally:
+                _worker_generator.clear_shared_conditions()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(provider, calendar, exchange, astro_calendar),
+            ) as pool:
+                futures = {
+                    pool.submit(_detect_group, group, start_date, end_date): [r.id for r in group]
+                    for group in _rule_groups(rules, workers)
+                }
+                try:
+                    for fut in as_completed(futures):
+                        try:
+                            results = fut.result()
+                        except Exception as e:
+                            # worker crashed (e.g. killed); isolate to this task's rules
+                            results = [(pk, [], f"{type(e).__name__}: {e}") for pk in futures[fut]]
+                        for result in results:
+                            _consume(*result)
+                except BaseException:
+                    # aborted (e.g. progress callback cancelled the run): drop rules not yet started
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+
+        if composites:
+            composer = EventGeneratorService(db, astro_provider_name=provider, calendar=calendar, exchange=exchange)
+            for rule in composites:
+                try:
+                    _consume(rule.id, composer.detect_composite_events(rule, start_date, end_date), None)
+                except Exception as e:
+                    logger.exception(f"💥 Composite evaluation failed for rule {rule.rule_id}")
+                    _consume(rule.id, [], f"{type(e).__name__}: {e}")
+    finally:
+        # rules are committed one by one: an aborted run still refreshes what it wrote
+        if signal_window is not None:
+            db.rollback()   # drop a rule left half-written by the abort
+            if settings.materialize_signals:
+                signal_materializer.refresh_signals(db, signal_window[0], signal_window[1], provider)
+            if activity_index.loaded:
+                activity_index.load(db)
+
+    logger.info(f"✅ Batch generation done: {succeeded}/{len(all_rules)} rules, {written} events, {len(failed)} failed")
+    return {"rules": len(all_rules), "succeeded": succeeded, "events": written, "failed": failed}
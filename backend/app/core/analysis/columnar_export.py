@@ -0,0 +1,135 @@
+# backend/app/core/analysis/columnar_export.py
+"""
+Columnar Export
+---------------
+Arrow tables (serialized as Arrow IPC streams or Parquet) for evaluated events,
+persisted RuleEvents and correlation per-event records, for loading straight
+into pandas / polars without parsing JSON.
+
+Columns are built directly: evaluated events are appended field by field as
+they stream out of the evaluator, RuleEvents are transposed from plain column
+rows, and correlation records come from the numpy arrays behind
+analyze_correlation — no intermediate per-row dicts are created here.
+"""
+
+import json
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Rule
+from app.core.db.models_analysis import RuleEvent
+from app.core.services.rule_event_query_service import EVENT_COLUMNS, overlap_filter
+from app.core.analysis.correlation_analyzer import CorrelationArrays
+
+try:  # optional dependency: only needed for exports
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# evaluated event fields, in column order
+EVENT_FIELDS = ("rule_id", "name", "date", "sector", "effect", "weight", "confidence", "exchange", "instant")
+
+
+def _require_arrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow/Parquet export (pip install pyarrow)")
+
+
+def events_table(events: Iterable[Dict[str, Any]]) -> "pa.Table":
+    """Evaluated events (engine dicts) as a table; consumes ``events`` lazily in one pass."""
+    _require_arrow()
+    cols: Dict[str, List[Any]] = {f: [] for f in EVENT_FIELDS}
+    appenders = [(cols[f].append, f) for f in EVENT_FIELDS]
+    for ev in events:
+        for append, f in appenders:
+            append(ev.get(f))
+    return pa.table({
+        "rule_id": pa.array(cols["rule_id"], pa.string()).dictionary_encode(),
+        "name": pa.array(cols["name"], pa.string()).dictionary_encode(),
+        "date": pa.array(np.array(cols["date"], dtype="datetime64[D]"), pa.date32()),
+        "sector": pa.array(cols["sector"], pa.string()).dictionary_encode(),
+        "effect": pa.array(cols["effect"], pa.string()).dictionary_encode(),
+        "weight": pa.array(cols["weight"], pa.float64()),
+        "confidence": pa.array(cols["confidence"], pa.float64()),
+        "exchange": pa.array(cols["exchange"], pa.string()).dictionary_encode(),
+        "instant": pa.array(np.array(cols["instant"], dtype="datetime64[s]"), pa.timestamp("s"), from_pandas=True),
+    })
+
+
+def rule_events_table(
+    db: Session,
+    rule_pk: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    provider: Optional[str] = None,
+) -> "pa.Table":
+    """Persisted RuleEvents (optionally one rule / provider / overlapping a window)."""
+    _require_arrow()
+    q = select(*EVENT_COLUMNS, Rule.rule_id.label("rule_code")).join(Rule, Rule.id == RuleEvent.rule_id)
+    if rule_pk is not None:
+        q = q.where(RuleEvent.rule_id == rule_pk)
+    if provider:
+        q = q.where(RuleEvent.provider == provider)
+    for clause in overlap_filter(start, end):
+        q = q.where(clause)
+    rows = db.execute(q.order_by(RuleEvent.rule_id, RuleEvent.start_date, RuleEvent.id)).all()
+    (ids, rule_pks, starts, ends, durations, subtypes, providers, metadata, created, codes) = (
+        zip(*rows) if rows else ([],) * 10
+    )
+    return pa.table({
+        "id": pa.array(ids, pa.int64()),
+        "rule_pk": pa.array(rule_pks, pa.int64()),
+        "rule_id": pa.array(codes, pa.string()).dictionary_encode(),
+        "start_date": pa.array(starts, pa.date32()),
+        "end_date": pa.array(ends, pa.date32()),
+        "duration_type": pa.array([d.name if d else None for d in durations], pa.string()).dictionary_encode(),
+        "event_subtype": pa.array([t.name if t else None for t in subtypes], pa.string()).dictionary_encode(),
+        "provider": pa.array(providers, pa.string()).dictionary_encode(),
+        "metadata_json": pa.array([json.dumps(m) if m is not None else None for m in metadata], pa.string()),
+        "created_at": pa.array(created, pa.timestamp("us")),
+    })
+
+
+def correlation_records_table(arrays: CorrelationArrays) -> "pa.Table":
+    """Per-event correlation records (the ``records`` of analyze_correlation) as a table."""
+    _require_arrow()
+    counts = np.diff(arrays.bounds)
+    group = np.repeat(np.arange(len(arrays.rule_ids), dtype=np.int32), counts)
+    columns = {
+        "rule_id": pa.DictionaryArray.from_arrays(group, pa.array(arrays.rule_ids, pa.string())),
+        "name": pa.DictionaryArray.from_arrays(group, pa.array(arrays.names, pa.string())),
+        "entry_date": pa.array(arrays.entry_dates, pa.date32()),
+        "direction": pa.array(arrays.directions.astype(np.int8)),
+        "weight": pa.array(arrays.weights, pa.float64()),
+    }
+    dir_rets = arrays.dir_rets
+    for j, h in enumerate(arrays.horizons):
+        missing = np.isnan(arrays.rets[:, j])
+        columns[f"ret_{h}d"] = pa.array(arrays.rets[:, j], pa.float64(), mask=missing)
+        columns[f"dir_ret_{h}d"] = pa.array(dir_rets[:, j], pa.float64(), mask=missing)
+    return pa.table(columns)
+
+
+def serialize_table(table: "pa.Table", fmt: str = "arrow") -> bytes:
+    """Arrow IPC stream or Parquet bytes."""
+    _require_arrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with pa_ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
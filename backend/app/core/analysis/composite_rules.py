@@ -0,0 +1,225 @@
+# backend/app/core/analysis/composite_rules.py
+"""
+Composite Rules
+---------------
+Rules over other rules' activity, e.g. "R012 active AND R044 started within
+3 days":
+
+    {"op": "and", "args": [{"rule": "R012"},
+                           {"rule": "R044", "started_within": 3}]}
+
+A composite is evaluated by interval algebra over the referenced rules'
+persisted RuleEvents (one provider), never by re-running their astro conditions:
+each reference loads the rule's event intervals (widened by the started_within /
+ended_within window), and / or / not become intersection / union / complement
+within the requested window. A referenced rule may itself be a composite, read
+from its own generated events, so signals build up hierarchically.
+
+Every sub-expression result is kept in a process-wide LRU keyed by
+(sub-expression, provider, window, stamps of the rules it references). A stamp
+is the rule's updated_at plus the count / id / date extremes of its events, so
+regenerating or editing a referenced rule changes the key and stale results are
+never read; repeated and deep composites reuse every unchanged branch.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.core.analysis.interval_algebra import IntervalSet
+from app.core.db.models import Rule
+from app.core.db.models_analysis import RuleEvent
+from app.core.rules.engine.compiled_rules import (
+    CompiledGroup, CompiledRuleRef, compile_composite, composite_refs,
+)
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.composite")
+
+CompositeNode = Union[CompiledGroup, CompiledRuleRef]
+
+
+class CompositeCache:
+    """Bounded LRU of sub-expression results (IntervalSet), shared by all evaluators of the process."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[Tuple, IntervalSet]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[IntervalSet]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Tuple, result: IntervalSet) -> None:
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._results), "hits": self.hits, "misses": self.misses,
+                "max_entries": self.max_entries}
+
+
+# process-wide instance
+composite_cache = CompositeCache(settings.composite_cache_max_entries)
+
+
+class CompositeEvaluator:
+    """Evaluates composite expressions over the events persisted for ``provider``."""
+
+    def __init__(self, db: Session, provider: str, cache: Optional[CompositeCache] = None):
+        self.db = db
+        self.provider = provider
+        self.cache = composite_cache if cache is None else cache
+
+    def evaluate(self, node: Union[CompositeNode, Dict[str, Any]], start_date: date, end_date: date) -> IntervalSet:
+        """Days of [start_date, end_date] on which the composite holds."""
+        if end_date < start_date:
+            raise ValueError("end_date must be >= start_date")
+        if isinstance(node, dict):
+            node = compile_composite(node)
+        stamps = self._stamps({ref.rule_id for ref in composite_refs(node)})
+        return self._evaluate(node, start_date.toordinal(), end_date.toordinal(), stamps)
+
+    # -------------------------------------------------------
+    def _stamps(self, codes: Set[str]) -> Dict[str, Tuple]:
+        """Per referenced rule: (pk, updated_at, event count, max id, id sum, first start, last end)."""
+        rows = self.db.execute(
+            select(
+                Rule.rule_id, Rule.id, Rule.updated_at,
+                func.count(RuleEvent.id), func.max(RuleEvent.id), func.sum(RuleEvent.id),
+                func.min(RuleEvent.start_date),
+                func.max(func.coalesce(RuleEvent.end_date, RuleEvent.start_date)),
+            )
+            .outerjoin(RuleEvent, and_(RuleEvent.rule_id == Rule.id, RuleEvent.provider == self.provider))
+            .where(Rule.rule_id.in_(list(codes)))
+            .group_by(Rule.id)
+        ).all()
+        stamps = {r[0]: tuple(r[1:]) for r in rows}
+        missing = codes - set(stamps)
+        if missing:
+            raise ValueError(f"Unknown rules: {', '.join(sorted(missing))}")
+        return stamps
+
+    def _evaluate(self, node: CompositeNode, lo: int, hi: int, stamps: Dict[str, Tuple]) -> IntervalSet:
+        codes = sorted({ref.rule_id for ref in composite_refs(node)})
+        key = (node, self.provider, lo, hi, tuple(stamps[c] for c in codes))
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        if isinstance(node, CompiledRuleRef):
+            result = self._reference(node, lo, hi, stamps[node.rule_id][0])
+        elif node.op == "not":
+            result = self._evaluate(node.args[0], lo, hi, stamps).complement(lo, hi)
+        elif node.op == "and":
+            parts = []
+            for arg in node.args:
+                part = self._evaluate(arg, lo, hi, stamps)
+                if not len(part):
+                    break  # empty intersection: skip the remaining branches
+                parts.append(part)
+            result = IntervalSet.intersect(parts) if len(parts) == len(node.args) else IntervalSet()
+        else:
+            result = IntervalSet.union([self._evaluate(arg, lo, hi, stamps) for arg in node.args])
+
+        self.cache.put(key, result)
+        return result
+
+    def _reference(self, ref: CompiledRuleRef, lo: int, hi: int, rule_pk: int) -> IntervalSet:
+        window = ref.started_within if ref.started_within is not None else ref.ended_within
+        reach = date.fromordinal(lo) - timedelta(days=window or 0)
+        rows = self.db.execute(
+            select(RuleEvent.start_date, RuleEvent.end_date)
+            .where(
+                RuleEvent.rule_id == rule_pk,
+                RuleEvent.provider == self.provider,
+                RuleEvent.start_date <= date.fromordinal(hi),
+                func.coalesce(RuleEvent.end_date, RuleEvent.start_date) >= reach,
+            )
+        ).all()
+        starts = np.array([s.toordinal() for s, _ in rows], dtype=np.int64)
+        ends = np.array([(e or s).toordinal() for s, e in rows], dtype=np.int64)
+        if ref.started_within is not None:
+            intervals = IntervalSet(starts, starts + ref.started_within)
+        elif ref.ended_within is not None:
+            intervals = IntervalSet(ends, ends + ref.ended_within)
+        else:
+            intervals = IntervalSet(starts, ends)
+        return intervals.clip(lo, hi)
+
+
+# -----------------------------------------------------------
+# Reference checks and ordering
+# -----------------------------------------------------------
+def referenced_codes(composite: Optional[Dict[str, Any]]) -> Set[str]:
+    return {ref.rule_id for ref in composite_refs(compile_composite(composite))}
+
+
+def check_references(db: Session, rule_code: str, composite: Dict[str, Any]) -> None:
+    """Raise ValueError when ``composite`` (for rule ``rule_code``) references unknown rules or itself."""
+    pending = referenced_codes(composite)
+    definitions = dict(db.execute(select(Rule.rule_id, Rule.composite).where(Rule.rule_id.in_(pending))).all())
+    missing = pending - set(definitions)
+    if missing:
+        raise ValueError(f"Unknown rules: {', '.join(sorted(missing))}")
+    seen: Set[str] = set()
+    while pending:
+        if rule_code in pending:
+            raise ValueError(f"Composite rule {rule_code} references itself")
+        seen |= pending
+        nested = set()
+        for code in pending:
+            nested |= referenced_codes(definitions.get(code))
+        nested -= seen
+        if nested:
+            definitions.update(db.execute(
+                select(Rule.rule_id, Rule.composite).where(Rule.rule_id.in_(nested))
+            ).all())
+        pending = nested
+
+
+def dependency_order(rules: Sequence[Any]) -> List[Any]:
+    """Composite rules ordered so each comes after the composites of the batch it references."""
+    by_code = {r.rule_id: r for r in rules}
+    ordered: List[Any] = []
+    state: Dict[str, int] = {}  # 1 visiting, 2 done
+
+    def visit(rule: Any) -> None:
+        if state.get(rule.rule_id) == 2:
+            return
+        if state.get(rule.rule_id) == 1:
+            raise ValueError(f"Composite rules reference each other in a cycle ({rule.rule_id})")
+        state[rule.rule_id] = 1
+        for code in sorted(referenced_codes(rule.composite)):
+            if code in by_code:
+                visit(by_code[code])
+        state[rule.rule_id] = 2
+        ordered.append(rule)
+
+    for rule in rules:
+        visit(rule)
+    return ordered
@@ -0,0 +1,101 @@
+# backend/app/core/analysis/condition_intervals.py
+"""
+Condition Interval Cache
+------------------------
+Per-condition results over a date span, persisted in ``condition_interval_cache``
+so an edited rule is re-evaluated incrementally: only conditions whose content
+changed are computed, every other condition is read back and re-intersected
+(see EventGeneratorService.regenerate_incremental).
+
+An entry is keyed by a SHA-256 over the canonical condition key
+(planet, relation, target, orb, value) plus everything its result depends on:
+astro provider, ayanamsa, exchange (evaluation instant) and trading calendar.
+It stores the days on which the condition holds as merged day intervals, with
+the span that was evaluated; an entry answers any request inside its span.
+Conditions are identified by content, not by row id, so the new Condition rows
+written by a PUT still hit the entries of their unchanged conditions. The table
+is bounded by settings.condition_cache_max_entries (least recently used evicted).
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.analysis.interval_algebra import IntervalSet
+from app.core.db.models_analysis import ConditionIntervalCacheEntry
+from app.core.market.trading_calendar import TradingCalendar
+from app.core.rules.engine.compiled_rules import CompiledCondition
+from app.core.services.job_service import compress_result, decompress_result
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.eventgen.conditions")
+
+
+def condition_hash(cond: CompiledCondition, provider: str, exchange: Optional[str],
+                   calendar: Optional[TradingCalendar]) -> str:
+    key = {
+        "condition": list(cond.key),
+        "provider": provider,
+        "ayanamsa": os.getenv("ASTRO_AYANAMSA_MODE", "lahiri").lower(),
+        "exchange": exchange,
+        "calendar": calendar.name if calendar is not None else None,
+    }
+    canonical = json.dumps(key, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ConditionIntervals:
+    """Condition results for one generator configuration, read from / written to the cache table."""
+
+    def __init__(self, db: Session, engine: Any, provider: str, exchange: Optional[str] = None,
+                 calendar: Optional[TradingCalendar] = None):
+        self.db = db
+        self.engine = engine
+        self.provider = provider
+        self.exchange = exchange
+        self.calendar = calendar
+        self.computed = 0
+        self.reused = 0
+
+    def series(self, cond: CompiledCondition, days: Sequence[date], instants: Sequence[Any]) -> np.ndarray:
+        """Bool array of ``cond`` over ``days`` (evaluated at ``instants``), cached by condition hash."""
+        key = condition_hash(cond, self.provider, self.exchange, self.calendar)
+        ordinals = np.array([d.toordinal() for d in days], dtype=np.int64)
+        entry = self.db.get(ConditionIntervalCacheEntry, key)
+        if entry is not None and entry.start_date <= days[0] and entry.end_date >= days[-1]:
+            starts, ends = decompress_result(entry.intervals_blob)
+            entry.last_used_at = datetime.utcnow()
+            self.reused += 1
+            return IntervalSet(starts, ends, normalized=True).mask(ordinals)
+
+        values = self.engine.condition_series(cond, instants)
+        true_days = ordinals[values]
+        intervals = IntervalSet(true_days, true_days)
+        blob, _ = compress_result([intervals.starts.tolist(), intervals.ends.tolist()])
+        now = datetime.utcnow()
+        self.db.merge(ConditionIntervalCacheEntry(
+            cache_key=key, start_date=days[0], end_date=days[-1], intervals_blob=blob,
+            created_at=now, last_used_at=now,
+        ))
+        self.computed += 1
+        return values
+
+
+def evict(db: Session) -> int:
+    """Drop least recently used entries beyond settings.condition_cache_max_entries."""
+    doomed: List[str] = list(db.execute(
+        select(ConditionIntervalCacheEntry.cache_key)
+        .order_by(ConditionIntervalCacheEntry.last_used_at.desc())
+        .offset(settings.condition_cache_max_entries)
+    ).scalars())
+    if doomed:
+        db.execute(delete(ConditionIntervalCacheEntry).where(ConditionIntervalCacheEntry.cache_key.in_(doomed)))
+        logger.info(f"🧹 Evicted {len(doomed)} condition interval cache entries")
+    return len(doomed)
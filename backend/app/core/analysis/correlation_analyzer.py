@@ -1,147 +1,230 @@
 # backend/app/core/analysis/correlation_analyzer.py
-from datetime import datetime, timedelta, date
+from datetime import timedelta, date
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
-import pandas as pd
 import numpy as np
 
 from app.core.market.factories.provider_factory import get_market_provider
+from app.core.market.interfaces.i_market_data_provider import IMarketDataProvider
+from app.core.analysis.forward_returns import get_forward_return_matrix, get_series_forward_returns
 from app.core.common.config import settings
 from app.core.common.logger import setup_logger
 
 logger = setup_logger(settings.log_level)
 
 
-def _compute_horizon_return_from_df(df: pd.DataFrame, entry_date: date, horizon: int) -> Optional[float]:
+def _horizon_stats(values: np.ndarray) -> Dict[str, Any]:
+    """Summary statistics for directional returns of one horizon (NaNs ignored)."""
+    arr = values[~np.isnan(values)]
+    if arr.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(arr.size),
+        "hit_rate": float((arr > 0).sum() / arr.size),
+        "avg_return": float(arr.mean()),
+        "median_return": float(np.median(arr)),
+        "std_return": float(arr.std(ddof=0))
+    }
+
+
+@dataclass
+class CorrelationArrays:
     """
-    Given a DataFrame indexed by dates and an entry_date, return % change between entry row and row at horizon days later.
-    If insufficient data, returns None.
+    Per-event forward returns in columnar form, events grouped by rule (first-seen order).
+    ``rets[i, j]`` is the return of event i at horizon ``horizons[j]`` (NaN if unavailable).
     """
-    if df is None or df.empty:
-        return None
-
-    # ensure index is datetime and sorted
-    df = df.sort_index()
-    # find first index >= entry_date
-    idx = df.index
-    # use string slice in case index contains times
+    ticker: str
+    horizons: List[int]
+    rule_ids: List[str]                 # distinct rules, in group order
+    names: List[str]
+    bounds: np.ndarray                  # rule k owns events bounds[k]:bounds[k+1]
+    entry_dates: np.ndarray             # datetime64[D]
+    directions: np.ndarray              # +1 bullish / -1 otherwise
+    weights: np.ndarray                 # weight x confidence
+    rets: np.ndarray
+
+    @property
+    def dir_rets(self) -> np.ndarray:
+        return self.rets * self.directions[:, None]
+
+    def __len__(self) -> int:
+        return len(self.entry_dates)
+
+    def rule_slices(self):
+        for k, rid in enumerate(self.rule_ids):
+            yield rid, self.names[k], slice(int(self.bounds[k]), int(self.bounds[k + 1]))
+
+
+def _resolve_horizon_unit(horizon_unit: Optional[str]) -> str:
+    horizon_unit = (horizon_unit or settings.horizon_unit or "trading").lower()
+    if horizon_unit not in ("trading", "calendar"):
+        raise ValueError(f"Unknown horizon unit: {horizon_unit}")
+    return horizon_unit
+
+
+def compute_correlation_arrays(events: List[Dict[str, Any]],
+                               ticker: str,
+                               lookahead_days: List[int] = [1, 3, 5],
+                               market_provider_type: Optional[str] = None,
+                               horizon_unit: Optional[str] = None) -> CorrelationArrays:
+    """Fetch prices once and look up every event's forward returns as arrays (no per-event dicts)."""
+    if market_provider_type is None:
+        market_provider_type = settings.market_provider_type
+    horizon_unit = _resolve_horizon_unit(horizon_unit)
+    horizons = list(lookahead_days)
+
+    # group events by rule_id (stable, first-seen rule order)
+    group_of: Dict[str, int] = {}
+    names: List[str] = []
+    codes = np.empty(len(events), dtype=np.int64)
+    for i, ev in enumerate(events):
+        rid = ev.get("rule_id")
+        k = group_of.get(rid)
+        if k is None:
+            k = group_of[rid] = len(names)
+            names.append(ev.get("name") or rid)
+        codes[i] = k
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(names) + 1), side="left")
+
+    entry_dates = np.array([str(ev["date"])[:10] for ev in events], dtype="datetime64[D]")[order]
+    directions = np.array(
+        [1.0 if str(ev.get("effect", "")).lower() == "bullish" else -1.0 for ev in events], dtype=float
+    )[order]
+    weights = np.array(
+        [float(ev.get("weight", 1.0)) * float(ev.get("confidence", 1.0)) for ev in events], dtype=float
+    )[order]
+
+    arrays = CorrelationArrays(
+        ticker=ticker, horizons=horizons, rule_ids=list(group_of), names=names, bounds=bounds,
+        entry_dates=entry_dates, directions=directions, weights=weights,
+        rets=np.full((len(events), len(horizons)), np.nan),
+    )
+    if not len(events):
+        return arrays
+
+    arrays.rets = forward_returns_for_dates(entry_dates, ticker, horizons, market_provider_type, horizon_unit)
+    return arrays
+
+
+def forward_returns_for_dates(entry_dates: np.ndarray,
+                              ticker: str,
+                              horizons: List[int],
+                              market_provider_type: Optional[str] = None,
+                              horizon_unit: Optional[str] = None) -> np.ndarray:
+    """(dates x horizons) forward returns of ``ticker`` from each datetime64[D] entry date (NaN if unavailable)."""
+    if market_provider_type is None:
+        market_provider_type = settings.market_provider_type
+    horizon_unit = _resolve_horizon_unit(horizon_unit)
+    if not len(entry_dates):
+        return np.full((0, len(horizons)), np.nan)
+    provider = get_market_provider(market_provider_type)
+    min_date = entry_dates.min().astype(date)
+    max_date = entry_dates.max().astype(date)
+    max_h = max(horizons)
+    # exits lie past the last entry (trading horizons span ~7/5 calendar days each)
+    margin_days = (max_h * 7) // 5 + 10 if horizon_unit == "trading" else max_h + 10
     try:
-        window = df.loc[str(entry_date):]
-    except Exception:
-        window = df[df.index >= pd.to_datetime(entry_date)]
+        if isinstance(provider, IMarketDataProvider):
+            # one matrix over the provider's full series per data_version, sliced by row below
+            frm = get_series_forward_returns(provider, ticker, max_date + timedelta(days=margin_days), max_h,
+                                             provider_key=market_provider_type)
+        else:
+            # ad-hoc providers without a data_version: fetch the span and key on its content
+            prices_df = provider.fetch_data(ticker, min_date, max_date + timedelta(days=margin_days))
+            frm = get_forward_return_matrix(ticker, prices_df, max_h, provider_key=market_provider_type)
+    except Exception as ex:
+        logger.error(f"Failed to fetch market data for {ticker}: {ex}")
+        raise
+
+    # (events x horizons) lookups by index into the precomputed matrix
+    if horizon_unit == "calendar":
+        return frm.lookup_calendar_days(entry_dates, horizons)
+    return frm.lookup(frm.rows_for(entry_dates), horizons)
+
+
+CORRELATION_DETAIL_LEVELS = ("full", "sample", "summary")
+DEFAULT_SAMPLE_SIZE = 20
+
 
-    if window.empty:
-        return None
-    # entry price is first available on or after entry_date
-    entry_price = window["Adj Close"].iloc[0]
-    # need horizon-th subsequent row (horizon=1 => next trading day)
-    if len(window) <= horizon:
-        return None
-    exit_price = window["Adj Close"].iloc[horizon]
-    return (exit_price / entry_price) - 1.0
+def _sample_indices(n: int, k: int) -> np.ndarray:
+    """Up to k evenly spaced indices over n events (first and last always included)."""
+    if n <= k:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, k).round().astype(int))
+
+
+def _records(arrays: CorrelationArrays, dir_rets: np.ndarray, indices: np.ndarray) -> List[Dict[str, Any]]:
+    """Per-event record dicts for the given (global) event indices."""
+    entry_dates = arrays.entry_dates[indices].astype(object)
+    records = []
+    for pos, i in enumerate(indices):
+        rec = {"entry_date": entry_dates[pos], "direction": int(arrays.directions[i]),
+               "weight": float(arrays.weights[i])}
+        for j, h in enumerate(arrays.horizons):
+            r = arrays.rets[i, j]
+            rec[f"ret_{h}d"] = None if np.isnan(r) else float(r)
+            rec[f"dir_ret_{h}d"] = None if np.isnan(r) else float(dir_rets[i, j])
+        records.append(rec)
+    return records
 
 
 def analyze_correlation(events: List[Dict[str, Any]],
                         ticker: str,
                         lookahead_days: List[int] = [1, 3, 5],
-                        market_provider_type: Optional[str] = None) -> Dict[str, Any]:
+                        market_provider_type: Optional[str] = None,
+                        horizon_unit: Optional[str] = None,
+                        detail: str = "full",
+                        sample_size: int = DEFAULT_SAMPLE_SIZE) -> Dict[str, Any]:
     """
     Compute per-rule and aggregate statistics for each lookahead horizon.
 
+    ``horizon_unit`` is "trading" (h trading sessions later, default) or "calendar"
+    (first session on or after h calendar days later); defaults to settings.horizon_unit.
+
+    ``detail`` controls the per-event records of each rule:
+      "full"    - every event (default)
+      "sample"  - up to ``sample_size`` evenly spaced events per rule
+      "summary" - no records at all; only counts and stats are computed
+
     Returns:
       {
         "ticker": ticker,
         "lookahead_days": [...],
-        "per_rule": { rule_id: { "name":..., "count":n, "stats": {h: {...}} } },
+        "per_rule": { rule_id: { "name":..., "count":n, "records": [...], "stats": {h: {...}} } },
         "aggregate": { h: {...} }
       }
     """
-    if market_provider_type is None:
-        market_provider_type = settings.market_provider_type
-
-    provider = get_market_provider(market_provider_type)
-
-    # prepare dates span to fetch price series once (min start to max needed)
-    # gather entry dates
-    entry_dates = [datetime.fromisoformat(e["date"]).date() for e in events] if events else []
-    if not entry_dates:
+    _resolve_horizon_unit(horizon_unit)
+    detail = (detail or "full").lower()
+    if detail not in CORRELATION_DETAIL_LEVELS:
+        raise ValueError(f"Unknown detail level: {detail}")
+    if not events:
         return {"ticker": ticker, "lookahead_days": lookahead_days, "per_rule": {}, "aggregate": {}}
 
-    min_date = min(entry_dates)
-    max_date = max(entry_dates)
-    max_h = max(lookahead_days)
-    # fetch price data with a margin of some days
-    try:
-        prices_df = provider.fetch_data(ticker, min_date, max_date + timedelta(days=max_h + 10))
-    except Exception as ex:
-        logger.error(f"Failed to fetch market data for {ticker}: {ex}")
-        raise
-
-    # group events by rule_id
-    per_rule_events: Dict[str, List[Dict[str, Any]]] = {}
-    for ev in events:
-        rid = ev.get("rule_id")
-        per_rule_events.setdefault(rid, []).append(ev)
+    arrays = compute_correlation_arrays(events, ticker, lookahead_days, market_provider_type, horizon_unit)
+    dir_rets = arrays.dir_rets
 
     per_rule_results: Dict[str, Any] = {}
-    # Collect aggregate directional returns across all rules for each horizon
-    aggregate_collection: Dict[int, List[float]] = {h: [] for h in lookahead_days}
-
-    for rid, evs in per_rule_events.items():
-        name = evs[0].get("name") or rid
-        records = []
-        for ev in evs:
-            entry_date = datetime.fromisoformat(ev["date"]).date()
-            direction = 1 if (ev.get("effect", "").lower() == "bullish") else -1
-            weight = float(ev.get("weight", 1.0)) * float(ev.get("confidence", 1.0))
-            rec = {"entry_date": entry_date, "direction": direction, "weight": weight}
-            for h in lookahead_days:
-                r = _compute_horizon_return_from_df(prices_df, entry_date, h)
-                rec[f"ret_{h}d"] = r
-                rec[f"dir_ret_{h}d"] = (r * direction) if r is not None else None
-                if r is not None:
-                    aggregate_collection[h].append(rec[f"dir_ret_{h}d"])
-            records.append(rec)
-
+    for rid, name, sl in arrays.rule_slices():
+        drets = dir_rets[sl]
         # compute stats for this rule, per horizon
-        stats_for_rule = {}
-        df = pd.DataFrame(records)
-        for h in lookahead_days:
-            col = f"dir_ret_{h}d"
-            if col in df.columns:
-                valid = df[col].dropna()
-                count = int(valid.count())
-                if count == 0:
-                    stats_for_rule[h] = {"count": 0}
-                else:
-                    stats_for_rule[h] = {
-                        "count": count,
-                        "hit_rate": float((valid > 0).sum() / count),
-                        "avg_return": float(valid.mean()),
-                        "median_return": float(valid.median()),
-                        "std_return": float(valid.std(ddof=0))
-                    }
-            else:
-                stats_for_rule[h] = {"count": 0}
-        per_rule_results[rid] = {"name": name, "count": len(records), "records": records, "stats": stats_for_rule}
+        stats_for_rule = {h: _horizon_stats(drets[:, j]) for j, h in enumerate(lookahead_days)}
+        entry = {"name": name, "count": sl.stop - sl.start}
+        if detail == "full":
+            entry["records"] = _records(arrays, dir_rets, np.arange(sl.start, sl.stop))
+        elif detail == "sample":
+            entry["records"] = _records(arrays, dir_rets, sl.start + _sample_indices(sl.stop - sl.start, sample_size))
+        entry["stats"] = stats_for_rule
+        per_rule_results[rid] = entry
 
     # aggregate stats across all rules
-    aggregate_stats = {}
-    for h in lookahead_days:
-        arr = np.array(aggregate_collection.get(h, []), dtype=float)
-        if arr.size == 0:
-            aggregate_stats[h] = {"count": 0}
-        else:
-            aggregate_stats[h] = {
-                "count": int(arr.size),
-                "hit_rate": float((arr > 0).sum() / arr.size),
-                "avg_return": float(arr.mean()),
-                "median_return": float(np.median(arr)),
-                "std_return": float(arr.std(ddof=0))
-            }
+    aggregate_stats = {h: _horizon_stats(dir_rets[:, j]) for j, h in enumerate(lookahead_days)}
 
     return {
         "ticker": ticker,
         "lookahead_days": lookahead_days,
+        "detail": detail,
         "per_rule": per_rule_results,
         "aggregate": aggregate_stats
     }
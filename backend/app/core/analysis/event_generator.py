@@ -1,11 +1,26 @@
 from datetime import timedelta, date
-from typing import List, Optional
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 
 from app.core.db.models_analysis import RuleEvent, DurationType, EventSubtype
 from app.core.db.models import Rule
 from app.core.astro.factories.provider_factory import get_provider as get_astro_provider
+from app.core.astro.ingress_calendar import AstroCalendar
+from app.core.astro.interfaces.i_astro_provider import IAstroProvider
+from app.core.astro.providers.cached_provider import CachedAstroProvider
 from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+from app.core.rules.engine.compiled_rules import CompiledRule, compiled_rules
+from app.core.rules.engine.condition_memo import ConditionMemo, shared_condition_keys
+from app.core.rules.engine.expression import rule_mask
+from app.core.analysis.composite_rules import CompositeEvaluator
+from app.core.analysis import condition_intervals
+from app.core.market.trading_calendar import TradingCalendar
+from app.core.market.exchanges import evaluation_instant, get_exchange
+from app.core.services.activity_index import activity_index, bump_events_version
+from app.core.services.astro_calendar import astro_calendars
+from app.core.analysis import signal_materializer
+from app.core.common.config import settings
 
 import logging
 logger = logging.getLogger("astro.eventgen")
@@ -16,73 +31,115 @@ class EventGeneratorService:
     Detect periods/points, generate RuleEvent entries, and persist them.
     """
 
-    def __init__(self, db_session: Session, astro_provider_name: str = "swisseph"):
+    # how often (in calendar days) generate_for_rule reports progress
+    PROGRESS_EVERY_DAYS = 30
+
+    def __init__(self, db_session: Session, astro_provider_name: str = "swisseph",
+                 calendar: Optional[TradingCalendar] = None, exchange: Optional[str] = None,
+                 astro_calendar: Optional[AstroCalendar] = None):
         self.db = db_session
+        # ingress calendar of the provider (default: the stored one, see _make_provider)
+        self.astro_calendar = astro_calendar
         self.astro_provider_name = astro_provider_name
-        self.astro = get_astro_provider(astro_provider_name)
+        self.calendar = calendar
+        # evaluate at the exchange's session open instead of the bare date (midnight UTC)
+        self.exchange = get_exchange(exchange).code if exchange else None
+        self.astro = self._make_provider(astro_provider_name)
         logger.info("EventGeneratorService initialized provider=%s", self.astro_provider_name)
         logger.debug("Using astro provider: %s", getattr(self.astro, "__class__", type(self.astro)))
         self.rules_engine = RulesEngineImpl(self.astro)
+        # results of conditions shared between rules, over _memo_span (see share_conditions)
+        self.condition_memo: Optional[ConditionMemo] = None
+        self._memo_span: Optional[Tuple[date, date]] = None
+
+    def share_conditions(self, rules: Sequence[Rule], start_date: date, end_date: date) -> int:
+        """
+        Prepare cross-rule deduplication for detecting ``rules`` over [start_date, end_date]:
+        conditions present in several of them are evaluated once per day and reused by
+        the following ``detect_events`` calls on the same range. Returns the number of
+        shared conditions.
+        """
+        keys = shared_condition_keys(compiled_rules.get(r) for r in rules)
+        n_days = sum(1 for _ in self._daterange(start_date, end_date, self.calendar))
+        self.condition_memo = ConditionMemo(keys, n_days) if keys else None
+        self._memo_span = (start_date, end_date) if keys else None
+        if keys:
+            logger.info("Sharing %d conditions across %d rules", len(keys), len(rules))
+        return len(keys)
+
+    def clear_shared_conditions(self) -> None:
+        self.condition_memo = None
+        self._memo_span = None
 
     @staticmethod
-    def _daterange(start_date: date, end_date: date):
+    def _daterange(start_date: date, end_date: date, calendar: Optional[TradingCalendar] = None):
+        """Yield each calendar day, or only trading sessions when a calendar is given."""
+        if calendar is not None:
+            yield from calendar.sessions(start_date, end_date)
+            return
         current = start_date
         while current <= end_date:
             yield current
             current += timedelta(days=1)
 
-    def generate_for_rule(
+    @staticmethod
+    def _subtype(duration: int) -> EventSubtype:
+        return (
+            EventSubtype.instant
+            if duration == 1
+            else EventSubtype.transient if duration <= 3 else EventSubtype.period
+        )
+
+    def _event_row(self, rule: Rule, start: date, end: date, context) -> Dict[str, Any]:
+        duration = (end - start).days + 1
+        return dict(
+            rule_id=rule.id,
+            start_date=start,
+            end_date=end,
+            duration_type=DurationType.interval if duration > 1 else DurationType.point,
+            event_subtype=self._subtype(duration),
+            provider=self.astro_provider_name,
+            metadata_json=context or {},
+        )
+
+    def detect_events(
         self,
-        rule_id: int,
+        rule: Rule,
         start_date: date,
         end_date: date,
-        provider: Optional[str] = None,
-        overwrite: bool = False,
-    ) -> List[RuleEvent]:
-        """Generate and persist RuleEvent rows for the specified rule."""
-        logger.info(f"🚀 Starting generation for rule_id={rule_id}, "
-                    f"provider={provider}, overwrite={overwrite}")
-        logger.info("generate_for_rule: rule_id=%s start=%s end=%s provider=%s overwrite=%s",
-            rule_id, start_date.isoformat(), end_date.isoformat(), provider, overwrite)
-        if provider:
-            self.astro = get_astro_provider(provider)
-            self.rules_engine = RulesEngineImpl(self.astro)
-            self.astro_provider_name = provider
-
-        rule = self.db.query(Rule).filter(Rule.id == rule_id).one_or_none()
-        if not rule:
-            logger.error(f"❌ Rule {rule_id} not found in database")
-            raise ValueError(f"Rule {rule_id} not found")
-        logger.debug("Loaded rule from DB: id=%s rule_id=%s name=%s", rule.id, rule.rule_id, rule.name)
-
-        if overwrite:
-            logger.info(f"🧹 Deleting existing events overlapping {start_date} → {end_date}")
-            q = (
-                self.db.query(RuleEvent)
-                .filter(RuleEvent.rule_id == rule.id)
-                .filter(RuleEvent.start_date <= end_date)
-                .filter((RuleEvent.end_date == None) | (RuleEvent.end_date >= start_date))
-            )
-            deleted = q.delete(synchronize_session="fetch")
-            self.db.commit()
-            logger.info(f"🗑️  Deleted {deleted} existing events")
-
-        events_to_create = []
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate ``rule`` over the range and return RuleEvent column dicts for each
+        detected period/point. Pure computation: nothing is read from or written to the DB.
+        """
+        compiled = compiled_rules.get(rule)
+        memo = self.condition_memo if self._memo_span == (start_date, end_date) else None
+        if compiled.expression is not None:
+            return self._detect_with_masks(compiled, start_date, end_date, memo, progress)
+        rows: List[Dict[str, Any]] = []
         active_start = None
         last_true = None
         context_last = None
 
-        for dt in self._daterange(start_date, end_date):
+        total_days = (end_date - start_date).days + 1
+        for i, dt in enumerate(self._daterange(start_date, end_date, self.calendar)):
+            if progress is not None and (dt - start_date).days % self.PROGRESS_EVERY_DAYS == 0:
+                progress((dt - start_date).days, total_days)
             try:
                 logger.debug("Evaluating rule for date %s", dt.isoformat())
-                result = self.rules_engine.evaluate_rule(rule, dt)
+                when = evaluation_instant(dt, self.exchange) if self.exchange else dt
+                if memo is None:
+                    result = self.rules_engine.evaluate_rule(compiled, when)
+                else:
+                    result = self.rules_engine.evaluate_rule(compiled, when, memo=memo.at(i))
                 logger.debug("Evaluate result for %s -> %s", dt.isoformat(), result)
                 if isinstance(result, tuple):
                     is_true, context = result
                 else:
                     is_true, context = result, None
             except Exception as e:
-                logger.exception(f"⚠️  Error evaluating rule {rule_id} on {dt}: {e}")
+                logger.exception(f"⚠️  Error evaluating rule {rule.id} on {dt}: {e}")
                 continue
 
             if is_true and active_start is None:
@@ -94,55 +151,297 @@ class EventGeneratorService:
                 last_true = dt
                 context_last = context
             elif not is_true and active_start is not None:
-                duration = (last_true - active_start).days + 1
-                subtype = (
-                    EventSubtype.instant
-                    if duration == 1
-                    else EventSubtype.transient if duration <= 3 else EventSubtype.period
-                )
-                evt = RuleEvent(
-                    rule_id=rule_id,
-                    start_date=active_start,
-                    end_date=last_true,
-                    duration_type=DurationType.interval if duration > 1 else DurationType.point,
-                    event_subtype=subtype,
-                    provider=self.astro_provider_name,
-                    metadata_json=context_last or {},
-                )
-                logger.info("Detected event for rule %s start=%s end=%s duration=%d subtype=%s",
-                rule.rule_id, active_start, last_true, duration, subtype)
-                events_to_create.append(evt)
-                logger.info(f"🧩 Added event: {active_start}–{last_true}, subtype={subtype.name}")
+                row = self._event_row(rule, active_start, last_true, context_last)
+                logger.info("Detected event for rule %s start=%s end=%s subtype=%s",
+                            rule.rule_id, active_start, last_true, row["event_subtype"])
+                rows.append(row)
                 active_start = None
                 last_true = None
                 context_last = None
 
         # If still active till end of range
         if active_start is not None:
-            duration = (end_date - active_start).days + 1
-            subtype = (
-                EventSubtype.instant
-                if duration == 1
-                else EventSubtype.transient if duration <= 3 else EventSubtype.period
-            )
-            evt = RuleEvent(
-                rule_id=rule_id,
-                start_date=active_start,
-                end_date=end_date,
-                duration_type=DurationType.interval if duration > 1 else DurationType.point,
-                event_subtype=subtype,
-                provider=self.astro_provider_name,
-                metadata_json=context_last or {},
+            rows.append(self._event_row(rule, active_start, end_date, context_last))
+        return rows
+
+    def _detect_with_masks(
+        self,
+        rule: CompiledRule,
+        start_date: date,
+        end_date: date,
+        memo: Optional[ConditionMemo],
+        progress: Optional[Callable[[int, int], None]],
+    ) -> List[Dict[str, Any]]:
+        """Expression rules: whole-range packed bitmasks per leaf, combined with bitwise ops."""
+        days = list(self._daterange(start_date, end_date, self.calendar))
+        total_days = (end_date - start_date).days + 1
+        if progress is not None:
+            progress(0, total_days)
+        instants = [evaluation_instant(dt, self.exchange) if self.exchange else dt for dt in days]
+        active = rule_mask(self.rules_engine, rule, instants, memo)
+        rows = [self._event_row(rule, s, e, None) for s, e in self._runs(days, active, end_date)]
+        logger.info("Detected %d events for expression rule %s", len(rows), rule.rule_id)
+        return rows
+
+    @staticmethod
+    def _runs(days: Sequence[date], active: np.ndarray, end_date: date) -> List[Tuple[date, date]]:
+        """(start, end) of each run of consecutive active evaluation days."""
+        edges = np.diff(np.concatenate(([0], active.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        # still active at the end of the range: the event runs to end_date
+        return [(days[s], end_date if e == len(days) - 1 else days[e]) for s, e in zip(starts, ends)]
+
+    def detect_composite_events(self, rule: Rule, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """
+        Composite rules: RuleEvent column dicts for the days on which the composite
+        holds, computed from the referenced rules' persisted events (needs the DB session).
+        """
+        compiled = compiled_rules.get(rule)
+        intervals = CompositeEvaluator(self.db, self.astro_provider_name).evaluate(
+            compiled.composite, start_date, end_date
+        )
+        rows = [self._event_row(rule, s, e, None) for s, e in intervals.to_dates()]
+        logger.info("Detected %d events for composite rule %s", len(rows), rule.rule_id)
+        return rows
+
+    def _make_provider(self, provider: str) -> IAstroProvider:
+        """
+        ``provider`` over its ingress calendar when one was built (sign, nakshatra and
+        retrograde checks become lookups), else the bare provider.
+        """
+        calendar = self.astro_calendar
+        if calendar is None or calendar.provider != provider:
+            if self.db is not None:
+                # calendars built by a background job (or before this process started) are picked up here
+                astro_calendars.refresh(self.db)
+            calendar = astro_calendars.get(provider)
+        astro = get_astro_provider(provider)
+        return CachedAstroProvider(astro, calendar=calendar) if calendar is not None else astro
+
+    def _use_provider(self, provider: str) -> None:
+        self.astro = self._make_provider(provider)
+        self.rules_engine = RulesEngineImpl(self.astro)
+        self.astro_provider_name = provider
+        self.clear_shared_conditions()
+
+    def _load_rule(self, rule_id: int) -> Rule:
+        rule = self.db.query(Rule).filter(Rule.id == rule_id).one_or_none()
+        if not rule:
+            logger.error(f"❌ Rule {rule_id} not found in database")
+            raise ValueError(f"Rule {rule_id} not found")
+        logger.debug("Loaded rule from DB: id=%s rule_id=%s name=%s", rule.id, rule.rule_id, rule.name)
+        return rule
+
+    def generate_for_rule(
+        self,
+        rule_id: int,
+        start_date: date,
+        end_date: date,
+        provider: Optional[str] = None,
+        overwrite: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[RuleEvent]:
+        """
+        Generate and persist RuleEvent rows for the specified rule.
+        ``progress(done_days, total_days)`` is called periodically while evaluating
+        (it may raise to abort the run; detection runs before the overwrite delete,
+        and the delete, the new events and the signal refresh commit together, so an
+        aborted or failed run leaves the stored events and signals as they were).
+        """
+        logger.info(f"🚀 Starting generation for rule_id={rule_id}, "
+                    f"provider={provider}, overwrite={overwrite}")
+        logger.info("generate_for_rule: rule_id=%s start=%s end=%s provider=%s overwrite=%s",
+            rule_id, start_date.isoformat(), end_date.isoformat(), provider, overwrite)
+        if provider:
+            self._use_provider(provider)
+        rule = self._load_rule(rule_id)
+
+        # detect first: an abort (progress raising) or a failure leaves the stored events untouched
+        if rule.composite:
+            rows = self.detect_composite_events(rule, start_date, end_date)
+        else:
+            rows = self.detect_events(rule, start_date, end_date, progress)
+        events_to_create = [RuleEvent(**row) for row in rows]
+
+        signal_window = [start_date, end_date]
+        if overwrite:
+            logger.info(f"🧹 Deleting existing events overlapping {start_date} → {end_date}")
+            q = (
+                self.db.query(RuleEvent)
+                .filter(RuleEvent.rule_id == rule.id)
+                .filter(RuleEvent.start_date <= end_date)
+                .filter((RuleEvent.end_date == None) | (RuleEvent.end_date >= start_date))
             )
-            events_to_create.append(evt)
+            # deleted intervals may reach outside the range; their days need re-materializing too
+            for s, e in q.with_entities(RuleEvent.start_date, RuleEvent.end_date).all():
+                signal_window = [min(signal_window[0], s), max(signal_window[1], e or s)]
+            deleted = q.delete(synchronize_session="fetch")
+            logger.info(f"🗑️  Deleting {deleted} existing events")
 
-        if events_to_create:
-            self.db.add_all(events_to_create)
+        try:
+            if events_to_create:
+                self.db.add_all(events_to_create)
+                self.db.flush()
+            if settings.materialize_signals and (events_to_create or overwrite):
+                # same transaction as the delete and the events, so the signal table never lags behind them
+                signal_materializer.refresh_signals(
+                    self.db, signal_window[0], signal_window[1], self.astro_provider_name, commit=False
+                )
+            version = bump_events_version(self.db) if (events_to_create or overwrite) else None
             self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        if events_to_create:
             logger.info(f"💾 Persisted {len(events_to_create)} events for rule_id={rule_id}")
             for e in events_to_create:
                 self.db.refresh(e)
         else:
-            logger.warning(f"⚠️ No events detected for rule_id={rule_id}")
+            logger.warning(f"⚠️ No events detected for rule_id={rule.rule_id}")
+        if version is not None:
+            # the in-memory index only follows what was committed
+            with activity_index.writing(version) as current:
+                if current:
+                    if overwrite:
+                        activity_index.remove_rule_events(rule.id, start_date, end_date)
+                    activity_index.add_events(events_to_create, rule_code=rule.rule_id)
 
         return events_to_create
+
+    def regenerate_incremental(
+        self,
+        rule_id: int,
+        start_date: date,
+        end_date: date,
+        provider: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Bring the rule's events over [start_date, end_date] up to date after an edit,
+        without a full overwrite:
+          - each condition's result comes from the condition interval cache, so only
+            new or changed conditions are evaluated; the rule is then re-intersected
+            from the per-condition masks (composites are re-read from their references)
+          - existing events are diffed against the new intervals: an event overlapping
+            a new interval is extended / shrunk in place, unmatched events are deleted
+            and unmatched intervals inserted; identical events are left untouched.
+            Only the part of an event inside the window is regenerated: an event
+            crossing a window edge keeps its days outside the window.
+        Returns counts of inserted / updated / deleted / unchanged events and of
+        computed / cached conditions.
+        """
+        if end_date < start_date:
+            raise ValueError("end_date must be >= start_date")
+        if provider:
+            self._use_provider(provider)
+        rule = self._load_rule(rule_id)
+
+        conditions = condition_intervals.ConditionIntervals(
+            self.db, self.rules_engine, self.astro_provider_name, self.exchange, self.calendar
+        )
+        first_day = start_date
+        if rule.composite:
+            target = [(r["start_date"], r["end_date"]) for r in self.detect_composite_events(rule, start_date, end_date)]
+        else:
+            days = list(self._daterange(start_date, end_date, self.calendar))
+            instants = [evaluation_instant(dt, self.exchange) if self.exchange else dt for dt in days]
+            target = []
+            if days:
+                active = rule_mask(self.rules_engine, compiled_rules.get(rule), instants,
+                                   series=lambda cond: conditions.series(cond, days, instants))
+                target = self._runs(days, active, end_date)
+                first_day = days[0]
+
+        summary = self._apply_event_diff(rule, target, start_date, end_date, first_day)
+        summary.update(conditions_computed=conditions.computed, conditions_cached=conditions.reused)
+        logger.info("♻️  Incremental regeneration for rule %s: %s", rule.rule_id, summary)
+        return summary
+
+    @staticmethod
+    def _extend_across_edges(target: List[Tuple[date, date]], existing: List[RuleEvent],
+                             start_date: date, end_date: date, first_day: date) -> List[Tuple[date, date]]:
+        """
+        ``target`` covers the window only; carry the days of events crossing a window
+        edge back in. An interval starting on the first evaluated day (or ending on
+        ``end_date``) continues the crossing event; otherwise the crossing event keeps
+        just its part outside the window.
+        """
+        target = list(target)
+        left = next((e for e in existing if e.start_date < start_date), None)
+        if left is not None:
+            if target and target[0][0] <= first_day:
+                target[0] = (left.start_date, target[0][1])
+            else:
+                target.insert(0, (left.start_date, start_date - timedelta(days=1)))
+        right = next((e for e in reversed(existing) if (e.end_date or e.start_date) > end_date), None)
+        if right is not None:
+            if target and target[-1][1] >= end_date:
+                target[-1] = (target[-1][0], right.end_date)
+            else:
+                target.append((end_date + timedelta(days=1), right.end_date))
+        return target
+
+    def _apply_event_diff(self, rule: Rule, target: List[Tuple[date, date]],
+                          start_date: date, end_date: date, first_day: Optional[date] = None) -> Dict[str, Any]:
+        """Make the rule's events overlapping the range equal to ``target`` with minimal row changes."""
+        existing = (
+            self.db.query(RuleEvent)
+            .filter(RuleEvent.rule_id == rule.id)
+            .filter(RuleEvent.provider == self.astro_provider_name)
+            .filter(RuleEvent.start_date <= end_date)
+            .filter((RuleEvent.end_date == None) | (RuleEvent.end_date >= start_date))
+            .order_by(RuleEvent.start_date)
+            .all()
+        )
+        target = self._extend_across_edges(target, existing, start_date, end_date, first_day or start_date)
+        counts = dict(rule_id=rule.rule_id, inserted=0, updated=0, deleted=0, unchanged=0)
+        changed: List[Tuple[date, date]] = []   # spans whose signals need re-materializing
+        kept: List[RuleEvent] = []
+        i = 0
+        for start, end in target:
+            # events entirely before this interval match nothing
+            while i < len(existing) and (existing[i].end_date or existing[i].start_date) < start:
+                self.db.delete(existing[i])
+                changed.append((existing[i].start_date, existing[i].end_date or existing[i].start_date))
+                counts["deleted"] += 1
+                i += 1
+            if i < len(existing) and existing[i].start_date <= end:
+                event = existing[i]
+                i += 1
+                if (event.start_date, event.end_date) == (start, end):
+                    counts["unchanged"] += 1
+                else:
+                    changed.append((min(event.start_date, start), max(event.end_date or event.start_date, end)))
+                    row = self._event_row(rule, start, end, None)
+                    for col in ("start_date", "end_date", "duration_type", "event_subtype"):
+                        setattr(event, col, row[col])
+                    counts["updated"] += 1
+                kept.append(event)
+            else:
+                event = RuleEvent(**self._event_row(rule, start, end, None))
+                self.db.add(event)
+                changed.append((start, end))
+                counts["inserted"] += 1
+                kept.append(event)
+        for event in existing[i:]:
+            self.db.delete(event)
+            changed.append((event.start_date, event.end_date or event.start_date))
+            counts["deleted"] += 1
+
+        self.db.flush()
+        if changed and settings.materialize_signals:
+            signal_materializer.refresh_signals(
+                self.db, min(s for s, _ in changed), max(e for _, e in changed), self.astro_provider_name, commit=False
+            )
+        condition_intervals.evict(self.db)
+        # in-place extends / shrinks change neither the row count nor the ids
+        version = bump_events_version(self.db) if changed else None
+        self.db.commit()
+
+        if version is not None:
+            with activity_index.writing(version) as current:
+                if current:
+                    activity_index.remove_rule_events(rule.id, start_date, end_date, self.astro_provider_name)
+                    activity_index.add_events(kept, rule_code=rule.rule_id)
+        return counts
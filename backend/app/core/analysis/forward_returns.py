@@ -0,0 +1,214 @@
+# backend/app/core/analysis/forward_returns.py
+"""
+Forward-Return Matrix
+---------------------
+Precomputes forward returns for horizons 1..N trading days from a price series,
+as a 2-D array aligned to the series' trading dates. Correlation runs look up
+any horizon by row/column index instead of re-slicing the price frame per event.
+
+Matrices are cached per (provider, ticker). ``get_series_forward_returns``
+builds one matrix over the provider's full series and reuses it for any span
+inside it until the provider's ``data_version`` for the ticker changes (or a
+longer horizon / a later end is requested); callers slice it by row index.
+``get_forward_return_matrix`` caches a matrix over a DataFrame the caller
+fetched, keyed by a content fingerprint.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import logging
+logger = logging.getLogger("astro.forward_returns")
+
+PRICE_COLUMN = "Adj Close"
+MAX_CACHED_MATRICES = 64
+# first day requested when loading a provider's full series
+SERIES_START = date(1900, 1, 1)
+
+
+def _to_day_index(index) -> np.ndarray:
+    """Normalize a DataFrame index to a numpy datetime64[D] array."""
+    idx = pd.DatetimeIndex(pd.to_datetime(index))
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.normalize().values.astype("datetime64[D]")
+
+
+def series_fingerprint(df: Optional[pd.DataFrame], column: str = PRICE_COLUMN) -> str:
+    """Cheap content hash of a price series; changes whenever dates or prices change."""
+    if df is None or df.empty or column not in df.columns:
+        return "empty"
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_to_day_index(df.index).tobytes())
+    h.update(np.ascontiguousarray(df[column].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+class ForwardReturnMatrix:
+    """
+    Forward returns for one price series.
+
+    ``matrix[i, h - 1]`` is the return from the close on ``dates[i]`` to the close
+    ``h`` trading rows later, or NaN when the series ends before that row.
+    """
+
+    def __init__(self, dates: np.ndarray, prices: np.ndarray, max_horizon: int, fingerprint: str = ""):
+        self.dates = dates
+        self.prices = prices
+        self.max_horizon = int(max_horizon)
+        self.fingerprint = fingerprint
+        # set for full-series matrices: provider data_version and the last day fetched
+        self.version: Optional[str] = None
+        self.fetched_until: Optional[date] = None
+
+        n = len(prices)
+        self.matrix = np.full((n, self.max_horizon), np.nan, dtype=float)
+        for h in range(1, min(self.max_horizon, n - 1) + 1):
+            self.matrix[: n - h, h - 1] = prices[h:] / prices[: n - h] - 1.0
+
+    @classmethod
+    def from_prices(cls, df: pd.DataFrame, max_horizon: int, column: str = PRICE_COLUMN) -> "ForwardReturnMatrix":
+        """Build a matrix from a price DataFrame indexed by date (at least ``column``)."""
+        fingerprint = series_fingerprint(df, column)
+        if df is None or df.empty or column not in df.columns:
+            return cls(np.array([], dtype="datetime64[D]"), np.array([], dtype=float), max_horizon, fingerprint)
+        df = df.sort_index()
+        return cls(_to_day_index(df.index), df[column].to_numpy(dtype=float), max_horizon, fingerprint)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def rows_for(self, entry_dates: Iterable[date]) -> np.ndarray:
+        """
+        Row index of the first trading date on or after each entry date.
+        Rows equal to ``len(self)`` mean the entry date is past the end of the series.
+        """
+        days = np.array([np.datetime64(d, "D") for d in entry_dates], dtype="datetime64[D]")
+        return np.searchsorted(self.dates, days, side="left")
+
+    def lookup(self, rows: np.ndarray, horizons: Sequence[int]) -> np.ndarray:
+        """Return a (len(rows), len(horizons)) array of forward returns (NaN where unavailable)."""
+        rows = np.asarray(rows, dtype=int)
+        cols = np.asarray(horizons, dtype=int) - 1
+        out = np.full((len(rows), len(cols)), np.nan, dtype=float)
+        if len(self) == 0 or len(rows) == 0:
+            return out
+        valid_rows = rows < len(self)
+        valid_cols = (cols >= 0) & (cols < self.max_horizon)
+        if valid_rows.any() and valid_cols.any():
+            out[np.ix_(valid_rows, valid_cols)] = self.matrix[np.ix_(rows[valid_rows], cols[valid_cols])]
+        return out
+
+    def lookup_calendar_days(self, entry_dates: Sequence[date], horizons: Sequence[int]) -> np.ndarray:
+        """
+        Like ``lookup`` but with horizons in calendar days: the exit price is the first
+        trading close on or after ``entry_date + h`` days.
+        """
+        days = np.array([np.datetime64(d, "D") for d in entry_dates], dtype="datetime64[D]")
+        out = np.full((len(days), len(horizons)), np.nan, dtype=float)
+        if len(self) == 0 or len(days) == 0:
+            return out
+        entry_rows = np.searchsorted(self.dates, days, side="left")
+        for j, h in enumerate(horizons):
+            exit_rows = np.searchsorted(self.dates, days + np.timedelta64(int(h), "D"), side="left")
+            valid = (entry_rows < len(self)) & (exit_rows < len(self)) & (exit_rows > entry_rows)
+            out[valid, j] = self.prices[exit_rows[valid]] / self.prices[entry_rows[valid]] - 1.0
+        return out
+
+    def forward_return(self, entry_date: date, horizon: int) -> Optional[float]:
+        """Single-event convenience lookup; None when the return is unavailable."""
+        value = self.lookup(self.rows_for([entry_date]), [horizon])[0, 0]
+        return None if np.isnan(value) else float(value)
+
+
+_cache: "OrderedDict[Tuple[str, str], ForwardReturnMatrix]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_forward_return_matrix(
+    ticker: str,
+    prices_df: pd.DataFrame,
+    max_horizon: int,
+    provider_key: str = "",
+) -> ForwardReturnMatrix:
+    """
+    Return the cached matrix for (provider_key, ticker), rebuilding it if the price
+    series changed or ``max_horizon`` exceeds what was computed before.
+    """
+    key = (provider_key or "", ticker)
+    fingerprint = series_fingerprint(prices_df)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached.fingerprint == fingerprint and cached.max_horizon >= max_horizon:
+            _cache.move_to_end(key)
+            return cached
+
+    logger.debug("Building forward-return matrix ticker=%s provider=%s max_horizon=%d", ticker, provider_key, max_horizon)
+    built = ForwardReturnMatrix.from_prices(prices_df, max_horizon)
+    with _cache_lock:
+        _cache[key] = built
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_MATRICES:
+            _cache.popitem(last=False)
+    return built
+
+
+def get_series_forward_returns(
+    provider,
+    ticker: str,
+    end: date,
+    max_horizon: int,
+    provider_key: str = "",
+) -> ForwardReturnMatrix:
+    """
+    Matrix over ``provider``'s full series for ``ticker`` (an IMarketDataProvider),
+    fetched once from SERIES_START and reused for any entry dates up to ``end``
+    while ``provider.data_version(ticker)`` is unchanged. Rebuilt when the version
+    changes, ``max_horizon`` grows, or ``end`` is past what was fetched.
+    """
+    key = (provider_key or "", ticker)
+    version = provider.data_version(ticker)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached.version != version:
+            cached = None
+        if (cached is not None and cached.max_horizon >= max_horizon
+                and cached.fetched_until is not None and end <= cached.fetched_until):
+            _cache.move_to_end(key)
+            return cached
+
+    fetch_until = max(end, date.today(), cached.fetched_until if cached is not None else end)
+    max_horizon = max(max_horizon, cached.max_horizon if cached is not None else 0)
+    logger.debug("Building full-series forward-return matrix ticker=%s provider=%s version=%s max_horizon=%d",
+                 ticker, provider_key, version, max_horizon)
+    built = ForwardReturnMatrix.from_prices(provider.fetch_data(ticker, SERIES_START, fetch_until), max_horizon)
+    built.version = version
+    built.fetched_until = fetch_until
+    with _cache_lock:
+        _cache[key] = built
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_MATRICES:
+            _cache.popitem(last=False)
+    return built
+
+
+def invalidate_forward_returns(ticker: Optional[str] = None) -> None:
+    """Drop cached matrices for one ticker (all providers), or everything when ticker is None."""
+    with _cache_lock:
+        if ticker is None:
+            _cache.clear()
+            return
+        for key in [k for k in _cache if k[1] == ticker]:
+            del _cache[key]
+
+
+def cached_tickers() -> List[Tuple[str, str]]:
+    """Keys of matrices currently held in the cache (for inspection/tests)."""
+    with _cache_lock:
+        return list(_cache.keys())
@@ -0,0 +1,125 @@
+# backend/app/core/analysis/interval_algebra.py
+"""
+Interval Algebra
+----------------
+Sets of calendar days stored as sorted, disjoint, inclusive [start, end] day
+ordinals (``date.toordinal()``), with vectorised union / intersection /
+complement.
+
+Every operation is one coverage sweep: each interval contributes +1 at its start
+and -1 the day after its end, the cumulative sum gives how many input sets cover
+each stretch, and the result is the stretches covered at least ``threshold``
+times (1 for a union, the number of sets for an intersection). Adjacent days
+merge, so [1, 3] + [4, 5] is [1, 5].
+"""
+
+from datetime import date
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _coverage(starts: np.ndarray, ends: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    if not len(starts):
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    points = np.concatenate((starts, ends + 1))
+    deltas = np.concatenate((np.ones(len(starts), dtype=np.int64), -np.ones(len(ends), dtype=np.int64)))
+    positions, inverse = np.unique(points, return_inverse=True)
+    summed = np.zeros(len(positions), dtype=np.int64)
+    np.add.at(summed, inverse, deltas)
+    # covered holds for [positions[i], positions[i + 1] - 1]
+    covered = np.cumsum(summed)[:-1] >= threshold
+    edges = np.diff(np.concatenate(([0], covered.astype(np.int8), [0])))
+    first = np.flatnonzero(edges == 1)
+    last = np.flatnonzero(edges == -1)  # exclusive segment index
+    return positions[first], positions[last] - 1
+
+
+class IntervalSet:
+    """Immutable set of days as sorted, disjoint, inclusive ordinal intervals."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: Iterable[int] = (), ends: Iterable[int] = (), normalized: bool = False):
+        s = np.asarray(list(starts) if not isinstance(starts, np.ndarray) else starts, dtype=np.int64)
+        e = np.asarray(list(ends) if not isinstance(ends, np.ndarray) else ends, dtype=np.int64)
+        if len(s) != len(e):
+            raise ValueError("starts and ends must have the same length")
+        if not normalized:
+            keep = e >= s
+            s, e = _coverage(s[keep], e[keep], 1)
+        self.starts = s
+        self.ends = e
+
+    @classmethod
+    def from_dates(cls, pairs: Iterable[Tuple[date, Optional[date]]]) -> "IntervalSet":
+        """From (start, end) date pairs; a missing end is a single day."""
+        pairs = list(pairs)
+        return cls([s.toordinal() for s, _ in pairs], [(e or s).toordinal() for s, e in pairs])
+
+    # -------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, IntervalSet)
+                and np.array_equal(self.starts, other.starts) and np.array_equal(self.ends, other.ends))
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({self.to_dates()!r})"
+
+    @property
+    def days(self) -> int:
+        """Number of days covered."""
+        return int((self.ends - self.starts + 1).sum())
+
+    def to_dates(self) -> List[Tuple[date, date]]:
+        return [(date.fromordinal(int(s)), date.fromordinal(int(e))) for s, e in zip(self.starts, self.ends)]
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        """Bool array: whether each day ordinal is in the set."""
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        i = np.searchsorted(self.starts, ordinals, side="right") - 1
+        inside = i >= 0
+        inside[inside] = ordinals[inside] <= self.ends[i[inside]]
+        return inside
+
+    def contains(self, day: date) -> bool:
+        i = int(np.searchsorted(self.starts, day.toordinal(), side="right")) - 1
+        return i >= 0 and day.toordinal() <= self.ends[i]
+
+    # -------------------------------------------------------
+    def clip(self, lo: int, hi: int) -> "IntervalSet":
+        """Restrict to the ordinal window [lo, hi]."""
+        keep = (self.ends >= lo) & (self.starts <= hi)
+        return IntervalSet(np.maximum(self.starts[keep], lo), np.minimum(self.ends[keep], hi), normalized=True)
+
+    def widen(self, before: int = 0, after: int = 0) -> "IntervalSet":
+        """Extend every interval by ``before`` days earlier and ``after`` days later."""
+        return IntervalSet(self.starts - before, self.ends + after)
+
+    def complement(self, lo: int, hi: int) -> "IntervalSet":
+        """Days of [lo, hi] not in the set."""
+        inner = self.clip(lo, hi)
+        starts = np.concatenate(([lo], inner.ends + 1))
+        ends = np.concatenate((inner.starts - 1, [hi]))
+        keep = ends >= starts
+        return IntervalSet(starts[keep], ends[keep], normalized=True)
+
+    @staticmethod
+    def union(sets: Sequence["IntervalSet"]) -> "IntervalSet":
+        return IntervalSet.covered_by(sets, 1)
+
+    @staticmethod
+    def intersect(sets: Sequence["IntervalSet"]) -> "IntervalSet":
+        return IntervalSet.covered_by(sets, len(sets))
+
+    @staticmethod
+    def covered_by(sets: Sequence["IntervalSet"], threshold: int) -> "IntervalSet":
+        """Days covered by at least ``threshold`` of the (normalized) sets."""
+        if not sets or threshold > len(sets):
+            return IntervalSet()
+        starts, ends = _coverage(
+            np.concatenate([s.starts for s in sets]), np.concatenate([s.ends for s in sets]), threshold
+        )
+        return IntervalSet(starts, ends, normalized=True)
@@ -0,0 +1,281 @@
+# backend/app/core/analysis/parameter_sweep.py
+"""
+Parameter Sweep
+---------------
+Backtests every combination of a rule template's parameters in one run, instead
+of one full correlation run per orb value:
+
+    template: {"planet": "mars", "relation": "square_with", "target": "saturn",
+               "effect": "Bullish", "conditions": [...fixed conditions...]}
+    grid:     {"orbs": [1, 2, 3, 5], "angles": [...], "targets": ["saturn", "rahu"]}
+    horizons: [1, 3, 5]
+
+Each evaluation day is an event of the grid point when the swept condition (and
+every fixed condition) holds, exactly as the per-day rule evaluation would
+produce it; statistics match ``analyze_correlation``'s per-rule stats.
+
+Work is shared across the grid:
+  - longitudes of every planet involved are computed once for all days
+    (CachedAstroProvider batches) and fixed conditions become one base mask
+  - forward returns of all days are looked up once from the forward-return matrix
+  - angular relations (conjunct, axis, aspects) become vectorized masks:
+    ``|separation - angle| <= orb`` over the whole range per grid point, with
+    the separation computed once per target
+  - grid points are spread across worker processes (settings.sweep_workers);
+    each worker receives the shared arrays once through the pool initializer.
+Other relations (sign, nakshatra, retrograde, ...) sweep targets / orbs through
+their relation handlers on the cached sky state, in-process.
+"""
+
+import itertools
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.astro.factories.provider_factory import get_provider as get_astro_provider
+from app.core.astro.providers.cached_provider import CachedAstroProvider
+from app.core.db.enums import Relation
+from app.core.analysis.correlation_analyzer import _horizon_stats, forward_returns_for_dates
+from app.core.market.exchanges import evaluation_instant
+from app.core.market.trading_calendar import TradingCalendar, get_trading_calendar
+from app.core.rules.engine.compiled_rules import compile_condition
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.sweep")
+
+# default orb of the rules engine (RulesEngineImpl orb_default)
+DEFAULT_ORB = 5.0
+
+# relations whose check is |separation - angle| <= orb; None = angle from the condition value
+ANGULAR_RELATIONS: Dict[Relation, Optional[float]] = {
+    Relation.conjunct_with: 0.0,
+    Relation.in_axis: 180.0,
+    Relation.aspect_with: None,
+    Relation.opposition_with: 180.0,
+    Relation.trine_with: 120.0,
+    Relation.square_with: 90.0,
+    Relation.sextile_with: 60.0,
+    Relation.quincunx_with: 150.0,
+    Relation.semisextile_with: 30.0,
+    Relation.semisquare_with: 45.0,
+    Relation.quintile_with: 72.0,
+    Relation.sesquiquadrate_with: 135.0,
+}
+# these handlers ignore the condition value, so their angle cannot be swept
+FIXED_ANGLE_RELATIONS = {Relation.conjunct_with, Relation.in_axis}
+
+# progress(done_points, total_points)
+ProgressCallback = Callable[[int, int], None]
+
+
+def separation(lon_a: np.ndarray, lon_b: np.ndarray) -> np.ndarray:
+    """Shortest angular distance in degrees (0..180), elementwise."""
+    return np.abs((lon_a - lon_b + 180.0) % 360.0 - 180.0)
+
+
+def grid_points(template: Dict[str, Any], grid: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every (target, angle, orb) combination; an empty grid axis keeps the template's value."""
+    relation = _relation(template["relation"])
+    angles = list(grid.get("angles") or [])
+    if angles and relation in FIXED_ANGLE_RELATIONS:
+        raise ValueError(f"{relation.name} has a fixed angle; sweep orbs or targets instead")
+    return [
+        {"target": t, "angle": a, "orb": o}
+        for t, a, o in itertools.product(
+            list(grid.get("targets") or []) or [template.get("target")],
+            angles or [template.get("value")],
+            list(grid.get("orbs") or []) or [template.get("orb")],
+        )
+    ]
+
+
+def _relation(raw: str) -> Relation:
+    try:
+        return Relation[raw]
+    except KeyError:
+        raise ValueError(f"Unknown relation: {raw}")
+
+
+def _point_angle(relation: Relation, value: Optional[float]) -> Optional[float]:
+    # the aspect handlers prefer the condition value over their own angle
+    if relation not in FIXED_ANGLE_RELATIONS and value is not None:
+        return float(value)
+    return ANGULAR_RELATIONS[relation]
+
+
+def _point_orb(relation: Relation, orb: Optional[float]) -> float:
+    if relation is Relation.in_axis:
+        return orb or DEFAULT_ORB  # AxisHandler treats orb 0 as unset
+    return DEFAULT_ORB if orb is None else float(orb)
+
+
+# -----------------------------------------------------------
+# Grid point statistics (in-process or in workers)
+# -----------------------------------------------------------
+_shared: Dict[str, Any] = {}
+
+
+def _init_sweep_worker(shared: Dict[str, Any]) -> None:
+    global _shared
+    _shared = shared
+
+
+def _point_stats(mask: np.ndarray, rets: np.ndarray, direction: float, horizons: Sequence[int]) -> Dict[str, Any]:
+    dir_rets = rets[mask] * direction
+    return {
+        "active_days": int(mask.sum()),
+        "stats": {h: _horizon_stats(dir_rets[:, j]) for j, h in enumerate(horizons)},
+    }
+
+
+def _angular_chunk(points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Stats for angular grid points from the shared separation arrays (runs in workers)."""
+    s = _shared
+    out = []
+    for p in points:
+        deviation = np.abs(s["separations"][p["target"]] - p["angle_deg"])
+        mask = (deviation <= p["orb_deg"]) & s["base"]
+        out.append({**p["point"], **_point_stats(mask, s["rets"], s["direction"], s["horizons"])})
+    return out
+
+
+# -----------------------------------------------------------
+# Sweep
+# -----------------------------------------------------------
+def _evaluation_days(start: date, end: date, calendar: Optional[TradingCalendar]) -> List[date]:
+    if calendar is not None:
+        return list(calendar.sessions(start, end))
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def run_sweep(
+    template: Dict[str, Any],
+    grid: Dict[str, Any],
+    start_date: date,
+    end_date: date,
+    ticker: str,
+    horizons: Sequence[int] = (1, 3, 5),
+    horizon_unit: Optional[str] = None,
+    calendar: Optional[TradingCalendar] = None,
+    provider: Optional[str] = None,
+    market_provider_type: Optional[str] = None,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Correlation stats for every grid point of ``template`` over [start_date, end_date].
+    Returns {"ticker", "horizons", "days", "points": [{target, angle, orb, active_days, stats}]}
+    with points in grid order.
+    """
+    if end_date < start_date:
+        raise ValueError("end_date must be >= start_date")
+    horizons = list(horizons)
+    relation = _relation(template["relation"])
+    points = grid_points(template, grid)
+    direction = 1.0 if str(template.get("effect") or "Bullish").lower() == "bullish" else -1.0
+    days = _evaluation_days(start_date, end_date, calendar)
+    instants = [evaluation_instant(d) for d in days]
+    logger.info("Sweep %s %s over %d days: %d grid points", template.get("planet"), relation.name, len(days), len(points))
+
+    # shared sky state: every planet of the template, the targets and the fixed conditions
+    sky = CachedAstroProvider(get_astro_provider(provider or settings.provider_type))
+    engine = RulesEngineImpl(sky)
+    engine.stats = None  # stored condition order, no statistics
+    fixed = [compile_condition(SimpleNamespace(**{"orb": None, "value": None, "target": None, **c}))
+             for c in template.get("conditions") or []]
+    planets = {template["planet"], *(p["target"] for p in points if p["target"])}
+    planets |= {c.planet for c in fixed if c.planet} | {c.target for c in fixed if c.target}
+    sky.prime(instants, [p.lower() for p in planets if p] + ["sun"])
+
+    base = np.ones(len(days), dtype=bool)
+    for cond in fixed:
+        base &= engine.condition_series(cond, instants)
+    rets = forward_returns_for_dates(np.array(days, dtype="datetime64[D]"), ticker, horizons,
+                                     market_provider_type, horizon_unit)
+
+    if relation in ANGULAR_RELATIONS:
+        results = _sweep_angular(template, relation, points, sky, instants, base, rets, direction,
+                                 horizons, workers, progress)
+    else:
+        results = []
+        for i, p in enumerate(points):
+            cond = compile_condition(SimpleNamespace(planet=template["planet"], relation=relation.name,
+                                                     target=p["target"], orb=p["orb"], value=p["angle"]))
+            mask = engine.condition_series(cond, instants) & base
+            results.append({**p, **_point_stats(mask, rets, direction, horizons)})
+            if progress is not None:
+                progress(i + 1, len(points))
+
+    return {
+        "ticker": ticker,
+        "planet": template["planet"],
+        "relation": relation.name,
+        "horizons": horizons,
+        "days": len(days),
+        "points": results,
+    }
+
+
+def _sweep_angular(template, relation, points, sky, instants, base, rets, direction,
+                   horizons, workers, progress) -> List[Dict[str, Any]]:
+    planet_lons = sky.longitudes(template["planet"].lower(), instants)
+    separations = {
+        t: separation(planet_lons, sky.longitudes(t.lower(), instants))
+        for t in {p["target"] for p in points if p["target"]}
+    }
+    tasks = []
+    for p in points:
+        angle = _point_angle(relation, p["angle"])
+        if angle is None or not p["target"]:
+            raise ValueError(f"{relation.name} needs a target and an angle (template value or angles grid)")
+        tasks.append({"point": p, "target": p["target"], "angle_deg": angle, "orb_deg": _point_orb(relation, p["orb"])})
+
+    shared = {"separations": separations, "base": base, "rets": rets, "direction": direction, "horizons": horizons}
+    workers = settings.sweep_workers if workers is None else workers
+    if workers <= 0:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, len(tasks) or 1))
+    chunk = max(1, math.ceil(len(tasks) / (workers * 4)))
+    chunks = [tasks[k: k + chunk] for k in range(0, len(tasks), chunk)]
+
+    results: List[Dict[str, Any]] = []
+    if workers == 1:
+        _init_sweep_worker(shared)
+        for c in chunks:
+            results.extend(_angular_chunk(c))
+            if progress is not None:
+                progress(len(results), len(tasks))
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_sweep_worker,
+        initargs=(shared,),
+    ) as pool:
+        # map keeps grid order
+        for out in pool.map(_angular_chunk, chunks):
+            results.extend(out)
+            if progress is not None:
+                progress(len(results), len(tasks))
+    return results
+
+
+def sweep_from_params(params: Dict[str, Any], progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """Run a sweep from request-shaped params (the /correlation/sweep route and the "sweep" job)."""
+    start = date.fromisoformat(params["start_date"])
+    end = date.fromisoformat(params["end_date"])
+    ticker = params.get("ticker") or settings.default_sector_ticker
+    calendar = get_trading_calendar(ticker, start, end) if params.get("trading_days_only") else None
+    return run_sweep(
+        params["template"], params.get("grid") or {}, start, end, ticker,
+        horizons=params.get("horizons") or [1, 3, 5], horizon_unit=params.get("horizon_unit"),
+        calendar=calendar, provider=params.get("provider"), workers=params.get("workers"), progress=progress,
+    )
@@ -0,0 +1,397 @@
+# backend/app/core/analysis/rule_mining.py
+"""
+Rule Mining
+-----------
+Discovers candidate rules by brute force: every single condition of a fixed
+vocabulary and every AND of two of them is backtested against a ticker and
+ranked by how far its directional forward return departs from the ticker's
+unconditional return.
+
+Single-condition candidates:
+  - planet pairs x angular relations (conjunct, axis, named aspects) at one orb
+  - planets x signs
+  - planets x nakshatra owners
+  - planets x retrograde / combust by Sun
+Two-condition candidates are the ANDs of the ``pair_pool`` strongest singles.
+
+Each candidate is a day mask over the range (one evaluation instant per day):
+  - longitudes of every planet are computed once (CachedAstroProvider batches);
+    sign, nakshatra and angular masks are vectorized over those arrays,
+    retrograde / combust go through their relation handlers on the cached sky
+  - single masks are deduplicated by content and stored bit-packed; a pair is
+    ``packed[i] & packed[j]``
+  - statistics of a block of masks are matrix products of the block with the
+    forward-return matrix (sums, squares, up / down counts), so no per-candidate
+    Python loop touches the days
+  - pair blocks are spread across worker processes (settings.mining_workers);
+    each worker receives the packed masks and returns once through the pool
+    initializer and sends back only its best ``top`` pairs.
+
+Every active day counts as one event, as in a per-day evaluation. A candidate's
+effect is the sign of its excess return at the ranking horizon; ``t_stat`` is
+the excess over the unconditional mean divided by its standard error and
+``p_value`` its two-sided normal p-value, ``p_adjusted`` Bonferroni-corrected
+over every candidate evaluated.
+"""
+
+import itertools
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.astro.factories.provider_factory import get_provider as get_astro_provider
+from app.core.astro.providers.cached_provider import CachedAstroProvider
+from app.core.db.enums import Planet, Relation, Sign
+from app.core.analysis.correlation_analyzer import forward_returns_for_dates
+from app.core.analysis.parameter_sweep import ANGULAR_RELATIONS, DEFAULT_ORB, _evaluation_days, separation
+from app.core.market.exchanges import evaluation_instant
+from app.core.market.trading_calendar import TradingCalendar, get_trading_calendar
+from app.core.rules.engine.compiled_rules import compile_condition
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.mining")
+
+# relations evaluated through their handlers (no target)
+HANDLER_RELATIONS = (Relation.retrograde, Relation.combust_by_sun)
+# pair masks statistically evaluated per matrix product
+PAIR_BLOCK = 256
+
+# progress(done, total)
+ProgressCallback = Callable[[int, int], None]
+
+
+# -----------------------------------------------------------
+# Candidate statistics (in-process or in workers)
+# -----------------------------------------------------------
+_shared: Dict[str, Any] = {}
+
+
+def _init_mining_worker(shared: Dict[str, Any]) -> None:
+    global _shared
+    _shared = shared
+
+
+def _return_arrays(rets: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-day matrices whose products with a mask block give the candidates' sums."""
+    valid = ~np.isnan(rets)
+    values = np.where(valid, rets, 0.0)
+    return {
+        "valid": valid.astype(np.float64),
+        "values": values,
+        "squares": values ** 2,
+        "up": (values > 0).astype(np.float64),
+        "down": (values < 0).astype(np.float64),
+    }
+
+
+def _block_stats(masks: np.ndarray, s: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Vectorized stats of a (candidates x days) bool block against the shared returns."""
+    m = masks.astype(np.float64)
+    r = s["returns"]
+    count = m @ r["valid"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (m @ r["values"]) / count
+        variance = np.maximum((m @ r["squares"]) / count - mean ** 2, 0.0)
+        excess = mean - s["base_mean"]
+        t_stat = excess / np.sqrt(variance / (count - 1))
+        direction = np.where(excess[:, s["rank"]] < 0, -1.0, 1.0)
+        hits = np.where(direction[:, None] > 0, m @ r["up"], m @ r["down"]) / count
+    t_stat[~np.isfinite(t_stat)] = 0.0
+    return {
+        "days": masks.sum(axis=1),
+        "count": count,
+        "mean": mean,
+        "excess": excess,
+        "t_stat": t_stat,
+        "direction": direction,
+        "hit_rate": hits,
+        "score": np.abs(t_stat[:, s["rank"]]),
+    }
+
+
+def _take(stats: Dict[str, np.ndarray], keep: np.ndarray) -> Dict[str, np.ndarray]:
+    return {k: v[keep] for k, v in stats.items()}
+
+
+def _best(stats: Dict[str, np.ndarray], top: int) -> np.ndarray:
+    """Indices of the ``top`` highest scores, best first."""
+    order = np.argsort(-stats["score"], kind="stable")
+    return order[:top]
+
+
+def _pair_chunk(bounds: Tuple[int, int]) -> Dict[str, np.ndarray]:
+    """Stats of pairs[lo:hi] (ANDs of packed single masks), keeping the chunk's best (runs in workers)."""
+    s = _shared
+    lo, hi = bounds
+    kept_pairs, kept_stats = [], []
+    for b in range(lo, hi, PAIR_BLOCK):
+        pairs = s["pairs"][b: min(b + PAIR_BLOCK, hi)]
+        packed = s["packed"][pairs[:, 0]] & s["packed"][pairs[:, 1]]
+        masks = np.unpackbits(packed, axis=1, count=s["n"]).astype(bool)
+        stats = _block_stats(masks, s)
+        # enough support, and both conditions narrow the other one down
+        days = stats["days"]
+        keep = ((days >= s["min_days"])
+                & (days < s["single_days"][pairs[:, 0]]) & (days < s["single_days"][pairs[:, 1]]))
+        if keep.any():
+            kept_pairs.append(pairs[keep])
+            kept_stats.append(_take(stats, keep))
+    if not kept_pairs:
+        return {"pairs": np.empty((0, 2), dtype=np.int32), "stats": None}
+    merged = {k: np.concatenate([st[k] for st in kept_stats]) for k in kept_stats[0]}
+    best = _best(merged, s["top"])
+    return {"pairs": np.concatenate(kept_pairs)[best], "stats": _take(merged, best)}
+
+
+# -----------------------------------------------------------
+# Candidate vocabulary
+# -----------------------------------------------------------
+def _condition(planet: str, relation: Relation, target: Optional[str] = None,
+               orb: Optional[float] = None) -> Dict[str, Any]:
+    return {"planet": planet, "relation": relation.name, "target": target, "orb": orb}
+
+
+def single_candidates(sky: CachedAstroProvider, engine: RulesEngineImpl, planets: Sequence[str],
+                      relations: Sequence[Relation], orb: float,
+                      instants: Sequence[Any]) -> List[Tuple[Dict[str, Any], np.ndarray]]:
+    """(condition, day mask) for every single condition of the vocabulary, in a stable order."""
+    lons = {p: sky.longitudes(p, instants) % 360.0 for p in planets}
+    out: List[Tuple[Dict[str, Any], np.ndarray]] = []
+
+    if Relation.in_sign in relations:
+        for p in planets:
+            sign_index = (lons[p] // 30.0).astype(np.int64)
+            for k, sign in enumerate(Sign):
+                out.append((_condition(p, Relation.in_sign, sign.name), sign_index == k))
+
+    if Relation.in_nakshatra_owned_by in relations:
+        owners: Dict[str, List[int]] = {}
+        for k in range(27):
+            owners.setdefault(sky.nakshatra_owner(k).lower(), []).append(k)
+        for p in planets:
+            nak_index = (lons[p] // (360.0 / 27.0)).astype(np.int64)
+            for owner, indices in owners.items():
+                out.append((_condition(p, Relation.in_nakshatra_owned_by, owner), np.isin(nak_index, indices)))
+
+    angular = [r for r in relations if ANGULAR_RELATIONS.get(r) is not None]
+    for a, b in itertools.combinations(planets, 2):
+        if not angular:
+            break
+        sep = separation(lons[a], lons[b])
+        for rel in angular:
+            out.append((_condition(a, rel, b, orb), np.abs(sep - ANGULAR_RELATIONS[rel]) <= orb))
+
+    for rel in (r for r in HANDLER_RELATIONS if r in relations):
+        for p in planets:
+            cond = _condition(p, rel)
+            compiled = compile_condition(SimpleNamespace(**cond, value=None))
+            out.append((cond, engine.condition_series(compiled, instants)))
+    return out
+
+
+def _relations(raw: Optional[Sequence[str]]) -> List[Relation]:
+    if not raw:
+        return [r for r in Relation if r is not Relation.aspect_with and r is not Relation.in_house_relative_to]
+    try:
+        return [Relation[r] for r in raw]
+    except KeyError as e:
+        raise ValueError(f"Unknown relation: {e.args[0]}")
+
+
+def _planets(raw: Optional[Sequence[str]]) -> List[str]:
+    if not raw:
+        return [p.name for p in Planet]
+    try:
+        return [Planet[p.lower()].name for p in raw]
+    except KeyError as e:
+        raise ValueError(f"Unknown planet: {e.args[0]}")
+
+
+# -----------------------------------------------------------
+# Mining
+# -----------------------------------------------------------
+def mine_rules(
+    start_date: date,
+    end_date: date,
+    ticker: str,
+    horizons: Sequence[int] = (1, 3, 5),
+    horizon_unit: Optional[str] = None,
+    calendar: Optional[TradingCalendar] = None,
+    provider: Optional[str] = None,
+    market_provider_type: Optional[str] = None,
+    planets: Optional[Sequence[str]] = None,
+    relations: Optional[Sequence[str]] = None,
+    orb: float = DEFAULT_ORB,
+    min_days: int = 30,
+    pair_pool: int = 300,
+    top: int = 50,
+    rank_horizon: Optional[int] = None,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Best ``top`` single- and two-condition candidates over [start_date, end_date],
+    ranked by |t_stat| of the excess return at ``rank_horizon`` (default: first horizon).
+    """
+    if end_date < start_date:
+        raise ValueError("end_date must be >= start_date")
+    horizons = list(horizons)
+    rank_horizon = horizons[0] if rank_horizon is None else rank_horizon
+    if rank_horizon not in horizons:
+        raise ValueError(f"rank_horizon {rank_horizon} is not one of the horizons")
+    planet_names = _planets(planets)
+    relation_list = _relations(relations)
+    began = time.perf_counter()
+
+    days = _evaluation_days(start_date, end_date, calendar)
+    instants = [evaluation_instant(d) for d in days]
+    sky = CachedAstroProvider(get_astro_provider(provider or settings.provider_type))
+    engine = RulesEngineImpl(sky)
+    engine.stats = None
+    sky.prime(instants, planet_names + ["sun"])
+
+    rets = forward_returns_for_dates(np.array(days, dtype="datetime64[D]"), ticker, horizons,
+                                     market_provider_type, horizon_unit)
+    shared: Dict[str, Any] = {
+        "n": len(days),
+        "returns": _return_arrays(rets),
+        "base_mean": np.nanmean(rets, axis=0) if len(days) else np.zeros(len(horizons)),
+        "rank": horizons.index(rank_horizon),
+        "min_days": min_days,
+        "top": top,
+    }
+
+    # singles: dedupe identical masks (e.g. in_axis == opposition), drop rare / constant ones
+    conditions, masks, seen = [], [], set()
+    for cond, mask in single_candidates(sky, engine, planet_names, relation_list, orb, instants):
+        support = int(mask.sum())
+        key = np.packbits(mask).tobytes()
+        if support < min_days or support == len(days) or key in seen:
+            continue
+        seen.add(key)
+        conditions.append(cond)
+        masks.append(mask)
+    singles = _block_stats(np.array(masks, dtype=bool).reshape(len(masks), len(days)), shared)
+    logger.info("Mining %s over %d days: %d single candidates", ticker, len(days), len(conditions))
+
+    pool = _best(singles, pair_pool)
+    pairs = np.array(list(itertools.combinations(sorted(pool.tolist()), 2)), dtype=np.int32).reshape(-1, 2)
+    shared.update({
+        "packed": np.packbits(np.array(masks, dtype=bool).reshape(len(masks), len(days)), axis=1),
+        "single_days": singles["days"],
+        "pairs": pairs,
+    })
+    pair_results = _mine_pairs(shared, workers, progress)
+
+    evaluated = len(conditions) + len(pairs)
+    ranked = [(float(singles["score"][i]), (int(i),), singles, int(i)) for i in _best(singles, top)]
+    for res in pair_results:
+        for k, (i, j) in enumerate(res["pairs"]):
+            ranked.append((float(res["stats"]["score"][k]), (int(i), int(j)), res["stats"], k))
+    ranked.sort(key=lambda r: -r[0])
+
+    # different condition sets can select the very same days; report each day set once
+    candidates, taken = [], set()
+    for _, members, stats, k in ranked:
+        key = np.bitwise_and.reduce(shared["packed"][list(members)], axis=0).tobytes()
+        if key in taken:
+            continue
+        taken.add(key)
+        candidates.append(_candidate([conditions[i] for i in members], stats, k, horizons, evaluated))
+        if len(candidates) == top:
+            break
+    return {
+        "ticker": ticker,
+        "horizons": horizons,
+        "rank_horizon": rank_horizon,
+        "days": len(days),
+        "singles": len(conditions),
+        "pairs": len(pairs),
+        "evaluated": evaluated,
+        "elapsed_s": round(time.perf_counter() - began, 3),
+        "candidates": candidates,
+    }
+
+
+def _mine_pairs(shared: Dict[str, Any], workers: Optional[int],
+                progress: Optional[ProgressCallback]) -> List[Dict[str, Any]]:
+    total = len(shared["pairs"])
+    if not total:
+        return []
+    workers = settings.mining_workers if workers is None else workers
+    if workers <= 0:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, math.ceil(total / PAIR_BLOCK)))
+    chunk = max(PAIR_BLOCK, math.ceil(total / (workers * 4 * PAIR_BLOCK)) * PAIR_BLOCK)
+    chunks = [(lo, min(lo + chunk, total)) for lo in range(0, total, chunk)]
+
+    results: List[Dict[str, Any]] = []
+    if workers == 1:
+        _init_mining_worker(shared)
+        for c in chunks:
+            results.append(_pair_chunk(c))
+            if progress is not None:
+                progress(c[1], total)
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_mining_worker,
+        initargs=(shared,),
+    ) as pool:
+        for c, out in zip(chunks, pool.map(_pair_chunk, chunks)):
+            results.append(out)
+            if progress is not None:
+                progress(c[1], total)
+    return results
+
+
+def _candidate(conditions: List[Dict[str, Any]], stats: Dict[str, np.ndarray], k: int,
+               horizons: Sequence[int], evaluated: int) -> Dict[str, Any]:
+    direction = float(stats["direction"][k])
+    per_horizon = {}
+    for j, h in enumerate(horizons):
+        t = float(stats["t_stat"][k, j]) * direction
+        p = math.erfc(abs(t) / math.sqrt(2.0))
+        per_horizon[h] = {
+            "count": int(stats["count"][k, j]),
+            "hit_rate": float(stats["hit_rate"][k, j]),
+            "avg_return": float(stats["mean"][k, j]) * direction,
+            "excess_return": float(stats["excess"][k, j]) * direction,
+            "t_stat": t,
+            "p_value": p,
+            "p_adjusted": min(1.0, p * evaluated),
+        }
+    return {
+        "conditions": conditions,
+        "effect": "Bullish" if direction > 0 else "Bearish",
+        "active_days": int(stats["days"][k]),
+        "score": float(stats["score"][k]),
+        "stats": per_horizon,
+    }
+
+
+def mine_from_params(params: Dict[str, Any], progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """Run rule mining from request-shaped params (the /correlation/mine route and the "mine_rules" job)."""
+    start = date.fromisoformat(params["start_date"])
+    end = date.fromisoformat(params["end_date"])
+    ticker = params.get("ticker") or settings.default_sector_ticker
+    calendar = get_trading_calendar(ticker, start, end) if params.get("trading_days_only") else None
+    optional = {k: params[k] for k in ("orb", "min_days", "pair_pool", "top") if params.get(k) is not None}
+    return mine_rules(
+        start, end, ticker,
+        horizons=params.get("horizons") or [1, 3, 5], horizon_unit=params.get("horizon_unit"),
+        calendar=calendar, provider=params.get("provider"),
+        planets=params.get("planets"), relations=params.get("relations"),
+        rank_horizon=params.get("rank_horizon"), workers=params.get("workers"), progress=progress,
+        **optional,
+    )
@@ -0,0 +1,157 @@
+# backend/app/core/analysis/signal_materializer.py
+"""
+Sector Signal Materializer
+--------------------------
+Builds the daily ``sector_signals`` table from persisted RuleEvent intervals:
+per (date, sector, provider) the net score of all active rule outcomes
+(effect x weight x confidence), the number of active rules and the bullish /
+bearish counts.
+
+Intervals are folded in with a vectorized difference-array sweep: each interval
+adds its value at its start day and subtracts it the day after its end, and a
+cumulative sum yields the per-day totals. Refreshes are windowed, so updating
+after a generation run only rewrites the affected days.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Rule, Outcome, Sector
+from app.core.db.models_analysis import RuleEvent, SectorSignal
+
+import logging
+logger = logging.getLogger("astro.signals")
+
+UNASSIGNED_SECTOR = "UNASSIGNED"
+EFFECT_SIGN = {"bullish": 1.0, "bearish": -1.0}
+
+
+def _contributions(db: Session, start: date, end: date, provider: Optional[str]):
+    """One row per (event, outcome) of an enabled rule overlapping [start, end]."""
+    q = (
+        select(
+            RuleEvent.id.label("event_id"),
+            RuleEvent.rule_id,
+            RuleEvent.start_date,
+            RuleEvent.end_date,
+            RuleEvent.provider,
+            Rule.confidence,
+            Outcome.effect,
+            Outcome.weight,
+            Sector.code.label("sector_code"),
+        )
+        .join(Rule, Rule.id == RuleEvent.rule_id)
+        .join(Outcome, Outcome.rule_id == Rule.id)
+        .outerjoin(Sector, Sector.id == Outcome.sector_id)
+        .where(Rule.enabled.isnot(False))
+        .where(RuleEvent.start_date <= end)
+        .where(or_(RuleEvent.end_date >= start, and_(RuleEvent.end_date == None, RuleEvent.start_date >= start)))
+    )
+    if provider:
+        q = q.where(RuleEvent.provider == provider)
+    return db.execute(q).all()
+
+
+def compute_signals(db: Session, start: date, end: date, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Compute signal rows for [start, end] without writing them (days with no activity are omitted)."""
+    rows = _contributions(db, start, end, provider)
+    n_days = (end - start).days + 1
+    if not rows or n_days <= 0:
+        return []
+
+    base = start.toordinal()
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, r in enumerate(rows):
+        groups.setdefault((r.provider, r.sector_code or UNASSIGNED_SECTOR), []).append(i)
+
+    starts = np.array([r.start_date.toordinal() - base for r in rows], dtype=np.int64)
+    ends = np.array([(r.end_date or r.start_date).toordinal() - base for r in rows], dtype=np.int64)
+    s_idx = np.clip(starts, 0, n_days)
+    e_idx = np.clip(ends + 1, 0, n_days)
+    sign = np.array([EFFECT_SIGN.get(str(r.effect or "").lower(), 0.0) for r in rows])
+    value = sign * np.array([r.weight if r.weight is not None else 1.0 for r in rows]) \
+        * np.array([r.confidence if r.confidence is not None else 1.0 for r in rows])
+    # one unit of "active rules" per distinct (event, sector); duplicates of the same pair count once
+    seen = set()
+    active = np.zeros(len(rows))
+    for i, r in enumerate(rows):
+        key = (r.event_id, r.sector_code)
+        if key not in seen:
+            seen.add(key)
+            active[i] = 1.0
+
+    out: List[Dict[str, Any]] = []
+    now = datetime.utcnow()
+    for (prov, sector), members in groups.items():
+        m = np.array(members)
+        # difference arrays: +v at start, -v the day after end; cumsum gives per-day totals
+        diff = np.zeros((4, n_days + 1))
+        for k, weights in enumerate((value[m], active[m], (sign[m] > 0).astype(float), (sign[m] < 0).astype(float))):
+            np.add.at(diff[k], s_idx[m], weights)
+            np.add.at(diff[k], e_idx[m], -weights)
+        totals = np.cumsum(diff[:, :n_days], axis=1)
+        for d in np.nonzero(totals[1] > 0)[0]:
+            out.append(dict(
+                signal_date=date.fromordinal(base + int(d)),
+                sector_code=sector,
+                provider=prov,
+                score=float(round(totals[0, d], 12)),
+                active_rules=int(round(totals[1, d])),
+                bullish=int(round(totals[2, d])),
+                bearish=int(round(totals[3, d])),
+                updated_at=now,
+            ))
+    return out
+
+
+def refresh_signals(db: Session, start: date, end: date, provider: Optional[str] = None, commit: bool = True) -> int:
+    """
+    Recompute and replace materialized signals for [start, end] (optionally one provider).
+    With ``commit=False`` the rewrite joins the caller's transaction.
+    """
+    signals = compute_signals(db, start, end, provider)
+    q = delete(SectorSignal).where(SectorSignal.signal_date >= start).where(SectorSignal.signal_date <= end)
+    if provider:
+        q = q.where(SectorSignal.provider == provider)
+    db.execute(q)
+    if signals:
+        db.execute(insert(SectorSignal), signals)
+    if commit:
+        db.commit()
+    logger.info("Refreshed sector signals %s → %s provider=%s rows=%d", start, end, provider, len(signals))
+    return len(signals)
+
+
+def rule_event_span(db: Session, rule_pk: int) -> Optional[Tuple[date, date]]:
+    """[first start, last end] of a rule's events, or None if it has none."""
+    lo, hi, hi_start = db.execute(
+        select(func.min(RuleEvent.start_date), func.max(RuleEvent.end_date), func.max(RuleEvent.start_date))
+        .where(RuleEvent.rule_id == rule_pk)
+    ).one()
+    if lo is None:
+        return None
+    return lo, max(d for d in (hi, hi_start) if d is not None)
+
+
+def refresh_for_span(db: Session, span: Optional[Tuple[date, date]]) -> int:
+    return refresh_signals(db, span[0], span[1]) if span else 0
+
+
+def query_signals(
+    db: Session,
+    start: date,
+    end: date,
+    sector: Optional[str] = None,
+    provider: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    q = select(SectorSignal).where(SectorSignal.signal_date >= start).where(SectorSignal.signal_date <= end)
+    if sector:
+        q = q.where(SectorSignal.sector_code == sector)
+    if provider:
+        q = q.where(SectorSignal.provider == provider)
+    q = q.order_by(SectorSignal.signal_date, SectorSignal.sector_code, SectorSignal.provider)
+    return [s.to_dict() for s in db.scalars(q).all()]
@@ -0,0 +1,85 @@
+# backend/app/core/astro/aspect_matrix.py
+"""
+Aspect Matrix
+-------------
+Angular distance between every pair of planets at every instant of a range, as
+one (instants x planets x planets) array built by NumPy broadcasting from the
+(instants x planets) longitude array:
+
+    distances[t, i, j] = |(lon[t, i] - lon[t, j] + 180) % 360 - 180|
+
+CachedAstroProvider.prime_aspects installs the rows of a matrix so aspect-type
+relation handlers (conjunction, axis, aspects, combustion) read one element
+instead of fetching two longitudes per check; ``runs`` lists every stretch of
+instants during which a pair holds an aspect, for the aspect grid API.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+def distance_matrix(longitudes: np.ndarray) -> np.ndarray:
+    """(..., planets) longitudes -> (..., planets, planets) shortest angular distances (0..180)."""
+    lon = np.asarray(longitudes, dtype=float)
+    return np.abs((lon[..., :, None] - lon[..., None, :] + 180.0) % 360.0 - 180.0)
+
+
+class AspectMatrix:
+    """All-pairs angular distances of ``planets`` at each of ``instants``."""
+
+    __slots__ = ("planets", "instants", "longitudes", "distances", "_index")
+
+    def __init__(self, planets: Sequence[str], instants: Sequence[Any], longitudes: np.ndarray):
+        self.planets = list(planets)
+        self.instants = list(instants)
+        self.longitudes = np.asarray(longitudes, dtype=float).reshape(len(self.instants), len(self.planets))
+        self.distances = distance_matrix(self.longitudes)
+        self._index = {p: i for i, p in enumerate(self.planets)}
+
+    def index(self, planet: str) -> Optional[int]:
+        return self._index.get(planet)
+
+    def pair(self, a: str, b: str) -> np.ndarray:
+        """Distance series of one pair over all instants."""
+        return self.distances[:, self._index[a], self._index[b]]
+
+    def runs(self, angles: Mapping[str, float], orb: float) -> List[Dict[str, Any]]:
+        """
+        Every maximal stretch of consecutive instants during which a planet pair
+        (i < j) is within ``orb`` of an angle, sorted by start:
+        {"aspect", "angle", "planet", "target", "start", "end", "exact", "min_orb"}
+        where start / end / exact are instant indices (exact = smallest deviation).
+        """
+        n, p = len(self.instants), len(self.planets)
+        upper_i, upper_j = np.triu_indices(p, k=1)
+        pairs = self.distances[:, upper_i, upper_j]           # (instants, pairs)
+        out: List[Dict[str, Any]] = []
+        for name, angle in angles.items():
+            deviation = np.abs(pairs - float(angle))
+            active = deviation <= orb
+            if not active.any():
+                continue
+            padded = np.zeros((n + 2, active.shape[1]), dtype=np.int8)
+            padded[1:-1] = active
+            edges = np.diff(padded, axis=0)
+            starts_t, starts_k = np.nonzero(edges == 1)
+            ends_t, ends_k = np.nonzero(edges == -1)
+            # nonzero is row-major; order both by pair then time so they line up
+            s_order = np.lexsort((starts_t, starts_k))
+            e_order = np.lexsort((ends_t, ends_k))
+            for s, e, k in zip(starts_t[s_order], ends_t[e_order] - 1, starts_k[s_order]):
+                window = deviation[s: e + 1, k]
+                exact = int(s + np.argmin(window))
+                out.append({
+                    "aspect": name,
+                    "angle": float(angle),
+                    "planet": self.planets[upper_i[k]],
+                    "target": self.planets[upper_j[k]],
+                    "start": int(s),
+                    "end": int(e),
+                    "exact": exact,
+                    "min_orb": float(deviation[exact, k]),
+                })
+        out.sort(key=lambda r: (r["start"], r["planet"], r["target"], r["angle"]))
+        return out
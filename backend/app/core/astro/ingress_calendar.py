@@ -0,0 +1,209 @@
+# backend/app/core/astro/ingress_calendar.py
+"""
+Ingress / Station Calendar
+--------------------------
+Per planet, the instants at which its sign, its nakshatra or its retrograde
+state changes over a span, so "which sign / nakshatra / is it retrograde at t"
+becomes a binary search instead of an ephemeris evaluation.
+
+Each kind is a step function stored as two arrays:
+
+    times  = [span_start, t1, t2, ...]    (int64 seconds since 1970-01-01 UTC)
+    values = [state_at_start, v1, v2, ...]
+
+and the state at t is ``values[searchsorted(times, t, "right") - 1]``.
+
+Building (root finding):
+  - longitudes are sampled on a fixed grid (6 hours for the Moon, 1 day otherwise)
+    and unwrapped; every sample interval whose 30° sign cell (or 360/27°
+    nakshatra cell) changes brackets one crossing per boundary passed
+  - all brackets of a planet are bisected together, one vectorized
+    ``longitudes`` call per iteration, to ``TOLERANCE_S``
+  - stations bracket a flip of the provider's ``is_retrograde`` (the sign of its
+    speed) between grid samples and are bisected the same way
+The recorded time is the bisection's upper end, the first instant known to be
+in the new state. Nakshatra cells assume 27 equal divisions (as every provider
+implements ``nakshatra_index``).
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.astro.interfaces.i_astro_provider import IAstroProvider
+
+import logging
+logger = logging.getLogger("astro.calendar")
+
+EPOCH = datetime(1970, 1, 1)
+TOLERANCE_S = 1.0
+SIGN_WIDTH = 30.0
+NAKSHATRA_WIDTH = 360.0 / 27.0
+KINDS = ("sign", "nakshatra", "station")
+# sampling step per planet (seconds); fast movers need a finer grid so no cell is skipped
+STEP_S = {"moon": 6 * 3600}
+DEFAULT_STEP_S = 24 * 3600
+
+
+def to_seconds(when) -> float:
+    """Seconds since EPOCH of a naive-UTC / aware datetime or a date (midnight UTC)."""
+    if not isinstance(when, datetime):
+        when = datetime(when.year, when.month, when.day)
+    elif when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return (when - EPOCH).total_seconds()
+
+
+def to_instant(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=float(seconds))
+
+
+class PlanetCalendar:
+    """Step functions (sign, nakshatra, station) of one planet over [start, end] (seconds)."""
+
+    __slots__ = ("planet", "start", "end", "tables")
+
+    def __init__(self, planet: str, start: int, end: int, tables: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        self.planet = planet
+        self.start = int(start)
+        self.end = int(end)
+        self.tables = tables
+
+    def state(self, kind: str, seconds: float) -> Optional[int]:
+        """State of ``kind`` at ``seconds``; None outside the span or for a kind not built."""
+        table = self.tables.get(kind)
+        if table is None or not (self.start <= seconds <= self.end):
+            return None
+        times, values = table
+        return int(values[np.searchsorted(times, seconds, side="right") - 1])
+
+    def changes(self, kind: str, lo: float, hi: float) -> List[Tuple[int, int]]:
+        """(time, new state) of every change of ``kind`` in [lo, hi] (the span start is not a change)."""
+        table = self.tables.get(kind)
+        if table is None:
+            return []
+        times, values = table
+        a = max(int(np.searchsorted(times, lo, side="left")), 1)
+        b = int(np.searchsorted(times, hi, side="right"))
+        return [(int(t), int(v)) for t, v in zip(times[a:b], values[a:b])]
+
+    # -------------------------------------------------------
+    def to_data(self) -> Dict[str, Any]:
+        return {
+            "start": self.start,
+            "end": self.end,
+            "tables": {k: [t.tolist(), v.tolist()] for k, (t, v) in self.tables.items()},
+        }
+
+    @classmethod
+    def from_data(cls, planet: str, data: Dict[str, Any]) -> "PlanetCalendar":
+        tables = {
+            k: (np.asarray(t, dtype=np.int64), np.asarray(v, dtype=np.int16))
+            for k, (t, v) in data["tables"].items()
+        }
+        return cls(planet, data["start"], data["end"], tables)
+
+
+class AstroCalendar:
+    """Calendars of several planets for one provider configuration."""
+
+    def __init__(self, provider: str, planets: Optional[Dict[str, PlanetCalendar]] = None):
+        self.provider = provider
+        self.planets: Dict[str, PlanetCalendar] = dict(planets or {})
+
+    def state(self, kind: str, planet: str, when: datetime) -> Optional[int]:
+        cal = self.planets.get(planet)
+        return None if cal is None else cal.state(kind, to_seconds(when))
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        lo, hi = to_seconds(start), to_seconds(end)
+        return bool(self.planets) and all(c.start <= lo and hi <= c.end for c in self.planets.values())
+
+
+# -----------------------------------------------------------
+# Root finding
+# -----------------------------------------------------------
+def _longitudes(provider: IAstroProvider, planet: str, seconds: np.ndarray) -> np.ndarray:
+    return np.asarray(provider.longitudes(planet, [to_instant(s) for s in seconds]), dtype=float)
+
+
+def _cell_crossings(provider: IAstroProvider, planet: str, grid: np.ndarray, lons: np.ndarray,
+                    width: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(times, new cells) of every crossing of a ``width``-degree cell boundary, by bisection."""
+    cells = int(round(360.0 / width))
+    unwrapped = np.unwrap(lons, period=360.0)
+    cell = np.floor(unwrapped / width).astype(np.int64)
+    k_idx, bounds, ups = [], [], []
+    for k in np.nonzero(np.diff(cell))[0]:
+        c0, c1 = cell[k], cell[k + 1]
+        crossed = range(c0 + 1, c1 + 1) if c1 > c0 else range(c0, c1, -1)
+        for b in crossed:
+            k_idx.append(k)
+            bounds.append(b * width)
+            ups.append(c1 > c0)
+    if not k_idx:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int16)
+
+    k_idx = np.asarray(k_idx)
+    bounds = np.asarray(bounds)
+    ups = np.asarray(ups)
+    lo, hi = grid[k_idx].astype(float), grid[k_idx + 1].astype(float)
+    ref_raw, ref_unwrapped = lons[k_idx], unwrapped[k_idx]
+    for _ in range(max(1, math.ceil(math.log2(float((hi - lo).max()) / TOLERANCE_S)))):
+        mid = (lo + hi) / 2.0
+        lon_mid = ref_unwrapped + ((_longitudes(provider, planet, mid) - ref_raw + 180.0) % 360.0 - 180.0)
+        passed = np.where(ups, lon_mid >= bounds, lon_mid < bounds)
+        hi = np.where(passed, mid, hi)
+        lo = np.where(passed, lo, mid)
+    new_cells = np.where(ups, np.round(bounds / width), np.round(bounds / width) - 1).astype(np.int64) % cells
+    order = np.argsort(hi, kind="stable")
+    return np.ceil(hi[order]).astype(np.int64), new_cells[order].astype(np.int16)
+
+
+def _stations(provider: IAstroProvider, planet: str, grid: np.ndarray) -> Tuple[bool, np.ndarray, np.ndarray]:
+    """Initial retrograde flag and (times, new flags) of every flip of ``is_retrograde``."""
+    def flags(seconds):
+        return np.array([bool(provider.is_retrograde(planet, to_instant(s))) for s in seconds])
+
+    retro = flags(grid)
+    flips = np.nonzero(np.diff(retro.astype(np.int8)))[0]
+    if not len(flips):
+        return bool(retro[0]), np.array([], dtype=np.int64), np.array([], dtype=np.int16)
+    lo, hi = grid[flips].astype(float), grid[flips + 1].astype(float)
+    after = retro[flips + 1]
+    for _ in range(max(1, math.ceil(math.log2(float((hi - lo).max()) / TOLERANCE_S)))):
+        mid = (lo + hi) / 2.0
+        passed = flags(mid) == after
+        hi = np.where(passed, mid, hi)
+        lo = np.where(passed, lo, mid)
+    return bool(retro[0]), np.ceil(hi).astype(np.int64), after.astype(np.int16)
+
+
+def build_planet_calendar(provider: IAstroProvider, planet: str, start: datetime, end: datetime,
+                          kinds: Sequence[str] = KINDS) -> PlanetCalendar:
+    """Root-find every sign / nakshatra ingress and station of ``planet`` over [start, end]."""
+    lo, hi = int(math.floor(to_seconds(start))), int(math.ceil(to_seconds(end)))
+    step = STEP_S.get(planet, DEFAULT_STEP_S)
+    grid = np.append(np.arange(lo, hi, step, dtype=np.int64), hi)
+    tables: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    if "sign" in kinds or "nakshatra" in kinds:
+        lons = _longitudes(provider, planet, grid)
+        for kind, width, initial in (
+            ("sign", SIGN_WIDTH, int((lons[0] % 360.0) // SIGN_WIDTH)),
+            ("nakshatra", NAKSHATRA_WIDTH, int(provider.nakshatra_index(float(lons[0])))),
+        ):
+            if kind not in kinds:
+                continue
+            times, values = _cell_crossings(provider, planet, grid, lons, width)
+            tables[kind] = (np.concatenate(([lo], times)).astype(np.int64),
+                            np.concatenate(([initial], values)).astype(np.int16))
+    if "station" in kinds:
+        initial, times, values = _stations(provider, planet, grid)
+        tables["station"] = (np.concatenate(([lo], times)).astype(np.int64),
+                             np.concatenate(([int(initial)], values)).astype(np.int16))
+
+    logger.debug("Calendar %s: %s", planet, {k: len(t) - 1 for k, (t, _) in tables.items()})
+    return PlanetCalendar(planet, lo, hi, tables)
@@ -1,6 +1,9 @@
 # backend/app/core/astro/interfaces/i_astro_provider.py
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Sequence
+
+import numpy as np
 
 class IAstroProvider(ABC):
     """Interface for planetary data providers."""
@@ -10,6 +13,10 @@ class IAstroProvider(ABC):
         """Return ecliptic longitude in degrees for planet at given datetime."""
         raise NotImplementedError
 
+    def longitudes(self, planet: str, whens: Sequence[datetime]) -> np.ndarray:
+        """Return longitudes for many instants; providers may override with a vectorized path."""
+        return np.array([self.longitude(planet, w) for w in whens], dtype=float)
+
     @abstractmethod
     def nakshatra_index(self, longitude_deg: float) -> int:
         """Return nakshatra index (0..26) for given longitude."""
@@ -25,6 +32,18 @@ class IAstroProvider(ABC):
         """Return shortest angular distance in degrees between angles a and b."""
         raise NotImplementedError
     
+    def planet_sign(self, planet: str, when: datetime) -> int:
+        """Sign index (0 = Aries) of planet at ``when``; calendar-backed providers answer without an ephemeris call."""
+        return int((self.longitude(planet, when) % 360.0) // 30.0)
+
+    def planet_nakshatra(self, planet: str, when: datetime) -> int:
+        """Nakshatra index (0..26) of planet at ``when``."""
+        return self.nakshatra_index(self.longitude(planet, when))
+
+    def separation(self, planet: str, target: str, when: datetime) -> float:
+        """Angular distance between two planets at ``when``; caching providers may serve it precomputed."""
+        return self.angular_distance(self.longitude(planet, when), self.longitude(target, when))
+
     @abstractmethod
     def is_retrograde(self, planet: str, when: datetime) -> bool:
         """Return True if planet is retrograde at the given time."""
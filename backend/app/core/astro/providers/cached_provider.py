@@ -0,0 +1,164 @@
+# backend/app/core/astro/providers/cached_provider.py
+"""
+CachedAstroProvider
+
+Memoizing IAstroProvider wrapper holding the "sky state" for a set of instants.
+- ``prime()`` computes longitudes of many planets for many instants in one batch,
+  using the wrapped provider's vectorized ``longitudes`` where available
+- ``longitude()`` / ``is_retrograde()`` are served from the cache, falling back to
+  the wrapped provider on a miss
+- with an AstroCalendar, sign / nakshatra / retrograde lookups inside the
+  calendar span are binary searches over precomputed ingress and station times
+- ``prime_aspects()`` additionally builds the all-pairs AspectMatrix of the primed
+  planets; ``separation()`` then reads one element instead of two longitudes
+Several exchanges (or rules) evaluated at the same instant share one computation.
+"""
+
+from datetime import date as date_type, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.core.astro.aspect_matrix import AspectMatrix
+from app.core.astro.ingress_calendar import AstroCalendar
+from app.core.astro.interfaces.i_astro_provider import IAstroProvider
+from app.core.db.enums import Planet
+
+import logging
+logger = logging.getLogger("astro.cached")
+
+
+def planet_key(planet: Union[str, Planet]) -> str:
+    """Canonical lowercase cache key for a planet name or enum."""
+    if isinstance(planet, Planet):
+        return planet.name
+    return str(planet or "").strip().lower()
+
+
+def normalize_instant(when) -> datetime:
+    """Normalize date / aware datetime input to a naive UTC datetime."""
+    if isinstance(when, date_type) and not isinstance(when, datetime):
+        return datetime(when.year, when.month, when.day)
+    if when.tzinfo is not None:
+        return when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when
+
+
+class CachedAstroProvider(IAstroProvider):
+    def __init__(self, provider: IAstroProvider, calendar: Optional[AstroCalendar] = None):
+        self.provider = provider
+        self.calendar = calendar
+        self._lon: Dict[Tuple[str, datetime], float] = {}
+        self._retro: Dict[Tuple[str, datetime], bool] = {}
+        # instant -> (planet index, planets x planets distances)
+        self._aspects: Dict[datetime, Tuple[Dict[str, int], np.ndarray]] = {}
+
+    def __getattr__(self, name):
+        # expose wrapped provider attributes (mode, test helpers, ...)
+        provider = self.__dict__.get("provider")
+        if provider is None:
+            raise AttributeError(name)
+        return getattr(provider, name)
+
+    # -------------------------------------------------------
+    def prime(self, instants: Iterable, planets: Iterable[Union[str, Planet]]) -> None:
+        """Compute every (planet, instant) longitude not yet cached, one batch per planet."""
+        points = sorted({normalize_instant(w) for w in instants})
+        if not points:
+            return
+        for planet in {planet_key(p) for p in planets if p}:
+            missing = [w for w in points if (planet, w) not in self._lon]
+            if not missing:
+                continue
+            try:
+                values = self.provider.longitudes(planet, missing)
+            except Exception as exc:
+                # leave uncached; individual lookups will surface the provider error
+                logger.debug("Batch longitude failed for planet=%s: %s", planet, exc)
+                continue
+            for w, lon in zip(missing, values):
+                self._lon[(planet, w)] = float(lon)
+        logger.debug("Primed sky state: instants=%d cached=%d", len(points), len(self._lon))
+
+    def prime_aspects(self, instants: Iterable, planets: Iterable[Union[str, Planet]]) -> AspectMatrix:
+        """Prime longitudes and install the all-pairs distance matrix of ``planets`` at every instant."""
+        points = sorted({normalize_instant(w) for w in instants})
+        self.prime(points, planets)
+        keys, columns = [], []
+        for planet in sorted({planet_key(p) for p in planets if p}):
+            try:
+                columns.append([self.longitude(planet, w) for w in points])
+            except Exception as exc:
+                # planet unsupported by the provider: its checks keep failing individually
+                logger.debug("No aspect matrix column for planet=%s: %s", planet, exc)
+                continue
+            keys.append(planet)
+        lons = np.array(columns, dtype=float).T if columns else np.empty((len(points), 0))
+        matrix = AspectMatrix(keys, points, lons)
+        index = {p: i for i, p in enumerate(keys)}
+        for t, w in enumerate(points):
+            self._aspects[w] = (index, matrix.distances[t])
+        return matrix
+
+    def clear(self) -> None:
+        self._lon.clear()
+        self._retro.clear()
+        self._aspects.clear()
+
+    def cached_instants(self) -> List[datetime]:
+        return sorted({w for _, w in self._lon})
+
+    # -------------------------------------------------------
+    def longitude(self, planet: Union[str, Planet], when: datetime) -> float:
+        key = (planet_key(planet), normalize_instant(when))
+        lon = self._lon.get(key)
+        if lon is None:
+            lon = float(self.provider.longitude(planet, key[1]))
+            self._lon[key] = lon
+        return lon
+
+    def longitudes(self, planet: Union[str, Planet], whens) -> np.ndarray:
+        self.prime(whens, [planet])
+        return np.array([self.longitude(planet, w) for w in whens], dtype=float)
+
+    def separation(self, planet: Union[str, Planet], target: Union[str, Planet], when: datetime) -> float:
+        when = normalize_instant(when)
+        row = self._aspects.get(when)
+        if row is not None:
+            i, j = row[0].get(planet_key(planet)), row[0].get(planet_key(target))
+            if i is not None and j is not None:
+                return float(row[1][i, j])
+        return self.angular_distance(self.longitude(planet, when), self.longitude(target, when))
+
+    def planet_sign(self, planet: Union[str, Planet], when: datetime) -> int:
+        if self.calendar is not None:
+            sign = self.calendar.state("sign", planet_key(planet), normalize_instant(when))
+            if sign is not None:
+                return sign
+        return int((self.longitude(planet, when) % 360.0) // 30.0)
+
+    def planet_nakshatra(self, planet: Union[str, Planet], when: datetime) -> int:
+        if self.calendar is not None:
+            nak = self.calendar.state("nakshatra", planet_key(planet), normalize_instant(when))
+            if nak is not None:
+                return nak
+        return self.nakshatra_index(self.longitude(planet, when))
+
+    def is_retrograde(self, planet: str, when: datetime) -> bool:
+        key = (planet_key(planet), normalize_instant(when))
+        if self.calendar is not None:
+            retro = self.calendar.state("station", key[0], key[1])
+            if retro is not None:
+                return bool(retro)
+        if key not in self._retro:
+            self._retro[key] = bool(self.provider.is_retrograde(planet, key[1]))
+        return self._retro[key]
+
+    def nakshatra_index(self, longitude_deg: float) -> int:
+        return self.provider.nakshatra_index(longitude_deg)
+
+    def nakshatra_owner(self, nak_idx: int) -> str:
+        return self.provider.nakshatra_owner(nak_idx)
+
+    def angular_distance(self, a: float, b: float) -> float:
+        return self.provider.angular_distance(a, b)
@@ -14,7 +14,9 @@ from datetime import datetime, date as date_type, timedelta, timezone
 import math
 import logging
 import os
-from typing import Union
+from typing import Sequence, Union
+
+import numpy as np
 
 from dotenv import load_dotenv
 from skyfield.api import load
@@ -64,6 +66,9 @@ class SkyfieldProvider(IAstroProvider):
       ASTRO_AYANAMSA_MODE       (default: lahiri)  # lahiri | krishnamurti | raman | tropical | none
     """
 
+    # is_retrograde samples the longitude at t and t+1d
+    RETROGRADE_EPHEMERIS_CALLS = 2
+
     def __init__(self):
         # config
         self.ephemeris = os.getenv("ASTRO_SKYFIELD_EPHEMERIS", "de440s.bsp")
@@ -242,6 +247,47 @@ class SkyfieldProvider(IAstroProvider):
 
         return sidereal_lon
 
+    def longitudes(self, planet: Union[str, Planet], whens: Sequence[datetime]) -> np.ndarray:
+        """
+        Vectorized ``longitude`` over many instants: one Skyfield Time array and a single
+        observe/apparent pass instead of one ephemeris evaluation per instant.
+        """
+        if len(whens) == 0:
+            return np.array([], dtype=float)
+        planet_enum = self._normalize_planet_input(planet)
+        try:
+            sf_key = self.planet_mapper.resolve(planet_enum)
+        except Exception as exc:
+            raise ValueError(f"Planet mapping error for {planet_enum}: {exc}")
+
+        utc = []
+        for when in whens:
+            if isinstance(when, date_type) and not isinstance(when, datetime):
+                when = datetime(when.year, when.month, when.day, tzinfo=timezone.utc)
+            elif when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            utc.append(when)
+        t = self.ts.from_datetimes(utc)
+        jd_tt = np.atleast_1d(np.asarray(t.tt, dtype=float))
+        mode = (self.ayanamsa_mode or "lahiri").lower()
+        ay = np.array([self._ayanamsa_deg(float(jd)) for jd in jd_tt], dtype=float)
+
+        if sf_key in ("rahu", "ketu"):
+            T = (jd_tt - 2451545.0) / 36525.0
+            node = (125.04452 - 1934.136261 * T + 0.0020708 * (T ** 2) + (T ** 3) / 450000.0) % 360.0
+            if mode in ("tropical", "none"):
+                return node
+            node_sidereal = (node - ay) % 360.0
+            return node_sidereal if sf_key == "rahu" else (node_sidereal + 180.0) % 360.0
+
+        if sf_key not in self.planets:
+            raise ValueError(f"Unsupported planet name/key for ephemeris: {sf_key}")
+        astrometric = self.planets["earth"].at(t).observe(self.planets[sf_key]).apparent()
+        lat, lon, dist = astrometric.frame_latlon(ecliptic_frame)
+        tropical = np.atleast_1d(np.asarray(lon.degrees, dtype=float)) % 360.0
+        if mode in ("tropical", "none"):
+            return tropical
+        return (tropical - ay) % 360.0
 
     def nakshatra_index(self, longitude_deg: float) -> int:
         """0..26 index (27 equal divisions of 360°)"""
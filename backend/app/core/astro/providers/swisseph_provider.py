@@ -162,17 +162,17 @@ class SwissEphemProvider(IAstroProvider):
     def is_retrograde(self, planet: str, when: datetime) -> bool:
         """
         Return True if the specified planet is retrograde at the given time.
-        Uses the provider's planet_mapper to look up the swisseph body code and reads
+        Uses the provider's planet mapper to look up the swisseph body code and reads
         the longitudinal speed from swe.calc_ut result (res[3]).
         Defensive: returns False if body not found or error occurs.
         """
         try:
-            key = (planet or "").lower()
-            # planet_mapper is expected to map keys (lowercase) to swisseph constants
-            body_code = getattr(self, "planet_mapper", {}).get(key)
-            if body_code is None:
+            key = planet.name if isinstance(planet, Planet) else (planet or "").strip().lower()
+            planet_enum = Planet.__members__.get(key)
+            if planet_enum is None:
                 # If planet not mapped, we cannot compute retrograde -> False
                 return False
+            body_code = self.mapper.resolve(planet_enum)
 
             # Normalize when to datetime if a date was provided
             dt = self._to_datetime(when=when)
@@ -182,7 +182,7 @@ class SwissEphemProvider(IAstroProvider):
                 dt.year,
                 dt.month,
                 dt.day,
-                dt.hour + when.minute / 60.0 + when.second / 3600.0
+                dt.hour + dt.minute / 60.0 + dt.second / 3600.0
             )
 
             # Use SWIEPH + speed flag to get velocities
@@ -16,14 +16,65 @@ class Settings(BaseSettings):
     # --- Database & Logging ---
     database_url: str = Field(default="sqlite:///./astro_rules.db", description="SQLAlchemy database URL")
     log_level: str = Field(default="INFO", description="Logging level")
+    db_echo: bool = Field(default=False, description="Echo SQL statements")
+    db_pool_size: int = Field(default=5, description="Connection pool size")
+    db_max_overflow: int = Field(default=10, description="Connections allowed beyond the pool size")
+    db_pool_timeout: int = Field(default=30, description="Seconds to wait for a pooled connection")
+    db_pool_recycle: int = Field(default=1800, description="Recycle connections older than this many seconds (<=0 disables)")
+    db_pool_pre_ping: bool = Field(default=True, description="Validate connections before use")
+    sqlite_journal_mode: str = Field(default="WAL", description="SQLite journal_mode pragma")
+    sqlite_synchronous: str = Field(default="NORMAL", description="SQLite synchronous pragma")
+    sqlite_mmap_size: int = Field(default=268435456, description="SQLite mmap_size pragma in bytes")
+    sqlite_cache_size: int = Field(default=-65536, description="SQLite cache_size pragma (negative = KiB)")
 
     # --- Providers ---
     provider_type: str = Field(default="swisseph", description="Astrology provider type (stub|swisseph|skyfield)")
-    market_provider_type: str = Field(default="yahoo", description="Market data provider type (yahoo|csv)")
+    market_provider_type: str = Field(default="yahoo", description="Market data provider type (yahoo|csv|synthetic)")
+    synthetic_market_seed: int = Field(default=42, description="Base seed for the synthetic market data provider")
 
     # --- Defaults ---
     default_sector_ticker: str = Field(default="^GSPC", description="Default market index ticker")
 
+    # --- Trading calendar ---
+    trading_holidays_file: Optional[str] = Field(default=None, description="Holiday file (one ISO date per line) for the trading calendar")
+    exchange_holiday_files: Optional[Dict[str, str]] = Field(default=None, description="Per-exchange holiday files, e.g. {\"NSE\": \"nse_holidays.txt\"} (take precedence over trading_holidays_file)")
+    trading_days_only: bool = Field(default=False, description="Evaluate rules on trading days only")
+    horizon_unit: str = Field(default="trading", description="Correlation horizon unit (trading|calendar)")
+
+    # --- Parallel evaluation ---
+    eval_workers: int = Field(default=1, description="Processes for date-sharded rule evaluation (1 = in-process, 0 = all cores)")
+    eval_min_days_per_shard: int = Field(default=1024, description="Smallest date shard handed to an evaluation worker")
+    eval_cache_max_events: int = Field(default=1_000_000, description="Total evaluated events kept in the in-memory evaluation result cache (least recently used evicted)")
+    sweep_workers: int = Field(default=1, description="Processes for parameter sweep grid points (1 = in-process, 0 = all cores)")
+    mining_workers: int = Field(default=1, description="Processes for rule mining pair candidates (1 = in-process, 0 = all cores)")
+
+    # --- Rules engine ---
+    condition_ordering: bool = Field(default=True, description="Reorder rule conditions by measured cost and pass rate")
+    condition_stats_min_samples: int = Field(default=50, description="Checks per condition before measured cost replaces the a-priori cost")
+    condition_reorder_every: int = Field(default=10000, description="Condition checks between recomputing rule condition orders")
+
+    condition_cache_max_entries: int = Field(default=4096, description="Per-condition interval results kept for incremental regeneration (least recently used evicted)")
+    composite_cache_max_entries: int = Field(default=1024, description="Composite-rule interval results kept in memory (least recently used evicted)")
+
+    generation_workers: int = Field(default=0, description="Processes for rule-sharded batch event generation (0 = all cores)")
+
+    # --- Astro calendar ---
+    calendar_start_date: str = Field(default="1980-01-01", description="Default first day of built ingress/station calendars")
+    calendar_end_date: str = Field(default="2040-12-31", description="Default last day of built ingress/station calendars")
+
+    # --- Sector signals ---
+    materialize_signals: bool = Field(default=True, description="Keep the sector_signals table current when rule events change")
+
+    # --- Background jobs ---
+    job_workers: int = Field(default=2, description="Worker processes for background jobs (0 = run inline)")
+    job_progress_interval: float = Field(default=1.0, description="Minimum seconds between job progress writes")
+    job_result_compression_level: int = Field(default=6, description="zlib level for stored job results")
+
+    # --- Correlation result cache ---
+    correlation_cache_enabled: bool = Field(default=True, description="Reuse stored correlation results for identical inputs")
+    correlation_cache_max_entries: int = Field(default=256, description="Most correlation results kept (least recently used evicted)")
+    correlation_cache_max_bytes: int = Field(default=256 * 1024 * 1024, description="Total compressed size bound for cached correlation results")
+
     # New typed setting: user may provide JSON in .env or a dict programmatically
     astro_combust_orbs: Optional[Dict[str, float]] = None
 
@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 from app.core.db.enums import Relation, OutcomeEffect
 from sqlmodel import SQLModel, Field
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 
 
 
@@ -51,6 +51,85 @@ class OutcomeRead(OutcomeBase):
     rule_id: int
 
 
+# --------------------------------------------------------------------
+# RULE EXPRESSION schemas
+# --------------------------------------------------------------------
+class ExpressionCondition(BaseModel):
+    """Leaf of a rule expression: one condition, relation given by name (e.g. "square_with")."""
+    planet: str
+    relation: str
+    target: Optional[str] = None
+    orb: Optional[float] = None
+    value: Optional[float] = None
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("relation")
+    @classmethod
+    def _known_relation(cls, v: str) -> str:
+        if v not in Relation.__members__:
+            raise ValueError(f"Unknown relation: {v}")
+        return v
+
+
+class ExpressionGroup(BaseModel):
+    """and / or over one or more sub-expressions, or not over exactly one."""
+    op: Literal["and", "or", "not"]
+    args: List[Union[ExpressionGroup, ExpressionCondition]]
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def _arity(self) -> "ExpressionGroup":
+        if not self.args:
+            raise ValueError(f"'{self.op}' needs at least one argument")
+        if self.op == "not" and len(self.args) != 1:
+            raise ValueError("'not' takes exactly one argument")
+        return self
+
+
+RuleExpression = Union[ExpressionGroup, ExpressionCondition]
+ExpressionGroup.model_rebuild()
+
+
+# --------------------------------------------------------------------
+# COMPOSITE RULE schemas (rules over other rules' activity)
+# --------------------------------------------------------------------
+class CompositeRuleRef(BaseModel):
+    """
+    Leaf of a composite rule: days on which rule ``rule`` (its rule_id code) has an
+    active event, or with a window, days within N days after one of its events
+    started / ended.
+    """
+    rule: str
+    started_within: Optional[int] = Field(default=None, ge=0)
+    ended_within: Optional[int] = Field(default=None, ge=0)
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def _one_window(self) -> "CompositeRuleRef":
+        if self.started_within is not None and self.ended_within is not None:
+            raise ValueError("use either started_within or ended_within, not both")
+        return self
+
+
+class CompositeGroup(BaseModel):
+    """and / or over one or more sub-expressions, or not over exactly one."""
+    op: Literal["and", "or", "not"]
+    args: List[Union[CompositeGroup, CompositeRuleRef]]
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def _arity(self) -> "CompositeGroup":
+        if not self.args:
+            raise ValueError(f"'{self.op}' needs at least one argument")
+        if self.op == "not" and len(self.args) != 1:
+            raise ValueError("'not' takes exactly one argument")
+        return self
+
+
+CompositeExpression = Union[CompositeGroup, CompositeRuleRef]
+CompositeGroup.model_rebuild()
+
+
 # --------------------------------------------------------------------
 # RULE schemas
 # --------------------------------------------------------------------
@@ -66,6 +145,8 @@ class RuleCreate(RuleBase):
     rule_id: Optional[str] = None
     conditions: List[ConditionCreate] = []
     outcomes: List[OutcomeCreate] = []
+    expression: Optional[RuleExpression] = None
+    composite: Optional[CompositeExpression] = None
 
 
 class RuleRead(RuleBase):
@@ -75,12 +156,16 @@ class RuleRead(RuleBase):
     updated_at: datetime
     conditions: List[ConditionRead] = []
     outcomes: List[OutcomeRead] = []
+    expression: Optional[RuleExpression] = None
+    composite: Optional[CompositeExpression] = None
 
 
 class RuleUpdate(RuleBase):
-    """Allows partial updates of fields and replacement of conditions/outcomes."""
+    """Allows partial updates of fields and replacement of conditions/outcomes/expression."""
     conditions: List[ConditionCreate] = []
     outcomes: List[OutcomeCreate] = []
+    expression: Optional[RuleExpression] = None
+    composite: Optional[CompositeExpression] = None
 
 
 # --------------------------------------------------------------------
@@ -118,10 +203,40 @@ class EvaluateRequest(BaseModel):
     """Payload for /evaluate endpoint."""
     start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
     end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    trading_days_only: Optional[bool] = Field(default=None, description="Evaluate trading days only")
+    exchange: Optional[str] = Field(default=None, description="Evaluate at this exchange's session open (e.g. NSE, NYSE)")
+    exchanges: Optional[List[str]] = Field(default=None, description="Evaluate several exchanges in one pass")
 
     model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 
+class GenerateEventsRequest(BaseModel):
+    """Payload for a background event-generation job."""
+    rule_id: str = Field(..., description="Rule code, e.g. R001")
+    start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    provider: str = Field(default="swisseph", description="Astro provider (stub|swisseph|skyfield)")
+    overwrite: bool = Field(default=False, description="Delete existing events overlapping the range first")
+    trading_days_only: bool = Field(default=False, description="Evaluate trading days only")
+    exchange: Optional[str] = Field(default=None, description="Evaluate at this exchange's session open")
+
+    model_config = ConfigDict(extra="ignore")
+
+
+class GenerateBatchRequest(BaseModel):
+    """Payload for rule-sharded batch event generation."""
+    rule_ids: Optional[List[str]] = Field(default=None, description="Rule codes; default every enabled rule")
+    start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    provider: str = Field(default="swisseph", description="Astro provider (stub|swisseph|skyfield)")
+    overwrite: bool = Field(default=False, description="Delete existing events overlapping the range first")
+    trading_days_only: bool = Field(default=False, description="Evaluate trading days only")
+    exchange: Optional[str] = Field(default=None, description="Evaluate at this exchange's session open")
+    workers: Optional[int] = Field(default=None, description="Worker processes (default settings.generation_workers)")
+
+    model_config = ConfigDict(extra="ignore")
+
+
 class EventResult(BaseModel):
     """Represents an event triggered by a rule evaluation."""
     rule_id: str
@@ -138,6 +253,7 @@ class CorrelationResult(BaseModel):
     """Output structure for correlation analysis results."""
     ticker: str
     lookahead_days: List[int]
+    detail: Optional[str] = None
     aggregate: dict
     per_rule: dict
 
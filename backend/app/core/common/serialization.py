@@ -0,0 +1,57 @@
+# backend/app/core/common/serialization.py
+"""
+Fast JSON / NDJSON encoding for large responses.
+
+Uses orjson when installed (several times faster than the stdlib and emits bytes
+directly) and falls back to ``json``.
+"""
+
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator
+
+try:  # optional fast path
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# bytes buffered before a chunk is handed to the response
+NDJSON_FLUSH_BYTES = 64 * 1024
+
+
+def _default(obj: Any):
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+    if hasattr(obj, "name") and hasattr(obj, "value"):  # enums
+        return obj.name
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def iter_ndjson(records: Iterable[Any], gzip: bool = False, flush_bytes: int = NDJSON_FLUSH_BYTES) -> Iterator[bytes]:
+    """
+    Encode ``records`` as newline-delimited JSON, yielding ~``flush_bytes`` chunks
+    (optionally as one gzip stream). Memory stays bounded by the buffer size.
+    """
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    buf = bytearray()
+    for rec in records:
+        buf += dumps(rec)
+        buf += b"\n"
+        if len(buf) >= flush_bytes:
+            chunk = gz.compress(bytes(buf)) if gz else bytes(buf)
+            buf.clear()
+            if chunk:
+                yield chunk
+    tail = (gz.compress(bytes(buf)) + gz.flush()) if gz else bytes(buf)
+    if tail:
+        yield tail
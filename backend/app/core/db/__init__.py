@@ -13,6 +13,9 @@ from app.core.db import models
 # Import analysis models next (these define RuleEvent, CorrelationResult, etc.)
 from app.core.db import models_analysis  
 
+# Background job table
+from app.core.db import models_jobs
+
 
 __all__ = [
     "Base",
@@ -21,4 +24,5 @@ __all__ = [
     "get_db",
     "models",
     "models_analysis",
+    "models_jobs",
 ]
@@ -1,20 +1,97 @@
-# app/core/common/db.py
-from sqlalchemy import create_engine
+# app/core/db/db.py
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./astro_rules.db"
+from app.core.common.config import settings
+
+DATABASE_URL = settings.database_url
 
 # --- Declarative Base ---
 Base = declarative_base()
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}, echo=False, future=True
-)
+
+def is_sqlite_url(url: str) -> bool:
+    return str(url).startswith("sqlite")
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    url = str(url)
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning: WAL journal, relaxed fsync, mmap and page cache."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str = None) -> Engine:
+    """
+    Build the SQLAlchemy engine from settings (database_url, db_* pool options).
+
+    SQLite gets per-connection pragmas (WAL, synchronous=NORMAL, mmap, cache size);
+    server databases such as PostgreSQL get pool sizing/overflow/timeout.
+    """
+    url = url or settings.database_url
+    kwargs = dict(
+        echo=settings.db_echo,
+        future=True,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if settings.db_pool_recycle and settings.db_pool_recycle > 0:
+        kwargs["pool_recycle"] = settings.db_pool_recycle
+
+    if is_sqlite_url(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if not _is_memory_sqlite(url):
+            kwargs["pool_size"] = settings.db_pool_size
+            kwargs["max_overflow"] = settings.db_max_overflow
+            kwargs["pool_timeout"] = settings.db_pool_timeout
+    else:
+        kwargs["pool_size"] = settings.db_pool_size
+        kwargs["max_overflow"] = settings.db_max_overflow
+        kwargs["pool_timeout"] = settings.db_pool_timeout
+
+    db_engine = create_engine(url, **kwargs)
+    if is_sqlite_url(url):
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 def init_db():
     Base.metadata.create_all(engine)
 
+
+def add_missing_columns(bind: Engine) -> list:
+    """
+    create_all skips existing tables; add nullable columns introduced after a table
+    was created (ALTER TABLE ... ADD COLUMN). Returns the added "table.column" names.
+    """
+    inspector = inspect(bind)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as conn:
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}')
+            added.append(f"{table.name}.{column.name}")
+    return added
+
 def get_db():
     db = SessionLocal()
     try:
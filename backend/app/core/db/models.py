@@ -8,6 +8,7 @@ from sqlalchemy import (
     Float,
     DateTime,
     ForeignKey,
+    JSON,
 )
 from sqlalchemy.orm import  relationship
 from app.core.db.db import Base
@@ -31,6 +32,11 @@ class Rule(Base):
     confidence = Column(Float, default=1.0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # optional boolean expression over conditions (and / or / not groups), ANDed with `conditions`
+    expression = Column(JSON, nullable=True)
+    # composite rules: and / or / not over other rules' activity ({"rule": code} leaves),
+    # evaluated from their persisted events instead of astro conditions
+    composite = Column(JSON, nullable=True)
 
     # Master–detail relationships
     conditions = relationship(
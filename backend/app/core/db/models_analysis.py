@@ -5,10 +5,14 @@ from sqlalchemy import (
     Column,
     Integer,
     Date,
+    Float,
     String,
     DateTime,
     ForeignKey,
+    Index,
     JSON,
+    LargeBinary,
+    UniqueConstraint,
     Enum as SAEnum,
 )
 from sqlalchemy.orm import relationship
@@ -29,6 +33,12 @@ class EventSubtype(enum.Enum):
 
 class RuleEvent(Base):
     __tablename__ = "rule_events"
+    __table_args__ = (
+        # per-rule listings: WHERE rule_id=? [AND provider=?] ORDER BY start_date
+        Index("ix_rule_events_rule_provider_start", "rule_id", "provider", "start_date"),
+        # "active on date D": start_date <= D AND end_date >= D
+        Index("ix_rule_events_start_end", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     rule_id = Column(Integer, ForeignKey("rule.id", ondelete="CASCADE"), nullable=False)
@@ -43,7 +53,7 @@ class RuleEvent(Base):
     metadata_json = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    rule = relationship("Rule", back_populates="events", lazy="joined")
+    rule = relationship("Rule", back_populates="events", lazy="select")
 
     def to_dict(self):
         return dict(
@@ -57,3 +67,103 @@ class RuleEvent(Base):
             metadata_json=self.metadata_json,
             created_at=self.created_at.isoformat() if self.created_at else None,
         )
+
+
+class SectorSignal(Base):
+    """Materialized daily net signal per sector, built from RuleEvent intervals."""
+    __tablename__ = "sector_signals"
+    __table_args__ = (
+        UniqueConstraint("signal_date", "sector_code", "provider", name="uq_sector_signals_day_sector_provider"),
+        Index("ix_sector_signals_sector_date", "sector_code", "signal_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    signal_date = Column(Date, nullable=False, index=True)
+    sector_code = Column(String(64), nullable=False)
+    provider = Column(String(64), nullable=False, default="swisseph")
+
+    score = Column(Float, nullable=False, default=0.0)        # sum of effect x weight x confidence
+    active_rules = Column(Integer, nullable=False, default=0)
+    bullish = Column(Integer, nullable=False, default=0)
+    bearish = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return dict(
+            date=self.signal_date.isoformat() if isinstance(self.signal_date, date) else self.signal_date,
+            sector=self.sector_code,
+            provider=self.provider,
+            score=self.score,
+            active_rules=self.active_rules,
+            bullish=self.bullish,
+            bearish=self.bearish,
+            conflicting=bool(self.bullish and self.bearish),
+        )
+
+
+class CorrelationCacheEntry(Base):
+    """Persisted ``analyze_correlation`` result (zlib-compressed JSON), keyed by a content hash of its inputs."""
+    __tablename__ = "correlation_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    ticker = Column(String(32), nullable=False)
+    result_blob = Column(LargeBinary, nullable=False)
+    result_size = Column(Integer, nullable=False, default=0)   # compressed bytes
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def to_dict(self):
+        return dict(
+            key=self.cache_key,
+            ticker=self.ticker,
+            size=self.result_size,
+            hits=self.hits,
+            created_at=self.created_at.isoformat() if self.created_at else None,
+            last_used_at=self.last_used_at.isoformat() if self.last_used_at else None,
+        )
+
+
+class ConditionIntervalCacheEntry(Base):
+    """
+    Days on which one canonical condition holds over an evaluated span, as
+    zlib-compressed [start_ordinal, end_ordinal] pairs; keyed by a hash of the
+    condition and everything its result depends on (provider, ayanamsa, exchange, calendar).
+    """
+    __tablename__ = "condition_interval_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    intervals_blob = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class AstroCalendarEntry(Base):
+    """
+    Sign / nakshatra ingress and retrograde station times of one planet over a
+    span, for one provider and ayanamsa, as a zlib-compressed JSON of
+    [times, states] step-function arrays (see app.core.astro.ingress_calendar).
+    """
+    __tablename__ = "astro_calendar"
+
+    cache_key = Column(String(64), primary_key=True)
+    provider = Column(String(50), nullable=False, index=True)
+    ayanamsa = Column(String(50), nullable=False)
+    planet = Column(String(20), nullable=False)
+    start_at = Column(DateTime, nullable=False)
+    end_at = Column(DateTime, nullable=False)
+    data_blob = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DataVersion(Base):
+    """
+    Monotonic version of a table's content, advanced in the same transaction as
+    every write to it, so other processes can detect changes with one key lookup.
+    """
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,63 @@
+# app/core/db/models_jobs.py
+from datetime import datetime
+import enum
+
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, JSON, LargeBinary, Index, Enum as SAEnum
+
+from app.core.db.db import Base
+
+
+class JobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+ACTIVE_JOB_STATUSES = (JobStatus.queued, JobStatus.running)
+FINISHED_JOB_STATUSES = (JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled)
+
+
+class Job(Base):
+    """Background job (evaluation, correlation, event generation) executed by the worker pool."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # dedup lookup: identical submissions reuse the live/finished job
+        Index("ix_jobs_kind_params_hash", "kind", "params_hash"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(64), nullable=False)
+    params_json = Column(JSON, nullable=False, default=dict)
+    params_hash = Column(String(64), nullable=False)
+
+    status = Column(SAEnum(JobStatus), nullable=False, default=JobStatus.queued, index=True)
+    progress = Column(Float, nullable=False, default=0.0)     # percent, 0..100
+    message = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+
+    # zlib-compressed JSON document
+    result_blob = Column(LargeBinary, nullable=True)
+    result_size = Column(Integer, nullable=True)              # uncompressed bytes
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def to_dict(self):
+        return dict(
+            id=self.id,
+            kind=self.kind,
+            params=self.params_json,
+            status=self.status.name if self.status else None,
+            progress=round(self.progress or 0.0, 2),
+            message=self.message,
+            error=self.error,
+            has_result=self.result_blob is not None,
+            result_size=self.result_size,
+            result_compressed_size=len(self.result_blob) if self.result_blob is not None else None,
+            created_at=self.created_at.isoformat() if self.created_at else None,
+            started_at=self.started_at.isoformat() if self.started_at else None,
+            finished_at=self.finished_at.isoformat() if self.finished_at else None,
+        )
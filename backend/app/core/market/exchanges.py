@@ -0,0 +1,62 @@
+# backend/app/core/market/exchanges.py
+"""
+Exchange Sessions
+-----------------
+Per-exchange session definitions used to pick the instant at which rules are
+evaluated for a trading day (the local market open instead of midnight UTC),
+and the benchmark index whose cached price dates give the exchange's trading
+days (see trading_calendar.exchange_calendar).
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+
+@dataclass(frozen=True)
+class ExchangeSession:
+    code: str
+    timezone: str
+    open_time: time
+    close_time: time
+    # index whose price dates are the exchange's sessions (None: settings.default_sector_ticker)
+    index_ticker: Optional[str] = None
+
+    def open_utc(self, day: date) -> datetime:
+        """Session open on ``day`` (local calendar date) as a naive UTC datetime."""
+        local = datetime.combine(day, self.open_time, tzinfo=ZoneInfo(self.timezone))
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+EXCHANGES: Dict[str, ExchangeSession] = {
+    "UTC": ExchangeSession("UTC", "UTC", time(0, 0), time(23, 59)),
+    "NSE": ExchangeSession("NSE", "Asia/Kolkata", time(9, 15), time(15, 30), "^NSEI"),
+    "BSE": ExchangeSession("BSE", "Asia/Kolkata", time(9, 15), time(15, 30), "^BSESN"),
+    "NYSE": ExchangeSession("NYSE", "America/New_York", time(9, 30), time(16, 0), "^NYA"),
+    "NASDAQ": ExchangeSession("NASDAQ", "America/New_York", time(9, 30), time(16, 0), "^IXIC"),
+    "LSE": ExchangeSession("LSE", "Europe/London", time(8, 0), time(16, 30), "^FTSE"),
+    "TSE": ExchangeSession("TSE", "Asia/Tokyo", time(9, 0), time(15, 0), "^N225"),
+}
+
+
+def get_exchange(code: str) -> ExchangeSession:
+    key = (code or "").strip().upper()
+    if key not in EXCHANGES:
+        raise ValueError(f"Unknown exchange: {code}")
+    return EXCHANGES[key]
+
+
+def evaluation_instant(day: date, exchange: Optional[str] = None) -> datetime:
+    """Instant used to evaluate rules for ``day``: the exchange open, or midnight UTC without one."""
+    if not exchange:
+        return datetime.combine(day, datetime.min.time())
+    return get_exchange(exchange).open_utc(day)
+
+
+def list_exchanges() -> List[Dict[str, str]]:
+    return [
+        {"code": e.code, "timezone": e.timezone, "open": e.open_time.isoformat(), "close": e.close_time.isoformat(),
+         "index": e.index_ticker}
+        for e in EXCHANGES.values()
+    ]
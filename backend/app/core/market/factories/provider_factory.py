@@ -8,6 +8,7 @@ logger = logging.getLogger("astro.market.factory")
 PROVIDER_MAP = {
     "yahoo": "app.core.market.providers.yahoo_provider.YahooMarketDataProvider",
     "csv": "app.core.market.providers.csv_provider.CSVMarketDataProvider",
+    "synthetic": "app.core.market.providers.synthetic_provider.SyntheticMarketDataProvider",
 }
 
 def get_market_provider(provider_type: str = "yahoo") -> IMarketDataProvider:
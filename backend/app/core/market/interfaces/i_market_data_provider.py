@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import date
+import os
 import pandas as pd
 
 class IMarketDataProvider(ABC):
@@ -14,3 +15,19 @@ class IMarketDataProvider(ABC):
     def compute_return(self, df: pd.DataFrame, start: date, end: date) -> float:
         """Compute % return between two dates."""
         raise NotImplementedError
+
+    def data_version(self, ticker: str) -> str:
+        """
+        Stamp that changes whenever the data returned for ``ticker`` may change.
+        Used to key cached analysis results; the default expires daily.
+        """
+        return date.today().isoformat()
+
+
+def file_data_version(path: str) -> str:
+    """Version stamp for file-backed providers: modification time and size of the file."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"missing:{date.today().isoformat()}"
+    return f"{st.st_mtime_ns}:{st.st_size}"
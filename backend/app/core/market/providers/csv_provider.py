@@ -2,7 +2,7 @@ import pandas as pd
 from datetime import date
 import os
 import logging
-from app.core.market.interfaces.i_market_data_provider import IMarketDataProvider
+from app.core.market.interfaces.i_market_data_provider import IMarketDataProvider, file_data_version
 
 logger = logging.getLogger("astro.market.csv")
 
@@ -12,14 +12,20 @@ class CSVMarketDataProvider(IMarketDataProvider):
     def __init__(self, data_dir: str = "./data_cache"):
         self.data_dir = data_dir
 
+    def _file_path(self, ticker: str) -> str:
+        return os.path.join(self.data_dir, f"{ticker.replace('^','')}.csv")
+
     def fetch_data(self, ticker: str, start: date, end: date) -> pd.DataFrame:
-        file_path = os.path.join(self.data_dir, f"{ticker.replace('^','')}.csv")
+        file_path = self._file_path(ticker)
         if not os.path.exists(file_path):
             logger.warning(f"No CSV found for {ticker}")
             return pd.DataFrame()
         df = pd.read_csv(file_path, parse_dates=["Date"], index_col="Date")
         return df.loc[str(start):str(end)]
 
+    def data_version(self, ticker: str) -> str:
+        return "csv:" + file_data_version(self._file_path(ticker))
+
     def compute_return(self, df: pd.DataFrame, start: date, end: date) -> float:
         if df.empty or len(df) < 2:
             return 0.0
@@ -0,0 +1,89 @@
+import zlib
+from datetime import date
+from typing import Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.core.market.interfaces.i_market_data_provider import IMarketDataProvider
+
+logger = logging.getLogger("astro.market.synthetic")
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class SyntheticMarketDataProvider(IMarketDataProvider):
+    """
+    Deterministic synthetic market data (no disk or network access).
+
+    Each ticker gets a geometric Brownian motion path on business days starting at
+    EPOCH, with drift/volatility switching between a bull and a bear regime (Markov
+    chain with geometric run lengths). The path depends only on (seed, ticker), so any
+    requested span is a consistent slice of the same series.
+    """
+
+    EPOCH = date(1900, 1, 1)
+
+    # annualized (drift, volatility) and mean run length in trading days per regime
+    REGIMES = (
+        {"name": "bull", "mu": 0.10, "sigma": 0.15, "mean_days": 500},
+        {"name": "bear", "mu": -0.20, "sigma": 0.30, "mean_days": 120},
+    )
+
+    def __init__(self, seed: Optional[int] = None, start_price: float = 100.0):
+        if seed is None:
+            from app.core.common.config import settings
+            seed = settings.synthetic_market_seed
+        self.seed = int(seed)
+        self.start_price = float(start_price)
+
+    def _rngs(self, ticker: str):
+        ss = np.random.SeedSequence([self.seed, zlib.crc32(ticker.encode("utf-8"))])
+        shock_ss, regime_ss = ss.spawn(2)
+        return np.random.default_rng(shock_ss), np.random.default_rng(regime_ss)
+
+    def _regime_path(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Regime index per step, built from alternating geometric run lengths."""
+        regimes = np.empty(n, dtype=np.int8)
+        pos, state = 0, 0
+        while pos < n:
+            run = int(rng.geometric(1.0 / self.REGIMES[state]["mean_days"]))
+            regimes[pos: pos + run] = state
+            pos += run
+            state = 1 - state
+        return regimes
+
+    def _series(self, ticker: str, end: date) -> pd.DataFrame:
+        days = np.arange(np.datetime64(self.EPOCH, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]")
+        idx = pd.DatetimeIndex(days[np.is_busday(days)], name="Date")
+        n = len(idx)
+        if n == 0:
+            return pd.DataFrame({"Adj Close": np.array([], dtype=float)}, index=idx)
+
+        shock_rng, regime_rng = self._rngs(ticker)
+        shocks = shock_rng.standard_normal(n)
+        regimes = self._regime_path(regime_rng, n)
+
+        dt = 1.0 / TRADING_DAYS_PER_YEAR
+        mu = np.array([r["mu"] for r in self.REGIMES])[regimes]
+        sigma = np.array([r["sigma"] for r in self.REGIMES])[regimes]
+        log_returns = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+        log_returns[0] = 0.0
+        prices = self.start_price * np.exp(np.cumsum(log_returns))
+        return pd.DataFrame({"Adj Close": prices}, index=idx)
+
+    def fetch_data(self, ticker: str, start: date, end: date) -> pd.DataFrame:
+        df = self._series(ticker, end)
+        logger.debug(f"Generated synthetic market data: {ticker} rows={len(df)}")
+        return df.loc[str(start):str(end)]
+
+    def data_version(self, ticker: str) -> str:
+        # the series is a pure function of (seed, ticker, start price)
+        return f"synthetic:{self.seed}:{self.start_price}"
+
+    def compute_return(self, df: pd.DataFrame, start: date, end: date) -> float:
+        df = df.loc[str(start):str(end)]
+        if len(df) < 2:
+            return 0.0
+        return (df["Adj Close"].iloc[-1] / df["Adj Close"].iloc[0]) - 1.0
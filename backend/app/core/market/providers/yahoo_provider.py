@@ -3,7 +3,7 @@ import pandas as pd
 from datetime import date
 import logging
 import os
-from app.core.market.interfaces.i_market_data_provider import IMarketDataProvider
+from app.core.market.interfaces.i_market_data_provider import IMarketDataProvider, file_data_version
 
 logger = logging.getLogger("astro.market.yahoo")
 
@@ -14,8 +14,11 @@ class YahooMarketDataProvider(IMarketDataProvider):
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
 
+    def _cache_file(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker.replace('^','')}.csv")
+
     def fetch_data(self, ticker: str, start: date, end: date) -> pd.DataFrame:
-        cache_file = os.path.join(self.cache_dir, f"{ticker.replace('^','')}.csv")
+        cache_file = self._cache_file(ticker)
 
         if os.path.exists(cache_file):
             df = pd.read_csv(cache_file, parse_dates=["Date"], index_col="Date")
@@ -38,6 +41,10 @@ class YahooMarketDataProvider(IMarketDataProvider):
             df.to_csv(cache_file)
         return df
 
+    def data_version(self, ticker: str) -> str:
+        # until the CSV cache exists the next fetch downloads fresh data
+        return "yahoo:" + file_data_version(self._cache_file(ticker))
+
     def compute_return(self, df: pd.DataFrame, start: date, end: date) -> float:
         df = df.loc[str(start):str(end)]
         if len(df) < 2:
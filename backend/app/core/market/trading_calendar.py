@@ -0,0 +1,201 @@
+# backend/app/core/market/trading_calendar.py
+"""
+Trading Calendar
+----------------
+Exchange trading-day calendar used to restrict rule evaluation to sessions and to
+measure horizons in trading days.
+
+A calendar is built either from a cached price index (the dates that actually
+traded) or from a weekmask plus a holiday file. Price-index calendars fall back to
+the weekmask rule outside the span covered by the index.
+
+Resolved calendars are cached per (holiday file version) or per (provider, ticker,
+range, data_version), so repeated evaluations do not refetch prices.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import logging
+logger = logging.getLogger("astro.market.calendar")
+
+DEFAULT_WEEKMASK = "Mon Tue Wed Thu Fri"
+MAX_CACHED_CALENDARS = 64
+
+_calendars: "OrderedDict[Tuple, TradingCalendar]" = OrderedDict()
+_calendars_lock = threading.Lock()
+
+
+def _to_day(d) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(d).date(), "D")
+
+
+class TradingCalendar:
+    """Trading-day calendar backed by explicit sessions and/or a weekmask with holidays."""
+
+    def __init__(
+        self,
+        sessions: Optional[Iterable[date]] = None,
+        holidays: Optional[Iterable[date]] = None,
+        weekmask: str = DEFAULT_WEEKMASK,
+        name: str = "default",
+    ):
+        self.name = name
+        self.weekmask = weekmask
+        holidays = [] if holidays is None else holidays
+        sessions = [] if sessions is None else sessions
+        self.holidays = np.unique(np.array([_to_day(h) for h in holidays], dtype="datetime64[D]"))
+        self._busdays = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+        self.sessions_index = np.unique(np.array([_to_day(s) for s in sessions], dtype="datetime64[D]"))
+
+    # ---------------------
+    # Constructors
+    # ---------------------
+    @classmethod
+    def from_price_index(cls, df: pd.DataFrame, name: str = "prices") -> "TradingCalendar":
+        """Sessions are exactly the dates present in a price DataFrame's index."""
+        if df is None or df.empty:
+            return cls(name=name)
+        idx = pd.DatetimeIndex(pd.to_datetime(df.index))
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        return cls(sessions=idx.normalize().date, name=name)
+
+    @classmethod
+    def from_holiday_file(cls, path: str, weekmask: str = DEFAULT_WEEKMASK, name: Optional[str] = None) -> "TradingCalendar":
+        """
+        Weekmask calendar with holidays read from a text file:
+        one ISO date per line, blank lines and '#' comments ignored.
+        """
+        holidays: List[date] = []
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    holidays.append(date.fromisoformat(line.split(",")[0].strip()))
+        logger.info("Loaded %d holidays from %s", len(holidays), path)
+        return cls(holidays=holidays, weekmask=weekmask, name=name or os.path.basename(path))
+
+    # ---------------------
+    # Queries
+    # ---------------------
+    def _covered(self, day: np.datetime64) -> bool:
+        return self.sessions_index.size > 0 and self.sessions_index[0] <= day <= self.sessions_index[-1]
+
+    def is_trading_day(self, d: date) -> bool:
+        day = _to_day(d)
+        if self._covered(day):
+            i = np.searchsorted(self.sessions_index, day)
+            return bool(self.sessions_index[i] == day)
+        return bool(np.is_busday(day, busdaycal=self._busdays))
+
+    def sessions(self, start: date, end: date) -> List[date]:
+        """All trading days in [start, end], in order."""
+        if end < start:
+            return []
+        days = np.arange(_to_day(start), _to_day(end) + 1, dtype="datetime64[D]")
+        if days.size == 0:
+            return []
+        mask = np.is_busday(days, busdaycal=self._busdays)
+        if self.sessions_index.size:
+            inside = (days >= self.sessions_index[0]) & (days <= self.sessions_index[-1])
+            mask[inside] = np.isin(days[inside], self.sessions_index)
+        return [d.item() for d in days[mask]]
+
+    def add_trading_days(self, d: date, n: int) -> date:
+        """Roll ``d`` forward to a session, then move ``n`` sessions later."""
+        current = d
+        while not self.is_trading_day(current):
+            current += timedelta(days=1)
+        steps = 0
+        while steps < n:
+            current += timedelta(days=1)
+            if self.is_trading_day(current):
+                steps += 1
+        return current
+
+
+def _cached_calendar(key: Tuple, build: Callable[[], "TradingCalendar"]) -> "TradingCalendar":
+    with _calendars_lock:
+        cached = _calendars.get(key)
+        if cached is not None:
+            _calendars.move_to_end(key)
+            return cached
+    calendar = build()
+    with _calendars_lock:
+        _calendars[key] = calendar
+        while len(_calendars) > MAX_CACHED_CALENDARS:
+            _calendars.popitem(last=False)
+    return calendar
+
+
+def get_trading_calendar(
+    ticker: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    market_provider_type: Optional[str] = None,
+    holidays_file: Optional[str] = None,
+) -> TradingCalendar:
+    """
+    Resolve the calendar used for evaluation:
+      1. ``holidays_file``, else the holiday file from settings, if configured
+      2. the cached price index of ``ticker`` over [start, end] (via the market provider)
+      3. a plain weekday calendar
+    """
+    from app.core.common.config import settings
+    from app.core.market.interfaces.i_market_data_provider import file_data_version
+
+    holidays_file = holidays_file or settings.trading_holidays_file
+    if holidays_file:
+        return _cached_calendar(("file", holidays_file, file_data_version(holidays_file)),
+                                lambda: TradingCalendar.from_holiday_file(holidays_file))
+
+    if ticker and start and end:
+        from app.core.market.factories.provider_factory import get_market_provider
+        provider_type = market_provider_type or settings.market_provider_type
+        try:
+            provider = get_market_provider(provider_type)
+            key = ("prices", provider_type, ticker, start, end, provider.data_version(ticker))
+        except Exception as ex:
+            logger.warning("Could not derive trading calendar from %s prices: %s", ticker, ex)
+            return TradingCalendar()
+
+        def build() -> TradingCalendar:
+            try:
+                df = provider.fetch_data(ticker, start, end)
+                if df is not None and not df.empty:
+                    return TradingCalendar.from_price_index(df, name=ticker)
+            except Exception as ex:
+                logger.warning("Could not derive trading calendar from %s prices: %s", ticker, ex)
+            return TradingCalendar()
+
+        return _cached_calendar(key, build)
+
+    return TradingCalendar()
+
+
+def exchange_calendar(
+    exchange: Optional[str],
+    start: date,
+    end: date,
+    market_provider_type: Optional[str] = None,
+) -> TradingCalendar:
+    """
+    Trading days of ``exchange`` over [start, end]: its holiday file from
+    settings.exchange_holiday_files, else (via get_trading_calendar) the global holiday
+    file or the price dates of its index. No exchange / UTC uses
+    settings.default_sector_ticker.
+    """
+    from app.core.common.config import settings
+    from app.core.market.exchanges import get_exchange
+
+    session = get_exchange(exchange) if exchange else None
+    holidays_file = (settings.exchange_holiday_files or {}).get(session.code) if session else None
+    ticker = (session.index_ticker if session else None) or settings.default_sector_ticker
+    return get_trading_calendar(ticker, start, end, market_provider_type, holidays_file=holidays_file)
@@ -0,0 +1,285 @@
+# backend/app/core/rules/engine/compiled_rules.py
+"""
+Compiled Rules
+--------------
+Immutable, evaluation-ready snapshots of rules, cached per process.
+
+Compiling resolves everything that does not depend on the instant once per rule
+version: the Relation enum and its handler instance for each condition (and for
+each leaf of the optional and / or / not expression), the outcome sector codes,
+and the confidence. The rules engine then only runs the
+handlers in its inner loop, with no ORM attribute access, enum lookups or
+handler construction per date. Compiled rules are plain dataclasses, so they
+pickle cheaply into evaluation worker processes.
+
+The cache is keyed by (rule pk, updated_at). The rule CRUD routes invalidate it
+explicitly and bump updated_at on every edit, so other processes (job and
+evaluation workers) also pick up the new version on their next load.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.db.enums import Relation
+from app.core.db.models import Rule, Outcome
+from app.core.rules.relations.i_relation import IRelationHandler
+
+import logging
+logger = logging.getLogger("astro.rulesengine.compiled")
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """A condition with its relation resolved; also passed as ``cond`` to the relation handler."""
+    planet: Optional[str]
+    relation: Optional[Relation]
+    target: Optional[str]
+    orb: Optional[float]
+    value: Optional[float]
+    handler: Optional[IRelationHandler] = field(default=None, compare=False, repr=False)
+    # canonical identity: (planet, relation, target, orb, value)
+    key: Tuple = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "key", (
+            (self.planet or "").lower(),
+            self.relation.name if self.relation is not None else None,
+            (self.target or "").lower(),
+            self.orb,
+            self.value,
+        ))
+
+
+@dataclass(frozen=True)
+class CompiledGroup:
+    """Boolean group of a rule expression: op is "and", "or" or "not" (one arg)."""
+    op: str
+    args: Tuple[Union["CompiledGroup", CompiledCondition], ...]
+
+
+CompiledExpression = Union[CompiledGroup, CompiledCondition]
+
+
+def expression_leaves(node: Optional[CompiledExpression]) -> List[CompiledCondition]:
+    if node is None:
+        return []
+    if isinstance(node, CompiledCondition):
+        return [node]
+    return [leaf for arg in node.args for leaf in expression_leaves(arg)]
+
+
+@dataclass(frozen=True)
+class CompiledRuleRef:
+    """
+    Leaf of a composite rule: another rule's persisted activity. Without a window
+    it is the rule's event intervals; ``started_within`` / ``ended_within`` turn
+    each event into the days from its start / end up to N days later.
+    """
+    rule_id: str
+    started_within: Optional[int] = None
+    ended_within: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class CompiledOutcome:
+    sector: Optional[str]
+    effect: Optional[str]
+    weight: Optional[float]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    id: Optional[int]
+    rule_id: str
+    name: Optional[str]
+    confidence: Optional[float]
+    enabled: bool
+    updated_at: Optional[datetime]
+    conditions: Tuple[CompiledCondition, ...]
+    outcomes: Tuple[CompiledOutcome, ...]
+    # ANDed with `conditions` when present
+    expression: Optional[CompiledExpression] = None
+    # composite rules: and / or / not over other rules' events, no astro conditions
+    composite: Optional[Union[CompiledGroup, CompiledRuleRef]] = None
+
+    @property
+    def leaves(self) -> Tuple[CompiledCondition, ...]:
+        """Every condition the rule can check: flat conditions plus expression leaves."""
+        return self.conditions + tuple(expression_leaves(self.expression))
+
+
+def _relation(raw: Any) -> Optional[Relation]:
+    if isinstance(raw, Relation):
+        return raw
+    try:
+        return Relation[raw]
+    except KeyError:
+        return None
+
+
+def compile_condition(cond: Any) -> CompiledCondition:
+    from app.core.rules.relations.registry import get_relation_handler
+
+    relation = _relation(cond.relation)
+    handler = get_relation_handler(relation) if relation is not None else None
+    if handler is None:
+        # never satisfied, same as an unregistered relation at evaluation time
+        logger.warning("No relation handler for relation=%s (planet=%s target=%s)",
+                       cond.relation, cond.planet, cond.target)
+    return CompiledCondition(
+        planet=cond.planet,
+        relation=relation,
+        target=cond.target,
+        orb=cond.orb,
+        value=cond.value,
+        handler=handler,
+    )
+
+
+def compile_expression(data: Optional[Dict[str, Any]]) -> Optional[CompiledExpression]:
+    """Compile the JSON form stored on Rule.expression: {"op", "args"} groups and condition leaves."""
+    if not data:
+        return None
+    if "op" in data:
+        op = str(data["op"]).lower()
+        args = tuple(compile_expression(a) for a in data.get("args") or [])
+        if op not in ("and", "or", "not") or not args or (op == "not" and len(args) != 1):
+            raise ValueError(f"Invalid expression group: op={data.get('op')!r} with {len(args)} argument(s)")
+        return CompiledGroup(op=op, args=args)
+    return compile_condition(SimpleNamespace(
+        planet=data.get("planet"),
+        relation=data.get("relation"),
+        target=data.get("target"),
+        orb=data.get("orb"),
+        value=data.get("value"),
+    ))
+
+
+def compile_composite(data: Optional[Dict[str, Any]]) -> Optional[Union[CompiledGroup, CompiledRuleRef]]:
+    """Compile the JSON form stored on Rule.composite: {"op", "args"} groups and {"rule"} references."""
+    if not data:
+        return None
+    if "op" in data:
+        op = str(data["op"]).lower()
+        args = tuple(compile_composite(a) for a in data.get("args") or [])
+        if op not in ("and", "or", "not") or not args or (op == "not" and len(args) != 1):
+            raise ValueError(f"Invalid composite group: op={data.get('op')!r} with {len(args)} argument(s)")
+        return CompiledGroup(op=op, args=args)
+    if not data.get("rule"):
+        raise ValueError(f"Invalid composite reference: {data!r}")
+    return CompiledRuleRef(
+        rule_id=str(data["rule"]),
+        started_within=data.get("started_within"),
+        ended_within=data.get("ended_within"),
+    )
+
+
+def composite_refs(node: Optional[Union[CompiledGroup, CompiledRuleRef]]) -> List[CompiledRuleRef]:
+    if node is None:
+        return []
+    if isinstance(node, CompiledRuleRef):
+        return [node]
+    return [ref for arg in node.args for ref in composite_refs(arg)]
+
+
+def compile_rule(rule: Any) -> CompiledRule:
+    """Compile an ORM Rule (or any object with the same attributes)."""
+    if isinstance(rule, CompiledRule):
+        return rule
+    return CompiledRule(
+        id=getattr(rule, "id", None),
+        rule_id=rule.rule_id,
+        name=getattr(rule, "name", None),
+        confidence=rule.confidence,
+        enabled=getattr(rule, "enabled", True) is not False,
+        updated_at=getattr(rule, "updated_at", None),
+        conditions=tuple(compile_condition(c) for c in (rule.conditions or [])),
+        outcomes=tuple(
+            CompiledOutcome(
+                sector=o.sector.code if getattr(o, "sector", None) is not None else None,
+                effect=o.effect,
+                weight=o.weight,
+            )
+            for o in (rule.outcomes or [])
+        ),
+        expression=compile_expression(_expression_data(getattr(rule, "expression", None))),
+        composite=compile_composite(_expression_data(getattr(rule, "composite", None))),
+    )
+
+
+def _expression_data(expression: Any) -> Optional[Dict[str, Any]]:
+    # ORM rules hold the JSON dict; schema objects hold pydantic models
+    if expression is None or isinstance(expression, dict):
+        return expression
+    return expression.model_dump(exclude_none=True)
+
+
+class CompiledRuleCache:
+    """Process-local cache of compiled rules keyed by (rule pk, updated_at)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rules: Dict[int, CompiledRule] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def get(self, rule: Any) -> CompiledRule:
+        """Compiled form of ``rule``, compiling it if this version is not cached yet."""
+        if isinstance(rule, CompiledRule):
+            return rule
+        pk = getattr(rule, "id", None)
+        if pk is None:
+            return compile_rule(rule)  # transient rule: nothing to key on
+        with self._lock:
+            cached = self._rules.get(pk)
+        if cached is not None and cached.updated_at == getattr(rule, "updated_at", None):
+            return cached
+        compiled = compile_rule(rule)
+        with self._lock:
+            self._rules[pk] = compiled
+        return compiled
+
+    def load_enabled(self, db: Session) -> List[CompiledRule]:
+        """
+        Compiled enabled rules ordered by pk. Only a (pk, updated_at) stamp query
+        runs when nothing changed; new or edited rules are loaded in one query.
+        """
+        stamps = db.execute(
+            select(Rule.id, Rule.updated_at).where(Rule.enabled == True).order_by(Rule.id)
+        ).all()
+        with self._lock:
+            stale = [pk for pk, ts in stamps
+                     if pk not in self._rules or self._rules[pk].updated_at != ts]
+        if stale:
+            rows = db.execute(
+                select(Rule)
+                .where(Rule.id.in_(stale))
+                .options(joinedload(Rule.outcomes).joinedload(Outcome.sector))
+            ).unique().scalars().all()
+            compiled = [compile_rule(r) for r in rows]
+            with self._lock:
+                for c in compiled:
+                    self._rules[c.id] = c
+            logger.debug("Compiled %d rule(s) (%d cached)", len(compiled), len(stamps) - len(stale))
+        with self._lock:
+            return [self._rules[pk] for pk, _ in stamps if pk in self._rules]
+
+    def invalidate(self, rule_pks: Optional[Iterable[int]] = None) -> None:
+        """Forget the given rules (default: all)."""
+        with self._lock:
+            if rule_pks is None:
+                self._rules.clear()
+            else:
+                for pk in rule_pks:
+                    self._rules.pop(pk, None)
+
+
+# process-wide instance
+compiled_rules = CompiledRuleCache()
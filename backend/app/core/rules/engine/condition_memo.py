@@ -0,0 +1,73 @@
+# backend/app/core/rules/engine/condition_memo.py
+"""
+Condition Memo
+--------------
+Cross-rule deduplication of condition checks.
+
+Compiled conditions are identified by their canonical key
+(planet, relation, target, orb, value). Many rules share conditions that differ
+only in their outcomes, so a condition's result at an instant is computed once
+and reused by every other rule that contains it:
+
+  - per instant: ``RulesEngineImpl.evaluate_rules`` evaluates a set of rules at
+    one instant with a plain dict as memo.
+  - per range: ``ConditionMemo`` keeps one int8 array per shared key over a
+    sequence of days (-1 unknown, 0 false, 1 true), used when rules are
+    evaluated one after another across the same days (event generation).
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.rules.engine.compiled_rules import CompiledRule
+
+UNKNOWN = -1
+
+
+def shared_condition_keys(rules: Iterable[CompiledRule]) -> Set[Tuple]:
+    """Canonical condition keys appearing in more than one rule."""
+    counts = Counter(key for rule in rules for key in {c.key for c in rule.leaves})
+    return {key for key, n in counts.items() if n > 1}
+
+
+class _DayView:
+    """Dict-like memo for one day of a ConditionMemo, as consumed by the rules engine."""
+
+    __slots__ = ("_memo", "_day")
+
+    def __init__(self, memo: "ConditionMemo", day: int):
+        self._memo = memo
+        self._day = day
+
+    def get(self, key: Tuple, default=None) -> Optional[bool]:
+        arr = self._memo.results.get(key)
+        if arr is None or arr[self._day] == UNKNOWN:
+            return default
+        return bool(arr[self._day])
+
+    def __setitem__(self, key: Tuple, value: bool) -> None:
+        arr = self._memo.results.get(key)
+        if arr is not None:  # only shared keys are stored
+            arr[self._day] = 1 if value else 0
+
+
+class ConditionMemo:
+    """Results of the shared condition keys over ``n_days`` consecutive evaluation days."""
+
+    def __init__(self, keys: Iterable[Tuple], n_days: int):
+        self.n_days = n_days
+        self.results: Dict[Tuple, np.ndarray] = {
+            key: np.full(n_days, UNKNOWN, dtype=np.int8) for key in keys
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self.results)
+
+    def at(self, day: int) -> _DayView:
+        return _DayView(self, day)
+
+    def computed(self) -> int:
+        """Number of memoized (key, day) results."""
+        return int(sum(np.count_nonzero(arr != UNKNOWN) for arr in self.results.values()))
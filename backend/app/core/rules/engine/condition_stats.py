@@ -0,0 +1,152 @@
+# backend/app/core/rules/engine/condition_stats.py
+"""
+Condition Statistics
+--------------------
+Runtime pass rate and cost per canonical condition, used to reorder each
+compiled rule's conditions so the evaluation short-circuits as early and as
+cheaply as possible.
+
+A rule's conditions are ANDed, so their order never changes the result, only
+the work done. With pass rate p and cost c per check, the expected cost of a
+rejection is minimised by sorting on c / (1 - p) ascending: cheap conditions
+that usually fail run first.
+
+Cost is the measured mean check time once every condition of a rule has
+``min_samples`` checks, and the handler's a-priori ephemeris-call count before
+that (two-body relations cost 2, retrograde on Skyfield costs 2). Pass rates use
+a Laplace estimate, so unseen conditions start at 1/2. Orders are recomputed
+every ``reorder_every`` recorded checks and cached per stored rule version
+(least recently used evicted beyond MAX_CACHED_ORDERS); transient rules (no
+pk, e.g. built by sweeps, mining or previews) are ranked without caching.
+
+Statistics are per process: evaluation and job workers keep their own.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from app.core.rules.engine.compiled_rules import CompiledCondition, CompiledRule
+from app.core.common.config import settings
+
+# cached condition orders (one per stored rule version)
+MAX_CACHED_ORDERS = 4096
+
+
+class _Entry:
+    __slots__ = ("checks", "passes", "seconds", "static_cost")
+
+    def __init__(self, static_cost: float):
+        self.checks = 0
+        self.passes = 0
+        self.seconds = 0.0
+        self.static_cost = static_cost
+
+
+class ConditionStats:
+    def __init__(self, min_samples: int = 50, reorder_every: int = 10000):
+        self.min_samples = min_samples
+        self.reorder_every = reorder_every
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, _Entry] = {}
+        self._orders: "OrderedDict[Tuple, Tuple[int, Tuple[CompiledCondition, ...]]]" = OrderedDict()
+        self._recorded = 0
+        self._epoch = 0
+
+    # -------------------------------------------------------
+    def record(self, cond: CompiledCondition, passed: bool, seconds: float, provider: Any) -> None:
+        """Count one check of ``cond`` (hot path: no locking, counts are best-effort)."""
+        entry = self._entries.get(cond.key)
+        if entry is None:
+            entry = self._entries.setdefault(cond.key, _Entry(_static_cost(cond, provider)))
+        entry.checks += 1
+        entry.passes += passed
+        entry.seconds += seconds
+        self._recorded += 1
+        if self._recorded % self.reorder_every == 0:
+            self._epoch += 1
+
+    def pass_rate(self, key: Tuple) -> float:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0.5
+        return (entry.passes + 1.0) / (entry.checks + 2.0)
+
+    def _ranks(self, conditions: Tuple[CompiledCondition, ...], provider: Any) -> List[float]:
+        entries = [self._entries.get(c.key) for c in conditions]
+        measured = all(e is not None and e.checks >= self.min_samples for e in entries)
+        ranks = []
+        for cond, entry in zip(conditions, entries):
+            if measured:
+                cost = entry.seconds / entry.checks
+            else:
+                cost = entry.static_cost if entry is not None else _static_cost(cond, provider)
+            ranks.append(cost / max(1.0 - self.pass_rate(cond.key), 1e-6))
+        return ranks
+
+    def order(self, rule: CompiledRule, provider: Any = None) -> Tuple[CompiledCondition, ...]:
+        """The rule's conditions, cheapest and most selective first."""
+        conditions = rule.conditions
+        if len(conditions) < 2:
+            return conditions
+        if rule.id is None:
+            # transient rule: never cached, so neither leaks nor shares a stale order by code
+            return self._ranked(conditions, provider)
+        key = (rule.id, rule.updated_at, tuple(c.key for c in conditions))
+        cached = self._orders.get(key)
+        if cached is not None and cached[0] == self._epoch:
+            self._orders.move_to_end(key)
+            return cached[1]
+        ordered = self._ranked(conditions, provider)
+        self._orders[key] = (self._epoch, ordered)
+        self._orders.move_to_end(key)
+        while len(self._orders) > MAX_CACHED_ORDERS:
+            self._orders.popitem(last=False)
+        return ordered
+
+    def _ranked(self, conditions: Tuple[CompiledCondition, ...], provider: Any) -> Tuple[CompiledCondition, ...]:
+        ranks = self._ranks(conditions, provider)
+        # stable: ties keep the stored order
+        return tuple(conditions[i] for i in sorted(range(len(conditions)), key=ranks.__getitem__))
+
+    # -------------------------------------------------------
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-condition stats, most checked first."""
+        with self._lock:
+            items = list(self._entries.items())
+        out = []
+        for (planet, relation, target, orb, value), e in items:
+            out.append({
+                "planet": planet,
+                "relation": relation,
+                "target": target or None,
+                "orb": orb,
+                "value": value,
+                "checks": e.checks,
+                "passes": e.passes,
+                "pass_rate": round(e.passes / e.checks, 6) if e.checks else None,
+                "mean_cost_us": round(e.seconds / e.checks * 1e6, 3) if e.checks else None,
+                "ephemeris_calls": e.static_cost,
+            })
+        out.sort(key=lambda r: -r["checks"])
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._orders.clear()
+            self._recorded = 0
+            self._epoch += 1
+
+
+def _static_cost(cond: CompiledCondition, provider: Any) -> float:
+    if cond.handler is None:
+        return 0.0
+    try:
+        return float(cond.handler.cost(provider))
+    except Exception:
+        return 1.0
+
+
+# process-wide instance
+condition_stats = ConditionStats(settings.condition_stats_min_samples, settings.condition_reorder_every)
@@ -0,0 +1,77 @@
+# backend/app/core/rules/engine/expression.py
+"""
+Rule Expressions over Ranges
+----------------------------
+Range evaluation of rules with a boolean expression (and / or / not groups).
+
+Each distinct leaf condition is evaluated once per instant into a packed
+bitmask (numpy.packbits, 8 days per byte); groups are then combined with
+vectorized bitwise AND / OR / NOT over the whole range, so an expression such
+as "(Mars square Saturn OR Mars conjunct Rahu) AND NOT Jupiter retrograde"
+costs one pass per leaf instead of one rule evaluation per alternative.
+Leaves are computed lazily: once the flat conditions rule out every day the
+expression is not evaluated at all.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.rules.engine.compiled_rules import CompiledCondition, CompiledExpression, CompiledRule
+from app.core.rules.engine.condition_memo import ConditionMemo
+
+
+def pack(bits: np.ndarray) -> np.ndarray:
+    return np.packbits(np.asarray(bits, dtype=bool))
+
+
+def unpack(mask: np.ndarray, n: int) -> np.ndarray:
+    return np.unpackbits(mask, count=n).astype(bool)
+
+
+def evaluate_packed(node: CompiledExpression, leaf: Callable[[CompiledCondition], np.ndarray],
+                    valid: np.ndarray) -> np.ndarray:
+    """
+    Combine packed leaf masks through the expression tree. ``valid`` has a bit set
+    for every real day, so NOT never turns on the padding bits of the last byte.
+    """
+    if isinstance(node, CompiledCondition):
+        return leaf(node)
+    if node.op == "not":
+        return np.bitwise_and(np.invert(evaluate_packed(node.args[0], leaf, valid)), valid)
+    combine = np.bitwise_and if node.op == "and" else np.bitwise_or
+    out = evaluate_packed(node.args[0], leaf, valid)
+    for arg in node.args[1:]:
+        out = combine(out, evaluate_packed(arg, leaf, valid))
+    return out
+
+
+def rule_mask(engine, rule: CompiledRule, instants: Sequence[datetime],
+              memo: Optional[ConditionMemo] = None,
+              series: Optional[Callable[[CompiledCondition], np.ndarray]] = None) -> np.ndarray:
+    """
+    Bool array: whether ``rule`` (flat conditions AND expression) holds at each instant.
+    ``series(cond)`` overrides how a condition's bool array is obtained (e.g. from a cache).
+    """
+    n = len(instants)
+    bits: Dict[Tuple, np.ndarray] = {}
+
+    def leaf(cond: CompiledCondition) -> np.ndarray:
+        if cond.key not in bits:
+            if series is not None:
+                bits[cond.key] = pack(series(cond))
+            else:
+                shared = memo.results.get(cond.key) if memo is not None else None
+                bits[cond.key] = pack(engine.condition_series(cond, instants, shared))
+        return bits[cond.key]
+
+    valid = pack(np.ones(n, dtype=bool))
+    mask = valid
+    for cond in rule.conditions:
+        mask = np.bitwise_and(mask, leaf(cond))
+        if not mask.any():
+            return np.zeros(n, dtype=bool)
+    if rule.expression is not None:
+        mask = np.bitwise_and(mask, evaluate_packed(rule.expression, leaf, valid))
+    return unpack(mask, n)
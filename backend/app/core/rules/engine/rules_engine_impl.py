@@ -1,68 +1,126 @@
 from datetime import datetime
-from typing import List, Dict, Any
+from time import perf_counter
+import numpy as np
+from typing import Any, Dict, List, MutableMapping, Optional, Sequence, Tuple
 from app.core.rules.interfaces.i_rules_engine import IRulesEngine
 from app.core.astro.interfaces.i_astro_provider import IAstroProvider
-from app.core.common.schemas import RuleCreate, ConditionRead
-from app.core.db.enums import Relation
+from app.core.common.schemas import RuleCreate
+from app.core.rules.engine.compiled_rules import CompiledCondition, CompiledExpression, compiled_rules
+from app.core.rules.engine.condition_stats import ConditionStats, condition_stats
+from app.core.common.config import settings
 import logging
 logger = logging.getLogger("astro.rulesengine")
 
+# canonical condition key -> result at one instant (a dict, or a ConditionMemo day view)
+ConditionResults = MutableMapping[Tuple, bool]
+
 class RulesEngineImpl(IRulesEngine):
     """Concrete rules engine depending on IAstroProvider abstraction."""
 
-    def __init__(self, provider: IAstroProvider, orb_default: float = 5.0):
+    def __init__(self, provider: IAstroProvider, orb_default: float = 5.0,
+                 stats: Optional[ConditionStats] = None):
         self.provider = provider
         self.orb_default = orb_default
+        # runtime condition statistics drive the per-rule condition order (None = stored order)
+        if stats is None and settings.condition_ordering:
+            stats = condition_stats
+        self.stats = stats
         logger.debug("RulesEngineImpl initialized with provider=%s orb_default=%s",
              getattr(self.provider, "__class__", type(self.provider)), orb_default)
 
 
-    def evaluate_rule(self, rule: RuleCreate, when: datetime) -> List[Dict[str, Any]]:
+    def evaluate_rule(self, rule: RuleCreate, when: datetime, memo: Optional[ConditionResults] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate ``rule`` (ORM rule, schema object or CompiledRule) at ``when``.
+        Non-compiled rules are compiled through the process-wide compiled-rule cache.
+        ``memo`` maps canonical condition keys to results already computed at
+        ``when`` (by other rules); new results are written back into it.
+        """
+        compiled = compiled_rules.get(rule)
         logger.debug("evaluate_rule: rule_id=%s when=%s conditions=%d outcomes=%d",
-             getattr(rule, "rule_id", None), when.isoformat(), len(rule.conditions or []), len(rule.outcomes or []))
+             compiled.rule_id, when.isoformat(), len(compiled.conditions), len(compiled.outcomes))
+        if compiled.composite is not None:
+            # composite rules are not astro conditions: their activity comes from
+            # other rules' persisted events (app.core.analysis.composite_rules)
+            return []
 
-        for cond in rule.conditions:
-            if not self._check_condition(cond, when):
+        conditions = compiled.conditions if self.stats is None else self.stats.order(compiled, self.provider)
+        for cond in conditions:
+            if not self._check_memo(cond, when, memo):
                 return []
-        events = []
-        for out in rule.outcomes:
-            logger.debug(f"oc: {out}")
-            events.append({
-                "rule_id": rule.rule_id,
-                "date": (when.date() if hasattr(when, "date") else when).isoformat(),
-                "sector": out.sector.code,
+        if compiled.expression is not None and not self._evaluate_expression(compiled.expression, when, memo):
+            return []
+        if not compiled.outcomes:
+            return []
+        day = (when.date() if hasattr(when, "date") else when).isoformat()
+        events = [
+            {
+                "rule_id": compiled.rule_id,
+                "date": day,
+                "sector": out.sector,
                 "effect": out.effect,
                 "weight": out.weight,
-                "confidence": rule.confidence
-            })
+                "confidence": compiled.confidence,
+            }
+            for out in compiled.outcomes
+        ]
         logger.debug("evaluate_rule -> events_count=%d events=%s", len(events), events)
         return events
 
-    def _check_condition(self, cond: ConditionRead, when: datetime) -> bool:
-        from app.core.rules.relations.registry import get_relation_handler
-        planet = (cond.planet or "").lower()
-        relation = Relation[cond.relation]
-        target = (cond.target or "").lower()
-        orb = cond.orb if cond.orb is not None else self.orb_default
-        logger.debug("Checking condition: planet=%s relation=%s target=%s orb=%s", planet, relation, target, orb)
+    def evaluate_rules(self, rules: Sequence[Any], when: datetime) -> List[Dict[str, Any]]:
+        """
+        Evaluate several rules at one instant, checking each distinct condition
+        (planet, relation, target, orb, value) only once across all of them.
+        Events are returned in rule order.
+        """
+        memo: Dict[Tuple, bool] = {}
+        events: List[Dict[str, Any]] = []
+        for rule in rules:
+            events.extend(self.evaluate_rule(rule, when, memo=memo))
+        return events
 
-        try:
-            lon = self.provider.longitude(planet, when)
-            logger.debug("Provider longitude: planet=%s when=%s lon=%.6f", planet, when.isoformat(), lon)
-        except Exception as exc:
-            logger.exception("Provider.longitude failed for planet=%s when=%s: %s", planet, when, exc)
-            return False
+    def condition_series(self, cond: CompiledCondition, instants: Sequence[datetime],
+                         shared: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Result of ``cond`` at every instant as a bool array. ``shared`` is an int8
+        ConditionMemo array over the same instants (-1 = unknown); it is read and filled in.
+        """
+        if shared is None:
+            return np.fromiter((self._check_condition(cond, w) for w in instants), dtype=bool, count=len(instants))
+        for i in np.nonzero(shared < 0)[0]:
+            shared[i] = self._check_condition(cond, instants[i])
+        return shared.astype(bool)
 
-        # Delegate to dedicated handler (registered in app/core/rules/relations)
-        handler = get_relation_handler(relation)
-        if handler is None:
-            logger.warning("No relation handler registered for relation=%s (condition=%s)", relation, cond)
-            return False
+    def _evaluate_expression(self, node: CompiledExpression, when: datetime,
+                             memo: Optional[ConditionResults] = None) -> bool:
+        """Short-circuit evaluation of an and / or / not expression tree at one instant."""
+        if isinstance(node, CompiledCondition):
+            return self._check_memo(node, when, memo)
+        if node.op == "and":
+            return all(self._evaluate_expression(arg, when, memo) for arg in node.args)
+        if node.op == "or":
+            return any(self._evaluate_expression(arg, when, memo) for arg in node.args)
+        return not self._evaluate_expression(node.args[0], when, memo)
+
+    def _check_memo(self, cond: CompiledCondition, when: datetime, memo: Optional[ConditionResults]) -> bool:
+        if memo is None:
+            return self._check_condition(cond, when)
+        ok = memo.get(cond.key)
+        if ok is None:
+            ok = self._check_condition(cond, when)
+            memo[cond.key] = ok
+        return ok
 
+    def _check_condition(self, cond: CompiledCondition, when: datetime) -> bool:
+        if cond.handler is None:
+            return False
+        started = perf_counter() if self.stats is not None else 0.0
+        # the handler reads positions itself and treats provider errors as "not satisfied"
         try:
-            result = handler.check(self.provider, cond, when, self.orb_default)
-            logger.debug("Relation handler result: relation=%s result=%s", relation, result)
-            return result
+            result = bool(cond.handler.check(self.provider, cond, when, self.orb_default))
         except Exception as exc:
-            logger.exception("Relation handler raised exception for relation=%s cond=%s: %s", relation, cond, exc)
-            return False
+            logger.exception("Relation handler raised exception for relation=%s cond=%s: %s", cond.relation, cond, exc)
+            result = False
+        if self.stats is not None:
+            self.stats.record(cond, result, perf_counter() - started, self.provider)
+        return result
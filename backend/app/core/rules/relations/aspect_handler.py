@@ -12,6 +12,8 @@ class AspectHandler(IRelationHandler):
     Otherwise, target_angle should be supplied by a wrapper or subclass.
     """
 
+    EPHEMERIS_CALLS = 2
+
     def __init__(self, target_angle: Optional[float] = None):
         self.target_angle = float(target_angle) if target_angle is not None else None
 
@@ -26,20 +28,14 @@ class AspectHandler(IRelationHandler):
                 angle = None
         if angle is None and self.target_angle is not None:
             angle = self.target_angle
-        print(f"angle: {angle}")    
         if angle is None:
             # no aspect defined
             return False
 
         planet = (cond.planet or "").lower()
         target = (cond.target or "").lower()
-        print(f"planet: {planet}, target: {target}")
         try:
-            lon = provider.longitude(planet, when)
-            tlon = provider.longitude(target, when)
+            d = provider.separation(planet, target, when)
         except Exception:
             return False
-        print(f"lhs_lon: {lon}, rhs_lon: {tlon}")
-        d = provider.angular_distance(lon, tlon)
-        print(f"angular_distance: {d}, angle: {angle}, orb: {orb}, abs(d - angle): {abs(d - angle)}")    
         return abs(d - angle) <= orb
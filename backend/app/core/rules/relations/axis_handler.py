@@ -9,16 +9,16 @@ logger = logging.getLogger("astro.axis")
 class AxisHandler(IRelationHandler):
     """Checks if two planets are in opposition (≈ 180° apart) within a given orb."""
 
+    EPHEMERIS_CALLS = 2
+
     def check(self, provider, cond: ConditionRead, when: datetime, orb_default: float) -> bool:
         try:
             orb = cond.orb or orb_default
-            lon = provider.longitude(cond.planet, when)
-            tlon = provider.longitude(cond.target, when)
-            ang = provider.angular_distance(lon, tlon)
+            ang = provider.separation(cond.planet, cond.target, when)
 
             logger.debug(
                 f"[AxisHandler] planet={cond.planet} target={cond.target} "
-                f"lon={lon:.2f}° tlon={tlon:.2f}° ang={ang:.2f}° orb={orb:.2f}"
+                f"ang={ang:.2f}° orb={orb:.2f}"
             )
 
             # "In Axis" → planets are opposite (≈ 180° apart)
@@ -12,6 +12,7 @@ class CombustHandler(IRelationHandler):
     Uses cond.orb if provided, else reads per-planet orb from settings.combust_orbs or uses a fallback default.
     """
 
+    EPHEMERIS_CALLS = 2
     DEFAULT_ORB = 8.0  # example fallback; treat as configurable in settings
 
     def check(self, provider: IAstroProvider, cond: ConditionRead, when: datetime, orb_default: float) -> bool:
@@ -34,9 +35,6 @@ class CombustHandler(IRelationHandler):
         use_orb = orb if orb is not None else (cfg_orb if cfg_orb is not None else self.DEFAULT_ORB)
 
         try:
-            lon = provider.longitude(planet, when)
-            sun_lon = provider.longitude("sun", when)
+            return provider.separation(planet, "sun", when) <= use_orb
         except Exception:
             return False
-
-        return provider.angular_distance(lon, sun_lon) <= use_orb
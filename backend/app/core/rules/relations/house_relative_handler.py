@@ -17,6 +17,9 @@ class HouseRelativeHandler(IRelationHandler):
     This uses angular distance relative to reference planet and optionally cond.value
     may specify a house offset (e.g., 4 for 4th from reference).
     """
+
+    EPHEMERIS_CALLS = 2
+
     def check(self, provider: IAstroProvider, cond: ConditionRead, when: datetime, orb_default: float) -> bool:
         try:
             orb = cond.orb or orb_default
@@ -11,6 +11,13 @@ class IRelationHandler(ABC):
     Handlers encapsulate logic for a single Relation type and return True/False.
     """
 
+    # ephemeris lookups per check (a-priori cost used to order a rule's conditions)
+    EPHEMERIS_CALLS = 1
+
+    def cost(self, provider: IAstroProvider) -> float:
+        """Relative cost of one check with ``provider``, in ephemeris lookups."""
+        return float(self.EPHEMERIS_CALLS)
+
     @abstractmethod
     def check(self, provider: IAstroProvider, cond: ConditionRead, when: datetime, orb_default: float) -> bool:
         """
@@ -13,8 +13,7 @@ class NakshatraOwnedHandler(IRelationHandler):
         planet = (cond.planet or "").lower()
         owner_target = (cond.target or "").lower()
         try:
-            lon = provider.longitude(planet, when)
-            nk = provider.nakshatra_index(lon)
+            nk = provider.planet_nakshatra(planet, when)
             owner = provider.nakshatra_owner(nk)
         except Exception:
             return False
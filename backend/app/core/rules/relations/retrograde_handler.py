@@ -9,6 +9,10 @@ class RetrogradeHandler(IRelationHandler):
     Check if planet is retrograde at 'when'.
     cond.target is ignored. cond.value may be used for 'is not retrograde' if desired.
     """
+    def cost(self, provider: IAstroProvider) -> float:
+        # providers without a speed output sample the longitude twice (e.g. Skyfield)
+        return float(getattr(provider, "RETROGRADE_EPHEMERIS_CALLS", 1))
+
     def check(self, provider: IAstroProvider, cond: ConditionRead, when: datetime, orb_default: float) -> bool:
         planet = (cond.planet or "").lower()
         try:
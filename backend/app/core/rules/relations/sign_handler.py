@@ -58,17 +58,14 @@ class SignHandler(IRelationHandler):
         target_raw = (condition.target or "").strip()
 
         try:
-            lon = provider.longitude(planet, when)
+            # 🔧 sign index of the normalized longitude (or from the provider's ingress calendar)
+            sign_index = provider.planet_sign(planet, when)
         except Exception:
             return False
-        
-        # 🔧 Normalize and compute sign index correctly
-        lon = lon % 360.0
-        sign_index = int(lon // 30.0)
 
         target_index = self._resolve_target_index(target_raw)
         # Debug (optional)
-        # print(f"sign_index={sign_index}, target_index={target_index}, lon={lon}")
+        # print(f"sign_index={sign_index}, target_index={target_index}")
 
         if target_index is None:
             return False
@@ -0,0 +1,277 @@
+# backend/app/core/services/activity_index.py
+"""
+Activity Index
+--------------
+In-memory sorted-endpoint index over persisted RuleEvent intervals, answering
+"which rules are active on X", "active between X and Y" and "next activation
+after X" without touching the database.
+
+Intervals are bucketed by length class (lengths in [2^(k-1), 2^k) days share
+bucket k); each bucket holds numpy arrays sorted by start day (proleptic
+ordinals). A stabbing query binary-searches every bucket's start array from
+``lo - bucket max length`` to ``hi`` and filters that window on end day. Since
+lengths within a bucket differ by at most 2x, a long interval only widens the
+window of its own bucket, and removing it shrinks that bucket's bound again.
+
+Every write to rule_events advances the ``rule_events`` row of data_versions in
+the same transaction (``bump_events_version``). Generation and rule deletion in
+this process update the index incrementally and advance its stamp with it
+(``writing``); writes from other processes (generation jobs run in the job
+worker pool) are picked up by ``refresh``, which reloads when the stored version
+moved past the index's.
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Rule
+from app.core.db.models_analysis import DataVersion, RuleEvent
+
+import logging
+logger = logging.getLogger("astro.activity")
+
+
+# data_versions row advanced by every rule_events write
+EVENTS_VERSION = "rule_events"
+
+FIELDS = ("starts", "ends", "event_ids", "rule_pks", "providers")
+
+
+def bump_events_version(db: Session) -> int:
+    """
+    Advance the rule_events version inside the caller's transaction (call before
+    committing a write to rule_events); returns the new version.
+    """
+    bumped = db.execute(
+        update(DataVersion).where(DataVersion.name == EVENTS_VERSION).values(version=DataVersion.version + 1)
+    ).rowcount
+    if not bumped:
+        db.add(DataVersion(name=EVENTS_VERSION, version=1))
+        db.flush()
+    return db.scalar(select(DataVersion.version).where(DataVersion.name == EVENTS_VERSION))
+
+
+class _Bucket:
+    """Intervals of one length class, sorted by start day."""
+
+    __slots__ = FIELDS + ("max_length",)
+
+    def __init__(self):
+        self.starts = np.array([], dtype=np.int64)
+        self.ends = np.array([], dtype=np.int64)
+        self.event_ids = np.array([], dtype=np.int64)
+        self.rule_pks = np.array([], dtype=np.int64)
+        self.providers = np.array([], dtype=object)
+        self.max_length = 0
+
+    def insert(self, starts, ends, event_ids, rule_pks, providers) -> None:
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        # merge the sorted batch into the existing sorted arrays
+        pos = np.searchsorted(self.starts, starts, side="right")
+        self.starts = np.insert(self.starts, pos, starts)
+        self.ends = np.insert(self.ends, pos, ends[order])
+        self.event_ids = np.insert(self.event_ids, pos, event_ids[order])
+        self.rule_pks = np.insert(self.rule_pks, pos, rule_pks[order])
+        self.providers = np.insert(self.providers, pos, providers[order])
+        self.max_length = int((self.ends - self.starts).max())
+
+    def remove(self, mask: np.ndarray) -> int:
+        removed = int(mask.sum())
+        if removed:
+            keep = ~mask
+            for name in FIELDS:
+                setattr(self, name, getattr(self, name)[keep])
+            self.max_length = int((self.ends - self.starts).max()) if len(self.starts) else 0
+        return removed
+
+    def window(self, lo_day: int, hi_day: int) -> np.ndarray:
+        """Indices of intervals overlapping [lo_day, hi_day]."""
+        lo = np.searchsorted(self.starts, lo_day - self.max_length, side="left")
+        hi = np.searchsorted(self.starts, hi_day, side="right")
+        return lo + np.flatnonzero(self.ends[lo:hi] >= lo_day)
+
+
+class ActivityIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        # rule_events version the index reflects
+        self._stamp: Optional[int] = None
+        self._reset()
+
+    def _reset(self):
+        self._buckets: Dict[int, _Bucket] = {}
+        self.rule_codes: Dict[int, str] = {}
+
+    # ---------------------
+    # Building / updates
+    # ---------------------
+    @staticmethod
+    def _table_stamp(db: Session) -> int:
+        """Stored rule_events version (see bump_events_version); one primary-key lookup."""
+        return db.scalar(select(DataVersion.version).where(DataVersion.name == EVENTS_VERSION)) or 0
+
+    def load(self, db: Session) -> int:
+        """(Re)build the index from every persisted RuleEvent."""
+        stamp = self._table_stamp(db)
+        rows = db.execute(
+            select(RuleEvent.id, RuleEvent.rule_id, RuleEvent.start_date, RuleEvent.end_date,
+                   RuleEvent.provider, Rule.rule_id.label("rule_code"))
+            .join(Rule, Rule.id == RuleEvent.rule_id)
+        ).all()
+        with self._lock:
+            self._reset()
+            self._insert(
+                [(r.id, r.rule_id, r.start_date, r.end_date, r.provider) for r in rows],
+                {r.rule_id: r.rule_code for r in rows},
+            )
+            self.loaded = True
+            self._stamp = stamp
+        logger.info("Activity index loaded: %d intervals", len(rows))
+        return len(rows)
+
+    def refresh(self, db: Session) -> None:
+        """Load on first use and reload when rule_events changed (e.g. written by a job process)."""
+        if not self.loaded or self._table_stamp(db) != self._stamp:
+            self.load(db)
+
+    @contextmanager
+    def writing(self, version: int) -> Iterator[bool]:
+        """
+        Apply this process's committed write of ``version`` (from bump_events_version):
+        yields True when the index reflects exactly the previous version, so the
+        caller's incremental updates inside the block bring it to ``version``.
+        Otherwise (not loaded, or another writer came in between) yields False and
+        the next ``refresh`` reloads.
+        """
+        with self._lock:
+            current = self.loaded and self._stamp == version - 1
+            yield current
+            if current:
+                self._stamp = version
+
+    def _insert(self, records: List[tuple], rule_codes: Dict[int, str]) -> None:
+        if not records:
+            return
+        starts = np.array([r[2].toordinal() for r in records], dtype=np.int64)
+        ends = np.array([(r[3] or r[2]).toordinal() for r in records], dtype=np.int64)
+        event_ids = np.array([r[0] for r in records], dtype=np.int64)
+        rule_pks = np.array([r[1] for r in records], dtype=np.int64)
+        providers = np.array([r[4] for r in records], dtype=object)
+        # length class: 0 -> 0, 1 -> 1, 2..3 -> 2, 4..7 -> 3, ...
+        classes = np.array([int(n).bit_length() for n in ends - starts])
+        for k in np.unique(classes):
+            sel = classes == k
+            self._buckets.setdefault(int(k), _Bucket()).insert(
+                starts[sel], ends[sel], event_ids[sel], rule_pks[sel], providers[sel]
+            )
+        self.rule_codes.update(rule_codes)
+
+    def _remove(self, mask_of: Callable[[_Bucket], np.ndarray]) -> int:
+        removed = sum(b.remove(mask_of(b)) for b in self._buckets.values())
+        self._buckets = {k: b for k, b in self._buckets.items() if len(b.starts)}
+        return removed
+
+    def add_events(self, events: Iterable[RuleEvent], rule_code: Optional[str] = None) -> None:
+        """Add freshly persisted events (no-op until the index has been loaded)."""
+        with self._lock:
+            if not self.loaded:
+                return
+            events = list(events)
+            codes = {e.rule_id: rule_code for e in events if rule_code}
+            self._insert([(e.id, e.rule_id, e.start_date, e.end_date, e.provider) for e in events], codes)
+
+    def remove_rule_events(self, rule_pk: int, start: Optional[date] = None, end: Optional[date] = None,
+                           provider: Optional[str] = None) -> int:
+        """Drop a rule's intervals (optionally only those overlapping [start, end] / for one provider)."""
+        def mask_of(b: _Bucket) -> np.ndarray:
+            mask = b.rule_pks == rule_pk
+            if end is not None:
+                mask &= b.starts <= end.toordinal()
+            if start is not None:
+                mask &= b.ends >= start.toordinal()
+            if provider is not None:
+                mask &= b.providers == provider
+            return mask
+
+        with self._lock:
+            if not self.loaded:
+                return 0
+            return self._remove(mask_of)
+
+    def remove_event_ids(self, event_ids: Iterable[int]) -> int:
+        ids = list(event_ids)
+        with self._lock:
+            if not self.loaded:
+                return 0
+            return self._remove(lambda b: np.isin(b.event_ids, ids))
+
+    def __len__(self) -> int:
+        return sum(len(b.starts) for b in self._buckets.values())
+
+    # ---------------------
+    # Queries
+    # ---------------------
+    def _select(self, hits: List[Tuple[_Bucket, np.ndarray]], provider: Optional[str]) -> List[Dict[str, Any]]:
+        """Records of the (bucket, indices) hits, ordered by start day then event id."""
+        records = [
+            {
+                "event_id": int(b.event_ids[i]),
+                "rule_pk": int(b.rule_pks[i]),
+                "rule_id": self.rule_codes.get(int(b.rule_pks[i])),
+                "start_date": date.fromordinal(int(b.starts[i])).isoformat(),
+                "end_date": date.fromordinal(int(b.ends[i])).isoformat(),
+                "provider": b.providers[i],
+            }
+            for b, idx in hits
+            for i in (idx if provider is None else idx[b.providers[idx] == provider])
+        ]
+        records.sort(key=lambda r: (r["start_date"], r["event_id"]))
+        return records
+
+    def _overlapping(self, lo_day: int, hi_day: int, provider: Optional[str]) -> List[Dict[str, Any]]:
+        return self._select([(b, b.window(lo_day, hi_day)) for b in self._buckets.values()], provider)
+
+    def active_on(self, day: date, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            d = day.toordinal()
+            return self._overlapping(d, d, provider)
+
+    def active_between(self, start: date, end: date, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._overlapping(start.toordinal(), end.toordinal(), provider)
+
+    def next_activation(self, after: date, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Intervals starting on the first activation day strictly after ``after``."""
+        with self._lock:
+            firsts = {}
+            for b in self._buckets.values():
+                i = int(np.searchsorted(b.starts, after.toordinal(), side="right"))
+                if provider is not None:
+                    later = np.flatnonzero(b.providers[i:] == provider)
+                    if later.size == 0:
+                        continue
+                    i += int(later[0])
+                if i < len(b.starts):
+                    firsts[id(b)] = (b, int(b.starts[i]))
+            if not firsts:
+                return []
+            first = min(day for _, day in firsts.values())
+            hits = []
+            for b, day in firsts.values():
+                if day == first:
+                    lo, hi = np.searchsorted(b.starts, first, side="left"), np.searchsorted(b.starts, first, side="right")
+                    hits.append((b, np.arange(lo, hi)))
+            return self._select(hits, provider)
+
+
+# process-wide singleton, loaded at startup, kept current by generation / rule deletes in
+# this process and refreshed from the database stamp for writes made elsewhere
+activity_index = ActivityIndex()
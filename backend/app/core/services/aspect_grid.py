@@ -0,0 +1,76 @@
+# backend/app/core/services/aspect_grid.py
+"""
+Aspect Grid
+-----------
+Every aspect between every pair of planets over a date range, from one
+AspectMatrix (instants x planets x planets) built by broadcasting: the distance
+array is computed once and each aspect is a vectorized comparison against it.
+Consecutive days in orb are reported as one entry with the day the aspect is
+closest to exact.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.analysis.parameter_sweep import ANGULAR_RELATIONS, DEFAULT_ORB
+from app.core.astro.factories.provider_factory import get_provider as get_astro_provider
+from app.core.astro.providers.cached_provider import CachedAstroProvider
+from app.core.db.enums import Planet, Relation
+from app.core.market.exchanges import evaluation_instant
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.aspects")
+
+# one entry per distinct angle: in_axis duplicates opposition, aspect_with has no angle of its own
+GRID_ASPECTS = {r.name: a for r, a in ANGULAR_RELATIONS.items() if a is not None and r is not Relation.in_axis}
+
+
+def aspect_grid(
+    start_date: date,
+    end_date: date,
+    planets: Optional[Sequence[str]] = None,
+    aspects: Optional[Sequence[str]] = None,
+    orb: float = DEFAULT_ORB,
+    provider: Optional[str] = None,
+    exchange: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Active aspects over [start_date, end_date], evaluated once per day at ``exchange``'s instant."""
+    if end_date < start_date:
+        raise ValueError("end_date must be >= start_date")
+    try:
+        keys = [Planet[p.lower()].name for p in planets] if planets else [p.name for p in Planet]
+    except KeyError as e:
+        raise ValueError(f"Unknown planet: {e.args[0]}")
+    unknown = [a for a in aspects or [] if a not in GRID_ASPECTS]
+    if unknown:
+        raise ValueError(f"Unknown aspect(s): {', '.join(unknown)}")
+    angles = {a: GRID_ASPECTS[a] for a in aspects} if aspects else dict(GRID_ASPECTS)
+
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    sky = CachedAstroProvider(get_astro_provider(provider or settings.provider_type))
+    matrix = sky.prime_aspects([evaluation_instant(d, exchange) for d in days], keys)
+    runs = matrix.runs(angles, orb)
+    logger.info("Aspect grid %s..%s: %d planets, %d aspect runs", start_date, end_date, len(matrix.planets), len(runs))
+
+    entries: List[Dict[str, Any]] = [
+        {
+            "aspect": r["aspect"],
+            "angle": r["angle"],
+            "planet": r["planet"],
+            "target": r["target"],
+            "start_date": days[r["start"]].isoformat(),
+            "end_date": days[r["end"]].isoformat(),
+            "exact_date": days[r["exact"]].isoformat(),
+            "min_orb": round(r["min_orb"], 4),
+        }
+        for r in runs
+    ]
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "planets": matrix.planets,
+        "orb": orb,
+        "count": len(entries),
+        "aspects": entries,
+    }
@@ -0,0 +1,195 @@
+# backend/app/core/services/astro_calendar.py
+"""
+Astro Calendar Store
+--------------------
+Builds, persists and serves ingress / station calendars (see
+app.core.astro.ingress_calendar): one ``astro_calendar`` row per
+(provider, ayanamsa, planet) holding its compressed step-function arrays.
+
+Calendars are loaded into memory at startup and reloaded when the table
+changes (one aggregate query per evaluation / calendar request). Rule evaluation (including
+its pool workers) and event generation wrap their provider in a CachedAstroProvider
+with the provider's calendar, so sign, nakshatra and
+retrograde checks inside the calendar span are answered by binary search;
+instants outside it fall back to the ephemeris.
+"""
+
+import hashlib
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.astro.factories.provider_factory import get_provider as get_astro_provider
+from app.core.astro.ingress_calendar import (
+    KINDS, AstroCalendar, PlanetCalendar, build_planet_calendar, to_instant, to_seconds,
+)
+from app.core.db.enums import Planet, Sign
+from app.core.db.models_analysis import AstroCalendarEntry
+from app.core.services.job_service import compress_result, decompress_result
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.calendar")
+
+SIGNS = list(Sign)
+
+
+def _ayanamsa() -> str:
+    return os.getenv("ASTRO_AYANAMSA_MODE", "lahiri").lower()
+
+
+def calendar_key(provider: str, ayanamsa: str, planet: str) -> str:
+    return hashlib.sha256(f"{provider}|{ayanamsa}|{planet}".encode("utf-8")).hexdigest()
+
+
+class CalendarStore:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._calendars: Dict[Tuple[str, str], AstroCalendar] = {}
+        self._stamp: Optional[Tuple[int, Optional[datetime]]] = None
+
+    @staticmethod
+    def _table_stamp(db: Session) -> Tuple[int, Optional[datetime]]:
+        count, latest = db.execute(
+            select(func.count(AstroCalendarEntry.cache_key), func.max(AstroCalendarEntry.created_at))
+        ).one()
+        return int(count), latest
+
+    def load(self, db: Session) -> int:
+        """(Re)load every stored calendar; returns the number of planet calendars."""
+        calendars: Dict[Tuple[str, str], AstroCalendar] = {}
+        stamp = self._table_stamp(db)
+        rows = db.scalars(select(AstroCalendarEntry)).all()
+        for row in rows:
+            cal = calendars.setdefault((row.provider, row.ayanamsa), AstroCalendar(row.provider))
+            cal.planets[row.planet] = PlanetCalendar.from_data(row.planet, decompress_result(row.data_blob))
+        with self._lock:
+            self._calendars = calendars
+            self._stamp = stamp
+        logger.info(f"📅 Loaded {len(rows)} planet calendars")
+        return len(rows)
+
+    def refresh(self, db: Session) -> None:
+        """Reload when the table changed (e.g. a calendar built by a background job process)."""
+        if self._table_stamp(db) != self._stamp:
+            self.load(db)
+
+    @property
+    def stamp(self) -> Optional[Tuple[int, Optional[datetime]]]:
+        """(row count, latest created_at) of the table as last loaded or built."""
+        with self._lock:
+            return self._stamp
+
+    def get(self, provider: str) -> Optional[AstroCalendar]:
+        """Calendar of ``provider`` for the current ayanamsa, if one was built."""
+        with self._lock:
+            return self._calendars.get((provider, _ayanamsa()))
+
+    def build(
+        self,
+        db: Session,
+        provider: str,
+        start: date,
+        end: date,
+        planets: Optional[Sequence[str]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> AstroCalendar:
+        """Root-find and store the calendars of ``planets`` (default: all) over [start, end]."""
+        if end < start:
+            raise ValueError("end_date must be >= start_date")
+        try:
+            keys = [Planet[p.lower()].name for p in planets] if planets else [p.name for p in Planet]
+        except KeyError as e:
+            raise ValueError(f"Unknown planet: {e.args[0]}")
+        astro = get_astro_provider(provider)
+        ayanamsa = _ayanamsa()
+        lo = datetime(start.year, start.month, start.day)
+        hi = datetime(end.year, end.month, end.day) + timedelta(days=1)
+
+        built: Dict[str, PlanetCalendar] = {}
+        for i, planet in enumerate(keys):
+            try:
+                cal = build_planet_calendar(astro, planet, lo, hi)
+            except Exception as exc:
+                logger.warning(f"⚠️ No calendar for {planet} with provider {provider}: {exc}")
+                continue
+            blob, _ = compress_result(cal.to_data())
+            db.merge(AstroCalendarEntry(
+                cache_key=calendar_key(provider, ayanamsa, planet), provider=provider, ayanamsa=ayanamsa,
+                planet=planet, start_at=lo, end_at=hi, data_blob=blob, created_at=datetime.utcnow(),
+            ))
+            built[planet] = cal
+            if progress is not None:
+                progress(i + 1, len(keys))
+        db.commit()
+
+        with self._lock:
+            current = self._calendars.get((provider, ayanamsa))
+            merged = AstroCalendar(provider, {**(current.planets if current else {}), **built})
+            self._calendars[(provider, ayanamsa)] = merged
+            self._stamp = self._table_stamp(db)
+        logger.info(f"📅 Built {provider} calendar {start}..{end} for {len(built)} planets")
+        return merged
+
+    def events(
+        self,
+        provider: str,
+        start: date,
+        end: date,
+        planets: Optional[Sequence[str]] = None,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Ingresses and stations within [start, end] in time order; LookupError if not covered."""
+        unknown = [k for k in kinds or [] if k not in KINDS]
+        if unknown:
+            raise ValueError(f"Unknown calendar kind(s): {', '.join(unknown)}")
+        calendar = self.get(provider)
+        lo = datetime(start.year, start.month, start.day)
+        hi = datetime(end.year, end.month, end.day) + timedelta(days=1)
+        if calendar is None or not calendar.covers(lo, hi):
+            raise LookupError(f"No {provider} calendar covering {start}..{end}")
+        keys = [p.lower() for p in planets] if planets else sorted(calendar.planets)
+        owner = get_astro_provider(provider).nakshatra_owner
+
+        out: List[Dict[str, Any]] = []
+        for planet in keys:
+            cal = calendar.planets.get(planet)
+            if cal is None:
+                raise ValueError(f"Planet not in calendar: {planet}")
+            for kind in kinds or KINDS:
+                for at, state in cal.changes(kind, to_seconds(lo), to_seconds(hi) - 1):
+                    entry = {"at": to_instant(at).isoformat(), "planet": planet, "kind": kind}
+                    if kind == "sign":
+                        entry["state"] = SIGNS[state].name
+                    elif kind == "nakshatra":
+                        entry.update(state=state, owner=owner(state))
+                    else:
+                        entry["state"] = "retrograde" if state else "direct"
+                    out.append(entry)
+        out.sort(key=lambda e: (e["at"], e["planet"], e["kind"]))
+        return out
+
+
+astro_calendars = CalendarStore()
+
+
+def build_from_params(db: Session, params: Dict[str, Any],
+                      progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """Build from request-shaped params (POST /api/astro/calendar and the "build_calendar" job)."""
+    start = date.fromisoformat(params.get("start_date") or settings.calendar_start_date)
+    end = date.fromisoformat(params.get("end_date") or settings.calendar_end_date)
+    provider = params.get("provider") or settings.provider_type
+    calendar = astro_calendars.build(db, provider, start, end, planets=params.get("planets"), progress=progress)
+    return {
+        "provider": provider,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "planets": {
+            p: {kind: len(times) - 1 for kind, (times, _) in cal.tables.items()}
+            for p, cal in sorted(calendar.planets.items())
+        },
+    }
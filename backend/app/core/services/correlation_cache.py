@@ -0,0 +1,169 @@
+# backend/app/core/services/correlation_cache.py
+"""
+Correlation Result Cache
+------------------------
+Persists ``analyze_correlation`` results in the ``correlation_cache`` table so an
+identical run is answered without re-evaluating rules or touching market data.
+
+The key is a SHA-256 over everything the result depends on:
+  - the events: content of every enabled rule (conditions, outcomes, confidence),
+    the date range, trading-day filtering, astro provider and ayanamsa
+  - the analysis: ticker, horizons, horizon unit and detail level
+  - the market data: provider type plus the provider's ``data_version`` stamp
+Any edit to a rule or refresh of the price data therefore yields a new key; stale
+entries are never read again and age out through the size-bounded LRU eviction
+(settings.correlation_cache_max_entries / correlation_cache_max_bytes).
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.db.models import Rule, Outcome
+from app.core.db.models_analysis import CorrelationCacheEntry
+from app.core.market.factories.provider_factory import get_market_provider
+from app.core.market.interfaces.i_market_data_provider import file_data_version
+from app.core.services.job_service import compress_result, decompress_result
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.correlation.cache")
+
+
+def rules_fingerprint(rules: Sequence[Rule]) -> str:
+    """Content hash of the rules' evaluable fields (updated_at does not move when only conditions change)."""
+    canonical = sorted(
+        (
+            r.rule_id,
+            r.confidence,
+            sorted((c.planet, c.relation, c.target, c.orb, c.value) for c in r.conditions),
+            sorted(
+                ((o.sector.code if o.sector is not None else None), o.effect, o.weight)
+                for o in r.outcomes
+            ),
+            r.expression,
+            r.composite,
+        )
+        for r in rules
+    )
+    blob = json.dumps(canonical, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _enabled_rules(db: Session) -> List[Rule]:
+    return list(db.execute(
+        select(Rule)
+        .where(Rule.enabled == True)
+        .options(joinedload(Rule.outcomes).joinedload(Outcome.sector))
+    ).unique().scalars().all())
+
+
+def market_data_version(ticker: str, market_provider_type: Optional[str] = None) -> str:
+    provider_type = market_provider_type or settings.market_provider_type
+    return f"{provider_type}|{get_market_provider(provider_type).data_version(ticker)}"
+
+
+def correlation_cache_key(db: Session, params: Dict[str, Any]) -> str:
+    """
+    Cache key for a correlation run. ``params`` uses the request field names
+    (start_date, end_date, ticker, lookahead_days, horizon_unit, trading_days_only,
+    detail, sample_size); unset values resolve to the same defaults the run uses.
+    """
+    ticker = params.get("ticker") or settings.default_sector_ticker
+    trading_days_only = params.get("trading_days_only")
+    if trading_days_only is None:
+        trading_days_only = settings.trading_days_only
+    detail = params.get("detail") or "full"
+    key = {
+        "rules": rules_fingerprint(_enabled_rules(db)),
+        "start": params["start_date"],
+        "end": params["end_date"],
+        "trading_days_only": bool(trading_days_only),
+        "holidays": (file_data_version(settings.trading_holidays_file)
+                     if trading_days_only and settings.trading_holidays_file else None),
+        "astro_provider": settings.provider_type,
+        "ayanamsa": os.getenv("ASTRO_AYANAMSA_MODE", "lahiri").lower(),
+        "ticker": ticker,
+        "horizons": list(params.get("lookahead_days") or [1, 3, 5]),
+        "horizon_unit": (params.get("horizon_unit") or settings.horizon_unit or "trading").lower(),
+        "detail": detail,
+        "sample_size": (params.get("sample_size") or 20) if detail == "sample" else None,
+        "market": market_data_version(ticker),
+    }
+    canonical = json.dumps(key, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_cached_result(db: Session, key: str) -> Optional[Dict[str, Any]]:
+    entry = db.get(CorrelationCacheEntry, key)
+    if entry is None:
+        return None
+    entry.hits = (entry.hits or 0) + 1
+    entry.last_used_at = datetime.utcnow()
+    result = decompress_result(entry.result_blob)
+    db.commit()
+    logger.info(f"🎯 Correlation cache hit {key[:12]} ({entry.ticker}, {entry.result_size} bytes)")
+    return result
+
+
+def store_result(db: Session, key: str, ticker: str, result: Dict[str, Any]) -> None:
+    """Store (or replace) a result and evict least recently used entries beyond the bounds."""
+    blob, _ = compress_result(result)
+    now = datetime.utcnow()
+    try:
+        db.merge(CorrelationCacheEntry(
+            cache_key=key, ticker=ticker, result_blob=blob, result_size=len(blob),
+            hits=0, created_at=now, last_used_at=now,
+        ))
+        db.flush()
+        evict(db)
+        db.commit()
+    except Exception:
+        # the cache is an optimisation; a failed write must not fail the run
+        db.rollback()
+        logger.exception("Could not store correlation result in cache")
+
+
+def evict(db: Session) -> int:
+    """Drop least recently used entries until both the count and byte bounds hold."""
+    rows = db.execute(
+        select(CorrelationCacheEntry.cache_key, CorrelationCacheEntry.result_size)
+        .order_by(CorrelationCacheEntry.last_used_at.desc())
+    ).all()
+    keep_bytes = 0
+    doomed = []
+    for i, (key, size) in enumerate(rows):
+        keep_bytes += size or 0
+        if i >= settings.correlation_cache_max_entries or keep_bytes > settings.correlation_cache_max_bytes:
+            doomed.append(key)
+    if doomed:
+        db.execute(delete(CorrelationCacheEntry).where(CorrelationCacheEntry.cache_key.in_(doomed)))
+        logger.info(f"🧹 Evicted {len(doomed)} correlation cache entries")
+    return len(doomed)
+
+
+def clear_cache(db: Session) -> int:
+    deleted = db.execute(delete(CorrelationCacheEntry)).rowcount
+    db.commit()
+    return deleted
+
+
+def cache_stats(db: Session) -> Dict[str, Any]:
+    entries, size, hits = db.execute(
+        select(func.count(), func.coalesce(func.sum(CorrelationCacheEntry.result_size), 0),
+               func.coalesce(func.sum(CorrelationCacheEntry.hits), 0))
+        .select_from(CorrelationCacheEntry)
+    ).one()
+    return {
+        "enabled": settings.correlation_cache_enabled,
+        "entries": entries,
+        "bytes": int(size),
+        "hits": int(hits),
+        "max_entries": settings.correlation_cache_max_entries,
+        "max_bytes": settings.correlation_cache_max_bytes,
+    }
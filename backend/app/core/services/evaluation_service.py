@@ -1,28 +1,92 @@
 # backend/app/core/services/evaluation_service.py
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import json
-from sqlmodel import select
-
-from app.core.db.db import get_db
-from app.core.db.models import RuleModel
-from app.core.common.schemas import ConditionRead, OutcomeRead, RuleCreate
+import hashlib
+import math
+import os
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, date
+from typing import Callable, Iterator, List, Dict, Any, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.core.db.db import SessionLocal
+from app.core.db.models import Rule
+from app.core.db.enums import Planet
 from app.core.astro.factories.provider_factory import get_provider as get_astro_provider
+from app.core.astro.ingress_calendar import AstroCalendar
+from app.core.astro.providers.cached_provider import CachedAstroProvider, planet_key
+from app.core.services.astro_calendar import astro_calendars
 from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+from app.core.rules.engine.compiled_rules import CompiledRule, compiled_rules
+from app.core.market.trading_calendar import TradingCalendar, exchange_calendar
+from app.core.market.exchanges import evaluation_instant, get_exchange
 from app.core.common.config import settings
 from app.core.common.logger import setup_logger
 
 logger = setup_logger(settings.log_level)
 
+# number of days whose sky state is computed in one provider batch
+SKY_BATCH_DAYS = 256
+# evaluated event lists kept per (exchange, evaluated days, provider, ayanamsa, rules version)
+MAX_CACHED_EXCHANGE_RESULTS = 32
 
-def evaluate_rules_for_range(start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    """
-    Evaluate all enabled rules for each date between start_date and end_date (inclusive)
-    and return a list of events.
+_exchange_results: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+# total events held in _exchange_results (bounded by settings.eval_cache_max_events)
+_cached_events = 0
+# requests are served from the threadpool: guards _exchange_results and _cached_events
+_results_lock = threading.Lock()
 
-    Each event is a dict:
-      { "rule_id", "name", "date", "sector", "effect", "weight", "confidence" }
+# progress(done_days, total_days), called after each sky batch
+ProgressCallback = Callable[[int, int], None]
+
+# date-sharded evaluation pool (see _evaluate_days_parallel)
+_eval_pool: Optional[ProcessPoolExecutor] = None
+# (provider, workers, ayanamsa, calendar stamp) the pool's workers were initialized with
+_eval_pool_key: Optional[Tuple[Any, ...]] = None
+_eval_pool_lock = threading.Lock()
+# per worker process: provider built once by the pool initializer and reused across chunks
+_worker_sky: Optional[CachedAstroProvider] = None
+
+
+def _load_enabled_rules() -> List[CompiledRule]:
+    """Enabled rules, compiled; only rules new or edited since the last call are read in full."""
+    with SessionLocal() as session:
+        # calendars built by a background job are picked up here
+        astro_calendars.refresh(session)
+        return compiled_rules.load_enabled(session)
+
+
+def _evaluation_days(start: date, end: date, calendar: Optional[TradingCalendar]) -> List[date]:
+    if calendar is not None:
+        return calendar.sessions(start, end)
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _exchange_days(
+    start: date,
+    end: date,
+    exchanges: Sequence[Optional[str]],
+    trading_days_only: Optional[bool],
+    calendar: Optional[TradingCalendar],
+) -> Dict[Optional[str], List[date]]:
     """
+    Evaluation days per exchange: every day, the explicit ``calendar`` for all
+    exchanges, or (``trading_days_only``) each exchange's own sessions.
+    """
+    if trading_days_only is None:
+        trading_days_only = settings.trading_days_only
+    days_of: Dict[Optional[str], List[date]] = {}
+    for ex in exchanges:
+        cal = calendar
+        if cal is None and trading_days_only:
+            cal = exchange_calendar(ex, start, end)
+        days_of[ex] = _evaluation_days(start, end, cal)
+    return days_of
+
+
+def _parse_range(start_date: str, end_date: str) -> Tuple[date, date]:
     try:
         start = datetime.fromisoformat(start_date).date()
         end = datetime.fromisoformat(end_date).date()
@@ -31,42 +95,359 @@ def evaluate_rules_for_range(start_date: str, end_date: str) -> List[Dict[str, A
 
     if end < start:
         raise ValueError("end_date must be >= start_date")
+    return start, end
+
+
+def _referenced_planets(rules: Sequence[CompiledRule]) -> Set[str]:
+    """Planets whose longitudes the rules can touch (sun is always needed for combustion)."""
+    planets = {"sun"}
+    for rule in rules:
+        for cond in rule.leaves:
+            for name in (cond.planet, cond.target):
+                key = planet_key(name)
+                if key in Planet.__members__:
+                    planets.add(key)
+    return planets
+
+
+def _rules_stamp(rules: Sequence[Rule]) -> str:
+    """Digest of the rules' evaluated content (conditions, expression, outcomes), not just their pk / updated_at."""
+    compiled = sorted((compiled_rules.get(r) for r in rules), key=lambda r: r.id or 0)
+    content = repr([(r.id, r.rule_id, r.name, r.confidence, r.conditions, r.outcomes, r.expression, r.composite)
+                    for r in compiled])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _days_key(days: Sequence[date]) -> Tuple:
+    """Exact identity of the evaluated days (a calendar's holidays included)."""
+    digest = hashlib.sha256(np.asarray(days, dtype="datetime64[D]").tobytes()).hexdigest()
+    return (days[0], days[-1], len(days), digest) if days else ()
+
+
+def _cache_results(key: Tuple, events: List[Dict[str, Any]]) -> None:
+    """Store one exchange's events, evicting least recently used entries over the count / size bounds."""
+    global _cached_events
+    if len(events) > settings.eval_cache_max_events:
+        return
+    with _results_lock:
+        previous = _exchange_results.pop(key, None)
+        if previous is not None:
+            _cached_events -= len(previous)
+        _exchange_results[key] = events
+        _cached_events += len(events)
+        while (len(_exchange_results) > MAX_CACHED_EXCHANGE_RESULTS
+               or _cached_events > settings.eval_cache_max_events):
+            _, dropped = _exchange_results.popitem(last=False)
+            _cached_events -= len(dropped)
+
+
+def _cached_results(key: Tuple) -> Optional[List[Dict[str, Any]]]:
+    """One exchange's cached events (marked most recently used), or None."""
+    with _results_lock:
+        cached = _exchange_results.get(key)
+        if cached is not None:
+            _exchange_results.move_to_end(key)
+        return cached
+
+
+def _iter_day_events(
+    rules: Sequence[Rule],
+    days: Sequence[date],
+    exchanges: Sequence[Optional[str]],
+    progress: Optional[ProgressCallback] = None,
+    sky: Optional[CachedAstroProvider] = None,
+) -> Iterator[Tuple[Optional[str], List[Dict[str, Any]]]]:
+    """
+    Yield (exchange, events) for every (day, exchange) instant, in date order.
+
+    The sky state for all exchanges (longitudes and the all-pairs aspect matrix)
+    is primed in one batch per block of days, and exchanges sharing a UTC instant
+    share a single rule evaluation. Only one block is held in memory at a time.
+    """
+    if sky is None:
+        sky = CachedAstroProvider(get_astro_provider(settings.provider_type),
+                                  calendar=astro_calendars.get(settings.provider_type))
+    engine = RulesEngineImpl(sky)
+    rules = [compiled_rules.get(r) for r in rules]
+    names = {r.rule_id: r.name for r in rules}
+    planets = _referenced_planets(rules)
+
+    for offset in range(0, len(days), SKY_BATCH_DAYS):
+        chunk = days[offset: offset + SKY_BATCH_DAYS]
+        instants = {(day, ex): evaluation_instant(day, ex) for day in chunk for ex in exchanges}
+        sky.prime_aspects(instants.values(), planets)
+
+        by_instant: Dict[datetime, List[Dict[str, Any]]] = {}
+        for day in chunk:
+            for ex in exchanges:
+                when = instants[(day, ex)]
+                if when not in by_instant:
+                    # conditions shared between rules are checked once per instant
+                    evs = engine.evaluate_rules(rules, when)
+                    # engine events already include rule_id, date, sector, effect, weight, confidence
+                    # attach rule name for readability
+                    for e in evs:
+                        e["name"] = names[e["rule_id"]]
+                    by_instant[when] = evs
+                if ex is None:
+                    yield ex, by_instant[when]
+                else:
+                    # report the exchange's local trading date, not the UTC date of the instant
+                    yield ex, [
+                        dict(e, date=day.isoformat(), exchange=ex, instant=when.isoformat())
+                        for e in by_instant[when]
+                    ]
+        sky.clear()
+        if progress is not None:
+            progress(offset + len(chunk), len(days))
+
+
+def _evaluate_days(
+    rules: Sequence[Rule],
+    days: Sequence[date],
+    exchanges: Sequence[Optional[str]],
+    progress: Optional[ProgressCallback] = None,
+    sky: Optional[CachedAstroProvider] = None,
+) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """Evaluate rules for every (day, exchange) instant, collected per exchange."""
+    results: Dict[Optional[str], List[Dict[str, Any]]] = {ex: [] for ex in exchanges}
+    for ex, evs in _iter_day_events(rules, days, exchanges, progress=progress, sky=sky):
+        results[ex].extend(evs)
+    return results
+
+
+def _init_eval_worker(provider_type: str, calendar: Optional[AstroCalendar] = None) -> None:
+    """Pool initializer: each worker process builds (and warms) its own provider over ``calendar``."""
+    global _worker_sky
+    _worker_sky = CachedAstroProvider(get_astro_provider(provider_type), calendar=calendar)
+
+
+def _evaluate_chunk(
+    rules: Sequence[Rule],
+    days: Sequence[date],
+    exchanges: Sequence[Optional[str]],
+) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """Worker entry point: evaluate one date shard with the process-local provider."""
+    return _evaluate_days(rules, days, exchanges, sky=_worker_sky)
+
+
+def _eval_worker_count() -> int:
+    workers = settings.eval_workers
+    if workers <= 0:
+        workers = multiprocessing.cpu_count()
+    return workers
+
+
+def _get_eval_pool(provider_type: str, workers: int) -> ProcessPoolExecutor:
+    global _eval_pool, _eval_pool_key
+    # workers hold the calendar they were started with: restart them once it changes
+    key = (provider_type, workers, os.getenv("ASTRO_AYANAMSA_MODE", "lahiri").lower(), astro_calendars.stamp)
+    with _eval_pool_lock:
+        if _eval_pool is not None and _eval_pool_key != key:
+            _eval_pool.shutdown(wait=False, cancel_futures=True)
+            _eval_pool = None
+        if _eval_pool is None:
+            # spawn: every worker gets a fresh interpreter, so process-global ephemeris
+            # state (e.g. swe.set_sid_mode) is never shared between shards
+            _eval_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_eval_worker,
+                initargs=(provider_type, astro_calendars.get(provider_type)),
+            )
+            _eval_pool_key = key
+        return _eval_pool
+
+
+def shutdown_eval_pool(wait: bool = False) -> None:
+    global _eval_pool, _eval_pool_key
+    with _eval_pool_lock:
+        if _eval_pool is not None:
+            _eval_pool.shutdown(wait=wait, cancel_futures=True)
+        _eval_pool, _eval_pool_key = None, None
+
+
+def _date_shards(days: Sequence[date], workers: int) -> List[Sequence[date]]:
+    """
+    Contiguous date shards: about two per worker (to even out slow shards), never
+    smaller than settings.eval_min_days_per_shard, aligned to whole sky batches.
+    """
+    size = max(settings.eval_min_days_per_shard, math.ceil(len(days) / (workers * 2)))
+    size = math.ceil(size / SKY_BATCH_DAYS) * SKY_BATCH_DAYS
+    return [days[i: i + size] for i in range(0, len(days), size)]
+
+
+def _evaluate_days_parallel(
+    rules: Sequence[Rule],
+    days: Sequence[date],
+    exchanges: Sequence[Optional[str]],
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """
+    Shard ``days`` into contiguous date ranges evaluated across the process pool,
+    then merge the shard results in date order. Small spans (a single shard) or
+    eval_workers == 1 stay in-process.
+    """
+    workers = _eval_worker_count()
+    shards = _date_shards(days, workers) if workers > 1 else []
+    if len(shards) <= 1:
+        return _evaluate_days(rules, days, exchanges, progress=progress)
+
+    pool = _get_eval_pool(settings.provider_type, workers)
+    futures = {pool.submit(_evaluate_chunk, list(rules), shard, list(exchanges)): i for i, shard in enumerate(shards)}
+    parts: Dict[int, Dict[Optional[str], List[Dict[str, Any]]]] = {}
+    done_days = 0
+    try:
+        for fut in as_completed(futures):
+            i = futures[fut]
+            parts[i] = fut.result()
+            done_days += len(shards[i])
+            if progress is not None:
+                progress(done_days, len(days))
+    except BaseException:
+        for fut in futures:
+            fut.cancel()
+        raise
+
+    logger.info(f"Evaluated {len(days)} days in {len(shards)} shards across {workers} workers")
+    results: Dict[Optional[str], List[Dict[str, Any]]] = {ex: [] for ex in exchanges}
+    for i in range(len(shards)):
+        for ex, evs in parts[i].items():
+            results[ex].extend(evs)
+    return results
+
+
+def evaluate_rules_for_exchanges(
+    start_date: str,
+    end_date: str,
+    exchanges: Sequence[Optional[str]],
+    trading_days_only: Optional[bool] = None,
+    calendar: Optional[TradingCalendar] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """
+    Evaluate all enabled rules at each exchange's session open for every day in range.
+    Returns { exchange_code: [event, ...] }; ``None`` means midnight UTC.
+
+    With ``trading_days_only`` each exchange is evaluated on its own sessions (see
+    trading_calendar.exchange_calendar); exchanges sharing a session list are
+    evaluated together. Results are cached per exchange (keyed by the evaluated
+    days, provider, ayanamsa and rule content; bounded by
+    settings.eval_cache_max_events), so adding a market to a repeated request only
+    evaluates the new exchange. Long spans are sharded by date across
+    settings.eval_workers processes.
+    ``progress(done_days, total_days)`` is called after each evaluated batch of days.
+    """
+    start, end = _parse_range(start_date, end_date)
+    exchanges = [get_exchange(ex).code if ex else None for ex in exchanges]
 
     # load rules from DB
-    with get_db() as session:
-        rows = session.exec(select(RuleModel).where(RuleModel.enabled == True)).all()
+    rows = _load_enabled_rules()
 
     if not rows:
         logger.info("No enabled rules found.")
-        return []
-
-    # init provider + engine
-    astro_provider = get_astro_provider(settings.provider_type)
-    engine = RulesEngineImpl(astro_provider)
-
-    events: List[Dict[str, Any]] = []
-    current = start
-    while current <= end:
-        dt = datetime.combine(current, datetime.min.time())
-        for r in rows:
-            conds = [ConditionRead(**c) for c in json.loads(r.conditions or "[]")]
-            outs = [OutcomeRead(**o) for o in json.loads(r.outcomes or "[]")]
-            rule = RuleCreate(
-                rule_id=r.rule_id,
-                name=r.name,
-                description=r.description,
-                conditions=conds,
-                outcomes=outs,
-                enabled=r.enabled,
-                confidence=r.confidence
-            )
-            evs = engine.evaluate_rule(rule, dt)
-            # engine events already include rule_id, date, sector, effect, weight, confidence
-            # attach rule name for readability
-            for e in evs:
-                e["name"] = rule.name
-            events.extend(evs)
-        current = current + timedelta(days=1)
-
-    logger.info(f"Evaluation produced {len(events)} events between {start} and {end}")
-    return events
+        return {ex: [] for ex in exchanges}
+
+    days_of = _exchange_days(start, end, exchanges, trading_days_only, calendar)
+    base_key = (settings.provider_type, os.getenv("ASTRO_AYANAMSA_MODE", "lahiri").lower(), _rules_stamp(rows))
+    keys = {ex: (ex, _days_key(days_of[ex])) + base_key for ex in exchanges}
+    results: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    missing = []
+    for ex in exchanges:
+        cached = _cached_results(keys[ex])
+        if cached is not None:
+            results[ex] = [dict(e) for e in cached]
+        else:
+            missing.append(ex)
+
+    # exchanges with the same sessions share one pass (and the instants they have in common)
+    groups: Dict[Tuple[date, ...], List[Optional[str]]] = {}
+    for ex in missing:
+        groups.setdefault(tuple(days_of[ex]), []).append(ex)
+    total_days = sum(len(days) for days in groups)
+    done_days = 0
+    for days, group in groups.items():
+        group_progress = None
+        if progress is not None:
+            group_progress = lambda done, _total, offset=done_days: progress(offset + done, total_days)
+        computed = _evaluate_days_parallel(rows, list(days), group, progress=group_progress)
+        for ex, evs in computed.items():
+            _cache_results(keys[ex], evs)
+            results[ex] = [dict(e) for e in evs]
+        done_days += len(days)
+
+    logger.info(
+        f"Evaluation between {start} and {end} (exchanges={exchanges}, "
+        f"cached={len(exchanges) - len(missing)}): "
+        + ", ".join(f"{ex or 'UTC-midnight'}={len(results[ex])}/{len(days_of[ex])} days" for ex in exchanges)
+    )
+    return {ex: results[ex] for ex in exchanges}
+
+
+def evaluate_rules_for_range(
+    start_date: str,
+    end_date: str,
+    trading_days_only: Optional[bool] = None,
+    calendar: Optional[TradingCalendar] = None,
+    exchange: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate all enabled rules for each date between start_date and end_date (inclusive)
+    and return a list of events.
+
+    With ``trading_days_only`` (default: settings.trading_days_only) or an explicit
+    ``calendar``, only trading sessions are evaluated; weekends and holidays are skipped.
+    With ``exchange`` (e.g. "NSE", "NYSE") rules are evaluated at that exchange's
+    session open instead of midnight UTC.
+
+    Each event is a dict:
+      { "rule_id", "name", "date", "sector", "effect", "weight", "confidence" }
+    plus "exchange" and "instant" when an exchange is given.
+    """
+    results = evaluate_rules_for_exchanges(
+        start_date, end_date, [exchange], trading_days_only=trading_days_only, calendar=calendar,
+        progress=progress,
+    )
+    return next(iter(results.values()))
+
+
+def iter_evaluated_events(
+    start_date: str,
+    end_date: str,
+    trading_days_only: Optional[bool] = None,
+    calendar: Optional[TradingCalendar] = None,
+    exchanges: Sequence[Optional[str]] = (None,),
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming counterpart of evaluate_rules_for_range / _for_exchanges: yields events
+    day by day while evaluation proceeds, holding at most one sky batch in memory.
+    Results are not cached.
+
+    Arguments are validated and rules loaded eagerly, so bad input raises ValueError
+    here rather than from the first ``next()``.
+    """
+    start, end = _parse_range(start_date, end_date)
+    exchanges = [get_exchange(ex).code if ex else None for ex in exchanges]
+    rows = _load_enabled_rules()
+    days_of = _exchange_days(start, end, exchanges, trading_days_only, calendar) if rows else {}
+    days = sorted(set().union(*days_of.values())) if days_of else []
+    # each exchange only reports its own sessions
+    sessions = {ex: {d.isoformat() for d in ds} for ex, ds in days_of.items()}
+    shared = len({tuple(ds) for ds in days_of.values()}) <= 1
+
+    def _events() -> Iterator[Dict[str, Any]]:
+        for ex, evs in _iter_day_events(rows, days, exchanges):
+            if shared:
+                yield from evs
+            else:
+                yield from (e for e in evs if e["date"] in sessions[ex])
+
+    return _events()
+
+
+def clear_evaluation_cache() -> None:
+    global _cached_events
+    with _results_lock:
+        _exchange_results.clear()
+        _cached_events = 0
@@ -0,0 +1,415 @@
+# backend/app/core/services/job_service.py
+"""
+Job Service
+-----------
+Persistent background jobs for long-running work (rule evaluation, correlation
+runs, event generation).
+
+Jobs live in the ``jobs`` table and are executed by a local process pool
+(``settings.job_workers`` processes; 0 runs jobs inline in the submitting
+process). Runners report progress through a ``JobContext``; every progress
+write doubles as the cancellation check, so a cancelled job stops at its next
+report. Results are stored as zlib-compressed JSON, and an identical submission
+(same kind + parameters) returns the existing queued/running job.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.db.db import SessionLocal
+from app.core.db.models_jobs import Job, JobStatus, ACTIVE_JOB_STATUSES, FINISHED_JOB_STATUSES
+from app.core.common.config import settings
+
+import logging
+logger = logging.getLogger("astro.jobs")
+
+# statuses an identical submission is folded into: only work still in flight.
+# A finished job's result may predate rule edits, event deletes or new prices
+# (params_hash carries no data version), and re-running a side-effecting kind
+# (generate_events / generate_batch / build_calendar) is the point of resubmitting.
+REUSABLE_JOB_STATUSES = ACTIVE_JOB_STATUSES
+
+
+class JobCancelled(Exception):
+    """Raised inside a runner when its job was cancelled."""
+
+
+class JobContext:
+    """Handed to runners: throttled progress reporting plus cooperative cancellation."""
+
+    def __init__(self, db: Session, job_id: str, min_interval: Optional[float] = None):
+        self.db = db
+        self.job_id = job_id
+        self.min_interval = settings.job_progress_interval if min_interval is None else min_interval
+        self._last_write = 0.0
+
+    def report(self, percent: float, message: Optional[str] = None, force: bool = False) -> None:
+        """Record progress (0..100); raises JobCancelled if the job is no longer running."""
+        now = time.monotonic()
+        if not force and now - self._last_write < self.min_interval:
+            return
+        self._last_write = now
+        values: Dict[str, Any] = {"progress": max(0.0, min(100.0, float(percent)))}
+        if message is not None:
+            values["message"] = message[:255]
+        res = self.db.execute(
+            update(Job).where(Job.id == self.job_id, Job.status == JobStatus.running).values(**values)
+        )
+        self.db.commit()
+        if res.rowcount == 0:
+            raise JobCancelled(self.job_id)
+
+    def progress_callback(self, lo: float = 0.0, hi: float = 100.0) -> Callable[[int, int], None]:
+        """Adapter for services' progress(done, total) hooks, mapped onto [lo, hi] percent."""
+        def _cb(done: int, total: int) -> None:
+            frac = (done / total) if total else 1.0
+            self.report(lo + (hi - lo) * frac)
+        return _cb
+
+
+# ---------------------
+# Runners
+# ---------------------
+JOB_RUNNERS: Dict[str, Callable[[Dict[str, Any], JobContext], Any]] = {}
+
+
+def job_runner(kind: str):
+    def _register(fn):
+        JOB_RUNNERS[kind] = fn
+        return fn
+    return _register
+
+
+@job_runner("evaluate")
+def _run_evaluate(params: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    from app.core.services.evaluation_service import evaluate_rules_for_range, evaluate_rules_for_exchanges
+
+    if params.get("exchanges"):
+        by_exchange = evaluate_rules_for_exchanges(
+            params["start_date"], params["end_date"], params["exchanges"],
+            trading_days_only=params.get("trading_days_only"), progress=ctx.progress_callback(),
+        )
+        return {
+            "count": sum(len(evs) for evs in by_exchange.values()),
+            "exchanges": {ex: {"count": len(evs), "events": evs} for ex, evs in by_exchange.items()},
+        }
+    events = evaluate_rules_for_range(
+        params["start_date"], params["end_date"],
+        trading_days_only=params.get("trading_days_only"), exchange=params.get("exchange"),
+        progress=ctx.progress_callback(),
+    )
+    return {"count": len(events), "events": events}
+
+
+@job_runner("correlation")
+def _run_correlation(params: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    from app.core.services.evaluation_service import evaluate_rules_for_range
+    from app.core.analysis.correlation_analyzer import analyze_correlation
+    from app.core.market.trading_calendar import get_trading_calendar
+
+    from app.core.services import correlation_cache
+
+    ticker = params.get("ticker") or settings.default_sector_ticker
+    lookahead_days = params.get("lookahead_days") or [1, 3, 5]
+    cache_key = None
+    if params.get("use_cache", True) and settings.correlation_cache_enabled:
+        cache_key = correlation_cache.correlation_cache_key(ctx.db, params)
+        cached = correlation_cache.get_cached_result(ctx.db, cache_key)
+        if cached is not None:
+            return cached
+    calendar = None
+    if params.get("trading_days_only"):
+        calendar = get_trading_calendar(
+            ticker,
+            datetime.fromisoformat(params["start_date"]).date(),
+            datetime.fromisoformat(params["end_date"]).date(),
+        )
+    events = evaluate_rules_for_range(
+        params["start_date"], params["end_date"], trading_days_only=params.get("trading_days_only"),
+        calendar=calendar, progress=ctx.progress_callback(0.0, 80.0),
+    )
+    if not events:
+        return {"ticker": ticker, "lookahead_days": lookahead_days, "per_rule": {}, "aggregate": {}}
+    ctx.report(80.0, "computing correlation", force=True)
+    result = analyze_correlation(events, ticker=ticker, lookahead_days=lookahead_days,
+                                 horizon_unit=params.get("horizon_unit"), detail=params.get("detail") or "full",
+                                 sample_size=params.get("sample_size") or 20)
+    if cache_key is not None:
+        correlation_cache.store_result(ctx.db, cache_key, ticker, result)
+    return result
+
+
+@job_runner("sweep")
+def _run_sweep(params: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    from app.core.analysis.parameter_sweep import sweep_from_params
+
+    return sweep_from_params(params, progress=ctx.progress_callback(0.0, 99.0))
+
+
+@job_runner("mine_rules")
+def _run_mine_rules(params: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    from app.core.analysis.rule_mining import mine_from_params
+
+    return mine_from_params(params, progress=ctx.progress_callback(0.0, 99.0))
+
+
+@job_runner("build_calendar")
+def _run_build_calendar(params: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    from app.core.services.astro_calendar import build_from_params
+
+    return build_from_params(ctx.db, params, progress=ctx.progress_callback(0.0, 99.0))
+
+
+@job_runner("generate_events")
+def _run_generate_events(params: Dict[str, Any], ctx: JobContext) -> List[Dict[str, Any]]:
+    from app.core.db.models import Rule
+    from app.core.analysis.event_generator import EventGeneratorService
+    from app.core.market.trading_calendar import exchange_calendar
+
+    rule = ctx.db.scalar(select(Rule).where(Rule.rule_id == params["rule_id"]))
+    if rule is None:
+        raise ValueError(f"Rule {params['rule_id']} not found")
+    provider = params.get("provider") or "swisseph"
+    start, end = date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+    calendar = (exchange_calendar(params.get("exchange"), start, end)
+                if params.get("trading_days_only") else None)
+    service = EventGeneratorService(ctx.db, astro_provider_name=provider, calendar=calendar,
+                                    exchange=params.get("exchange"))
+    events = service.generate_for_rule(
+        rule_id=rule.id,
+        start_date=start,
+        end_date=end,
+        provider=provider,
+        overwrite=bool(params.get("overwrite")),
+        progress=ctx.progress_callback(0.0, 99.0),
+    )
+    return [e.to_dict() for e in events]
+
+
+@job_runner("generate_batch")
+def _run_generate_batch(params: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    from app.core.analysis.batch_event_generator import generate_for_rules
+    from app.core.market.trading_calendar import exchange_calendar
+
+    start, end = date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+    calendar = (exchange_calendar(params.get("exchange"), start, end)
+                if params.get("trading_days_only") else None)
+    return generate_for_rules(
+        ctx.db,
+        start_date=start,
+        end_date=end,
+        rule_ids=params.get("rule_ids"),
+        provider=params.get("provider") or "swisseph",
+        overwrite=bool(params.get("overwrite")),
+        calendar=calendar,
+        exchange=params.get("exchange"),
+        workers=params.get("workers"),
+        progress=ctx.progress_callback(0.0, 99.0),
+    )
+
+
+# ---------------------
+# Serialization helpers
+# ---------------------
+def params_hash(kind: str, params: Dict[str, Any]) -> str:
+    canonical = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def compress_result(result: Any) -> Tuple[bytes, int]:
+    raw = json.dumps(result, default=str, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(raw, settings.job_result_compression_level), len(raw)
+
+
+def decompress_result(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+# ---------------------
+# Execution
+# ---------------------
+def execute_job(db: Session, job_id: str) -> Optional[JobStatus]:
+    """Claim a queued job, run it and store its outcome. Returns the final status."""
+    job = db.get(Job, job_id)
+    if job is None:
+        logger.warning("Job %s not found", job_id)
+        return None
+    claimed = db.execute(
+        update(Job).where(Job.id == job_id, Job.status == JobStatus.queued)
+        .values(status=JobStatus.running, started_at=datetime.utcnow(), progress=0.0)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        logger.info("Job %s is no longer queued; skipping", job_id)
+        return db.get(Job, job_id).status
+
+    kind, params = job.kind, dict(job.params_json or {})
+    ctx = JobContext(db, job_id)
+    logger.info("▶️  Job %s (%s) started", job_id, kind)
+    try:
+        result = JOB_RUNNERS[kind](params, ctx)
+    except JobCancelled:
+        db.rollback()
+        logger.info("🛑 Job %s cancelled", job_id)
+        return JobStatus.cancelled
+    except Exception as e:
+        db.rollback()
+        logger.exception("💥 Job %s failed", job_id)
+        db.execute(
+            update(Job).where(Job.id == job_id, Job.status == JobStatus.running)
+            .values(status=JobStatus.failed, error=f"{type(e).__name__}: {e}", finished_at=datetime.utcnow())
+        )
+        db.commit()
+        return JobStatus.failed
+
+    blob, size = compress_result(result)
+    stored = db.execute(
+        update(Job).where(Job.id == job_id, Job.status == JobStatus.running)
+        .values(status=JobStatus.succeeded, progress=100.0, message=None,
+                result_blob=blob, result_size=size, finished_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    if not stored:
+        return JobStatus.cancelled
+    logger.info("✅ Job %s finished (%d bytes, %d compressed)", job_id, size, len(blob))
+    return JobStatus.succeeded
+
+
+def _worker_main(job_id: str) -> Optional[str]:
+    """Entry point inside a pool process."""
+    with SessionLocal() as db:
+        status = execute_job(db, job_id)
+    return status.name if status else None
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_futures: Dict[str, Future] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: workers start clean (no inherited DB connections or ephemeris state)
+            _pool = ProcessPoolExecutor(max_workers=settings.job_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _dispatch(db: Session, job_id: str) -> None:
+    if settings.job_workers <= 0:
+        execute_job(db, job_id)
+        return
+    future = _get_pool().submit(_worker_main, job_id)
+    _futures[job_id] = future
+    future.add_done_callback(lambda _f: _futures.pop(job_id, None))
+
+
+def shutdown_pool(wait: bool = False) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=True)
+            _pool = None
+    _futures.clear()
+
+
+# ---------------------
+# Public API
+# ---------------------
+def submit_job(db: Session, kind: str, params: Dict[str, Any], force: bool = False) -> Tuple[Job, bool]:
+    """
+    Queue a job and hand it to the worker pool. Returns (job, created).
+    Unless ``force``, an identical queued/running job is returned instead.
+    """
+    if kind not in JOB_RUNNERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    digest = params_hash(kind, params)
+    if not force:
+        existing = db.scalars(
+            select(Job)
+            .where(Job.kind == kind, Job.params_hash == digest, Job.status.in_(REUSABLE_JOB_STATUSES))
+            .order_by(Job.created_at.desc())
+            .limit(1)
+        ).first()
+        if existing is not None:
+            logger.info("♻️  Reusing job %s for identical %s submission", existing.id, kind)
+            return existing, False
+
+    job = Job(id=uuid.uuid4().hex, kind=kind, params_json=params, params_hash=digest, status=JobStatus.queued)
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    logger.info("📥 Queued job %s (%s)", job_id, kind)
+    _dispatch(db, job_id)
+    job = db.get(Job, job_id)
+    db.refresh(job)
+    return job, True
+
+
+def get_job(db: Session, job_id: str) -> Optional[Job]:
+    return db.get(Job, job_id)
+
+
+def list_jobs(db: Session, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[Job]:
+    q = select(Job)
+    if status:
+        if status not in JobStatus.__members__:
+            raise ValueError(f"Unknown job status: {status}")
+        q = q.where(Job.status == JobStatus[status])
+    if kind:
+        q = q.where(Job.kind == kind)
+    return list(db.scalars(q.order_by(Job.created_at.desc()).limit(limit)).all())
+
+
+def cancel_job(db: Session, job_id: str) -> Optional[Job]:
+    """Cancel a queued or running job (running jobs stop at their next progress report)."""
+    job = db.get(Job, job_id)
+    if job is None:
+        return None
+    if job.status in FINISHED_JOB_STATUSES:
+        raise ValueError(f"Job {job_id} already {job.status.name}")
+    db.execute(
+        update(Job).where(Job.id == job_id, Job.status.in_(ACTIVE_JOB_STATUSES))
+        .values(status=JobStatus.cancelled, message="cancelled", finished_at=datetime.utcnow())
+    )
+    db.commit()
+    future = _futures.get(job_id)
+    if future is not None:
+        future.cancel()
+    db.refresh(job)
+    return job
+
+
+def job_result(job: Job) -> Any:
+    if job.result_blob is None:
+        return None
+    return decompress_result(job.result_blob)
+
+
+def recover_jobs(db: Session) -> int:
+    """
+    At startup: jobs left running by a previous process are marked failed and
+    queued jobs are dispatched again. Returns the number of re-queued jobs.
+    """
+    db.execute(
+        update(Job).where(Job.status == JobStatus.running)
+        .values(status=JobStatus.failed, error="interrupted by server restart", finished_at=datetime.utcnow())
+    )
+    db.commit()
+    queued = list(db.scalars(select(Job.id).where(Job.status == JobStatus.queued).order_by(Job.created_at)).all())
+    for job_id in queued:
+        _dispatch(db, job_id)
+    return len(queued)
@@ -0,0 +1,111 @@
+# backend/app/core/services/rule_event_query_service.py
+"""
+Rule-event queries that read plain columns (no ORM entities, no joined rule) and
+are shaped to hit the rule_events composite indexes:
+  - ix_rule_events_rule_provider_start  for per-rule listings / keyset paging
+  - ix_rule_events_start_end            for "active on date D"
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.db.models import Rule
+from app.core.db.models_analysis import RuleEvent
+
+EVENT_COLUMNS = (
+    RuleEvent.id,
+    RuleEvent.rule_id,
+    RuleEvent.start_date,
+    RuleEvent.end_date,
+    RuleEvent.duration_type,
+    RuleEvent.event_subtype,
+    RuleEvent.provider,
+    RuleEvent.metadata_json,
+    RuleEvent.created_at,
+)
+
+
+def event_row_to_dict(row) -> Dict[str, Any]:
+    """Same shape as RuleEvent.to_dict(), built from a column row."""
+    return dict(
+        id=row.id,
+        rule_id=row.rule_id,
+        start_date=row.start_date.isoformat() if row.start_date else None,
+        end_date=row.end_date.isoformat() if row.end_date else None,
+        duration_type=row.duration_type.name if row.duration_type else None,
+        event_subtype=row.event_subtype.name if row.event_subtype else None,
+        provider=row.provider,
+        metadata_json=row.metadata_json,
+        created_at=row.created_at.isoformat() if row.created_at else None,
+    )
+
+
+def encode_cursor(start_date: date, event_id: int) -> str:
+    return f"{start_date.isoformat()}_{event_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        day, event_id = cursor.split("_", 1)
+        return date.fromisoformat(day), int(event_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def overlap_filter(start: Optional[date], end: Optional[date]):
+    clauses = []
+    if end is not None:
+        clauses.append(RuleEvent.start_date <= end)
+    if start is not None:
+        clauses.append(or_(RuleEvent.end_date >= start, and_(RuleEvent.end_date == None, RuleEvent.start_date >= start)))
+    return clauses
+
+
+def list_rule_events(
+    db: Session,
+    rule_pk: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    provider: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Events of one rule overlapping [start, end], ordered by (start_date, id).
+    With ``limit`` results are keyset-paginated: pass the returned cursor to get the next page.
+    """
+    q = select(*EVENT_COLUMNS).where(RuleEvent.rule_id == rule_pk)
+    if provider:
+        q = q.where(RuleEvent.provider == provider)
+    for clause in overlap_filter(start, end):
+        q = q.where(clause)
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        q = q.where(tuple_(RuleEvent.start_date, RuleEvent.id) > tuple_(after_date, after_id))
+    q = q.order_by(RuleEvent.start_date, RuleEvent.id)
+    if limit:
+        q = q.limit(limit + 1)
+
+    rows = db.execute(q).all()
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_date, rows[-1].id)
+    return [event_row_to_dict(r) for r in rows], next_cursor
+
+
+def active_events_on(db: Session, on: date, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Events whose interval contains ``on`` (point events match their start date)."""
+    q = (
+        select(*EVENT_COLUMNS, Rule.rule_id.label("rule_code"))
+        .join(Rule, Rule.id == RuleEvent.rule_id)
+        .where(RuleEvent.start_date <= on)
+        .where(or_(RuleEvent.end_date >= on, and_(RuleEvent.end_date == None, RuleEvent.start_date == on)))
+    )
+    if provider:
+        q = q.where(RuleEvent.provider == provider)
+    q = q.order_by(RuleEvent.start_date, RuleEvent.id)
+    return [dict(event_row_to_dict(r), rule_code=r.rule_code) for r in db.execute(q).all()]
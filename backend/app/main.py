@@ -1,5 +1,5 @@
 # app/main.py
-from app.core.db.db import Base, engine
+from app.core.db.db import Base, engine, SessionLocal, add_missing_columns
 from app.core.common.logger import LoggingMiddleware, setup_logger
 from app.core.common.config import settings
 
@@ -13,6 +13,17 @@ from app.api.routes_sectors_api import router as sectors_router
 from app.api.routes_ui_workbench import router as ui_router
 from app.api.routes_reference_api import router as ref_router
 from app.api.routes_rule_event import router as rule_event_router
+from app.api.routes_activity_api import router as activity_router
+from app.api.routes_signals_api import router as signals_router
+from app.api.routes_eval import router as eval_router
+from app.api.routes_correlation import router as correlation_router
+from app.api.routes_jobs_api import router as jobs_router
+from app.api.routes_export_api import router as export_router
+from app.api.routes_astro_api import router as astro_router
+from app.core.services.activity_index import activity_index
+from app.core.services.astro_calendar import astro_calendars
+from app.core.services import job_service
+from app.core.services.evaluation_service import shutdown_eval_pool
 
 # Setup logger
 logger = setup_logger(settings.log_level)
@@ -23,10 +34,24 @@ async def lifespan(app: FastAPI):
     # ✅ Startup: initialize database tables
     logger.info("Creating database schema...")
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables; add columns and indexes introduced after the table was created
+    for column in add_missing_columns(engine):
+        logger.info(f"Added column {column}")
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     logger.info("✅ Database schema ready.")
+    with SessionLocal() as session:
+        activity_index.load(session)
+        astro_calendars.load(session)
+        requeued = job_service.recover_jobs(session)
+        if requeued:
+            logger.info(f"Re-queued {requeued} background jobs.")
     yield
     # ✅ Shutdown: if any cleanup is needed later
     logger.info("Shutting down application.")
+    job_service.shutdown_pool()
+    shutdown_eval_pool()
 
 
 # ✅ Pass lifespan into FastAPI constructor
@@ -40,6 +65,13 @@ app.include_router(rules_router)
 app.include_router(ref_router)
 app.include_router(ui_router)
 app.include_router(rule_event_router)
+app.include_router(activity_router)
+app.include_router(signals_router)
+app.include_router(eval_router)
+app.include_router(correlation_router)
+app.include_router(jobs_router)
+app.include_router(export_router)
+app.include_router(astro_router)
 
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -0,0 +1,80 @@
+# app/tests/astro/test_aspect_matrix.py
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from app.core.astro.providers.cached_provider import CachedAstroProvider
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.enums import Relation
+from app.core.rules.relations.registry import get_relation_handler
+
+PLANETS = ["sun", "moon", "mars", "venus", "saturn"]
+INSTANTS = [datetime(2025, 1, 1) + timedelta(days=i) for i in range(60)]
+
+
+class CountingStub(StubProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def longitude(self, planet, when):
+        self.calls += 1
+        return super().longitude(planet, when)
+
+
+def test_handlers_read_the_matrix():
+    stub = CountingStub()
+    sky = CachedAstroProvider(stub)
+    matrix = sky.prime_aspects(INSTANTS, PLANETS)
+    assert matrix.distances.shape == (len(INSTANTS), len(PLANETS), len(PLANETS))
+    primed = stub.calls
+
+    plain = StubProvider()
+    for relation in (Relation.conjunct_with, Relation.in_axis, Relation.square_with, Relation.trine_with,
+                     Relation.aspect_with, Relation.combust_by_sun):
+        handler = get_relation_handler(relation)
+        for planet in PLANETS:
+            for target in PLANETS:
+                cond = SimpleNamespace(planet=planet, target=target, orb=8.0, value=72.0)
+                for when in INSTANTS[::7]:
+                    assert handler.check(sky, cond, when, 5.0) == handler.check(plain, cond, when, 5.0)
+    assert stub.calls == primed
+
+
+def test_runs_match_daily_checks():
+    sky = CachedAstroProvider(StubProvider())
+    matrix = sky.prime_aspects(INSTANTS, PLANETS)
+    runs = matrix.runs({"square_with": 90.0, "sextile_with": 60.0}, 3.0)
+    assert runs
+
+    active = {(r["aspect"], r["planet"], r["target"], t) for r in runs for t in range(r["start"], r["end"] + 1)}
+    plain = StubProvider()
+    expected = set()
+    for aspect, angle in (("square_with", 90.0), ("sextile_with", 60.0)):
+        for i, planet in enumerate(sorted(PLANETS)):
+            for target in sorted(PLANETS)[i + 1:]:
+                for t, when in enumerate(INSTANTS):
+                    d = plain.angular_distance(plain.longitude(planet, when), plain.longitude(target, when))
+                    if abs(d - angle) <= 3.0:
+                        expected.add((aspect, planet, target, t))
+    assert active == expected
+    for r in runs:
+        assert r["start"] <= r["exact"] <= r["end"] and r["min_orb"] <= 3.0
+
+
+def test_aspect_grid_api(client):
+    resp = client.get("/api/astro/aspects", params={
+        "start_date": "2025-01-01", "end_date": "2025-03-01", "provider": "stub",
+        "planets": ["sun", "moon", "mars"], "aspects": ["square_with", "conjunct_with"], "orb": 2,
+    })
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == len(body["aspects"]) > 0
+    assert {a["aspect"] for a in body["aspects"]} <= {"square_with", "conjunct_with"}
+    first = body["aspects"][0]
+    assert first["start_date"] <= first["exact_date"] <= first["end_date"]
+    assert date.fromisoformat(first["start_date"]) >= date(2025, 1, 1)
+
+    resp = client.get("/api/astro/aspects", params={
+        "start_date": "2025-01-01", "end_date": "2025-01-10", "aspects": ["in_axis"],
+    })
+    assert resp.status_code == 400
@@ -0,0 +1,147 @@
+# app/tests/astro/test_ingress_calendar.py
+import math
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.core.astro.ingress_calendar import build_planet_calendar, to_seconds
+from app.core.astro.providers.cached_provider import CachedAstroProvider
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.enums import Relation
+from app.core.rules.relations.registry import get_relation_handler
+from app.core.services.astro_calendar import astro_calendars
+
+START, END = datetime(2025, 1, 1), datetime(2025, 7, 1)
+PLANETS = ["sun", "moon", "mars"]
+
+
+class CountingStub(StubProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def longitude(self, planet, when):
+        self.calls += 1
+        return super().longitude(planet, when)
+
+    def is_retrograde(self, planet, when):
+        self.calls += 1
+        return super().is_retrograde(planet, when)
+
+
+class OscillatingStub(StubProvider):
+    """Longitude swings +-10° around 100° with a 100-day period; retrograde while it decreases."""
+    PERIOD_S = 100 * 86400
+
+    def longitude(self, planet, when):
+        return 100.0 + 10.0 * math.sin(2 * math.pi * to_seconds(when) / self.PERIOD_S)
+
+    def is_retrograde(self, planet, when):
+        return math.cos(2 * math.pi * to_seconds(when) / self.PERIOD_S) < 0
+
+
+def _samples(n=300):
+    # the stub moves once a day at midnight; sample clear of the step itself
+    rng = random.Random(7)
+    days = (END - START).days
+    return [START + timedelta(days=rng.randrange(days), hours=rng.randrange(1, 24)) for _ in range(n)]
+
+
+def test_calendar_matches_direct_evaluation():
+    stub = StubProvider()
+    for planet in PLANETS:
+        cal = build_planet_calendar(stub, planet, START, END)
+        for when in _samples():
+            lon = stub.longitude(planet, when)
+            assert cal.state("sign", to_seconds(when)) == int((lon % 360) // 30)
+            assert cal.state("nakshatra", to_seconds(when)) == stub.nakshatra_index(lon)
+        assert cal.state("sign", to_seconds(END) + 10) is None
+
+
+def test_stations_are_bisected_to_the_second():
+    cal = build_planet_calendar(OscillatingStub(), "mars", START, END)
+    times, values = cal.tables["station"]
+    period = OscillatingStub.PERIOD_S
+    # cos changes sign at a quarter and three quarters of every period
+    expected = [k * period / 4 for k in range(4 * int(to_seconds(END) / period) + 2)
+                if k % 2 and to_seconds(START) < k * period / 4 < to_seconds(END)]
+    assert len(times) - 1 == len(expected)
+    for t, want in zip(times[1:], expected):
+        assert abs(t - want) <= 2
+    assert list(values[1:]) == [int(math.cos(2 * math.pi * (w + 60) / period) < 0) for w in expected]
+
+
+def test_handlers_read_the_calendar(db_session):
+    calendar = astro_calendars.build(db_session, "stub", START.date(), END.date(), planets=PLANETS)
+    assert calendar.covers(START, END)
+
+    stub = CountingStub()
+    sky = CachedAstroProvider(stub, calendar=calendar)
+    plain = StubProvider()
+    for relation, targets in (
+        (Relation.in_sign, ["aries", "leo", "pisces"]),
+        (Relation.in_nakshatra_owned_by, ["ketu", "venus", "moon"]),
+        (Relation.retrograde, [None]),
+    ):
+        handler = get_relation_handler(relation)
+        for planet in PLANETS:
+            for target in targets:
+                cond = SimpleNamespace(planet=planet, target=target, orb=None, value=None)
+                for when in _samples(40):
+                    assert handler.check(sky, cond, when, 5.0) == handler.check(plain, cond, when, 5.0)
+    assert stub.calls == 0
+
+    # outside the span the ephemeris answers
+    handler = get_relation_handler(Relation.in_sign)
+    cond = SimpleNamespace(planet="sun", target="aries", orb=None, value=None)
+    handler.check(sky, cond, datetime(2030, 1, 1, 12), 5.0)
+    assert stub.calls == 1
+
+
+def test_calendar_api(client):
+    resp = client.post("/api/astro/calendar", json={
+        "start_date": "2025-01-01", "end_date": "2025-03-31", "provider": "stub", "planets": ["moon", "mars"],
+    })
+    assert resp.status_code == 200
+    assert set(resp.json()["planets"]) >= {"moon", "mars"}
+
+    resp = client.get("/api/astro/calendar", params={
+        "start_date": "2025-02-01", "end_date": "2025-02-28", "provider": "stub",
+        "planets": ["moon"], "kinds": ["sign", "nakshatra"],
+    })
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == len(body["events"]) > 0
+    ats = [e["at"] for e in body["events"]]
+    assert ats == sorted(ats) and "2025-02-01" <= ats[0] and ats[-1] < "2025-03-01"
+    assert {e["kind"] for e in body["events"]} == {"sign", "nakshatra"}
+    assert all("owner" in e for e in body["events"] if e["kind"] == "nakshatra")
+
+    resp = client.get("/api/astro/calendar", params={
+        "start_date": "2024-01-01", "end_date": "2024-02-01", "provider": "stub"})
+    assert resp.status_code == 404
+    resp = client.get("/api/astro/calendar", params={
+        "start_date": "2025-02-01", "end_date": "2025-02-28", "provider": "stub", "kinds": ["eclipse"]})
+    assert resp.status_code == 400
+
+
+def test_generators_and_pool_workers_use_the_calendar(db_session, monkeypatch):
+    from app.core.analysis.event_generator import EventGeneratorService
+    from app.core.services import evaluation_service
+
+    monkeypatch.setenv("ASTRO_AYANAMSA_MODE", "lahiri")
+    try:
+        pool = evaluation_service._get_eval_pool("stub", 2)
+        calendar = astro_calendars.build(db_session, "stub", START.date(), END.date(), planets=["venus"])
+        # the calendar changed: workers are restarted with it
+        assert evaluation_service._get_eval_pool("stub", 2) is not pool
+        evaluation_service._init_eval_worker("stub", calendar)
+        assert evaluation_service._worker_sky.calendar is calendar
+    finally:
+        evaluation_service.shutdown_eval_pool()
+        evaluation_service._worker_sky = None
+
+    service = EventGeneratorService(db_session, astro_provider_name="stub")
+    assert service.astro.calendar is calendar
+    # batch workers have no session and get the calendar handed over
+    assert EventGeneratorService(None, astro_provider_name="stub", astro_calendar=calendar).astro.calendar is calendar
@@ -12,3 +12,19 @@ def test_yahoo_provider_instantiation():
 def test_csv_provider_instantiation(tmp_path):
     provider = get_market_provider("csv")
     assert isinstance(provider, IMarketDataProvider)
+
+def test_synthetic_provider_is_deterministic():
+    provider = get_market_provider("synthetic")
+    assert isinstance(provider, IMarketDataProvider)
+    full = provider.fetch_data("^SYN", start=date(2020, 1, 1), end=date(2020, 12, 31))
+    again = get_market_provider("synthetic").fetch_data("^SYN", start=date(2020, 6, 1), end=date(2021, 3, 31))
+
+    # business days only, positive prices, overlapping spans agree exactly
+    assert len(full) == 262
+    assert (full["Adj Close"] > 0).all()
+    assert full.index.dayofweek.max() < 5
+    overlap = full.loc["2020-06-01":"2020-12-31", "Adj Close"]
+    assert (overlap.values == again.loc["2020-06-01":"2020-12-31", "Adj Close"].values).all()
+
+    other = provider.fetch_data("^OTHER", start=date(2020, 1, 1), end=date(2020, 12, 31))
+    assert not (other["Adj Close"].values == full["Adj Close"].values).all()
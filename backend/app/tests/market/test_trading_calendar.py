@@ -0,0 +1,77 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.core.market.trading_calendar import TradingCalendar
+from app.core.analysis.event_generator import EventGeneratorService
+from app.core.analysis.forward_returns import ForwardReturnMatrix
+
+
+def test_weekday_calendar_with_holiday_file(tmp_path):
+    holidays = tmp_path / "holidays.txt"
+    holidays.write_text("# exchange holidays\n2025-01-01\n\n2025-01-06  # extra\n")
+    cal = TradingCalendar.from_holiday_file(str(holidays))
+
+    sessions = cal.sessions(date(2024, 12, 30), date(2025, 1, 7))
+    assert sessions == [date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 2),
+                        date(2025, 1, 3), date(2025, 1, 7)]
+    assert not cal.is_trading_day(date(2025, 1, 4))
+    assert cal.add_trading_days(date(2025, 1, 3), 1) == date(2025, 1, 7)
+
+
+def test_price_index_calendar_falls_back_to_weekdays():
+    idx = pd.DatetimeIndex(["2025-01-02", "2025-01-03", "2025-01-07"])
+    cal = TradingCalendar.from_price_index(pd.DataFrame({"Adj Close": [1.0, 2.0, 3.0]}, index=idx))
+
+    # 2025-01-06 missing from the index => not a session inside the covered span
+    assert not cal.is_trading_day(date(2025, 1, 6))
+    # outside the index span the weekday rule applies
+    assert cal.is_trading_day(date(2025, 1, 8))
+    assert list(EventGeneratorService._daterange(date(2025, 1, 2), date(2025, 1, 8), cal)) == [
+        date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 7), date(2025, 1, 8)]
+
+
+def test_calendar_day_horizons():
+    idx = pd.bdate_range("2025-01-06", periods=10)  # Mon..Fri, Mon..Fri
+    frm = ForwardReturnMatrix.from_prices(pd.DataFrame({"Adj Close": np.arange(1.0, 11.0)}, index=idx), 5)
+
+    # Friday + 1 trading day = Monday (row 5); Friday + 1 calendar day rolls to Monday as well
+    assert frm.lookup(frm.rows_for([date(2025, 1, 10)]), [1])[0, 0] == 6.0 / 5.0 - 1.0
+    assert frm.lookup_calendar_days([date(2025, 1, 10)], [1])[0, 0] == 6.0 / 5.0 - 1.0
+    # Monday + 5 trading days = next Monday; + 5 calendar days = Saturday -> next Monday too
+    assert frm.lookup(frm.rows_for([date(2025, 1, 6)]), [5])[0, 0] == 6.0 / 1.0 - 1.0
+    assert frm.lookup_calendar_days([date(2025, 1, 6)], [3])[0, 0] == 4.0 / 1.0 - 1.0
+
+
+def test_exchange_calendars_are_per_exchange_and_cached(tmp_path, monkeypatch):
+    from app.core.common.config import settings
+    from app.core.market import trading_calendar
+    from app.core.market.factories import provider_factory
+
+    class FakeProvider:
+        fetches = []
+
+        def data_version(self, ticker):
+            return "v1"
+
+        def fetch_data(self, ticker, start, end):
+            self.fetches.append(ticker)
+            return pd.DataFrame({"Adj Close": [1.0, 2.0]}, index=pd.DatetimeIndex(["2025-01-02", "2025-01-06"]))
+
+    holidays = tmp_path / "nse.txt"
+    holidays.write_text("2025-01-03\n")
+    monkeypatch.setattr(provider_factory, "get_market_provider", lambda name=None: FakeProvider())
+    monkeypatch.setattr(settings, "trading_holidays_file", None)
+    monkeypatch.setattr(settings, "exchange_holiday_files", {"NSE": str(holidays)})
+    trading_calendar._calendars.clear()
+
+    start, end = date(2025, 1, 2), date(2025, 1, 6)
+    assert trading_calendar.exchange_calendar("nse", start, end).sessions(start, end) == [
+        date(2025, 1, 2), date(2025, 1, 6)]
+    nyse = trading_calendar.exchange_calendar("NYSE", start, end)
+    assert nyse.sessions(start, end) == [date(2025, 1, 2), date(2025, 1, 6)]
+    assert trading_calendar.exchange_calendar("NYSE", start, end) is nyse
+    trading_calendar.exchange_calendar(None, start, end)
+    assert FakeProvider.fetches == ["^NYA", settings.default_sector_ticker]
+    trading_calendar._calendars.clear()
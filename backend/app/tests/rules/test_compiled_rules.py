@@ -0,0 +1,68 @@
+# app/tests/rules/test_compiled_rules.py
+from datetime import datetime
+
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.rules.engine.compiled_rules import CompiledRuleCache, compile_rule, compiled_rules
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+
+
+def _rule(rule_id="RCMP", target="aries"):
+    rule = Rule(rule_id=rule_id, name="compiled", enabled=True, confidence=0.8)
+    rule.conditions.append(Condition(planet="Sun", relation="in_sign", target=target))
+    rule.outcomes.append(Outcome(effect="Bullish", weight=2.0))
+    return rule
+
+
+def test_compiled_rule_evaluates_like_source_rule():
+    provider = StubProvider()
+    provider.set_longitude_map({"sun": 10.0})
+    engine = RulesEngineImpl(provider)
+    when = datetime(2025, 1, 1)
+
+    rule = _rule()
+    compiled = compile_rule(rule)
+    assert compiled.conditions[0].handler is not None
+    assert engine.evaluate_rule(compiled, when) == engine.evaluate_rule(rule, when)
+    assert engine.evaluate_rule(compiled, when)[0]["confidence"] == 0.8
+
+    unknown = _rule()
+    unknown.conditions[0].relation = "no_such_relation"
+    assert engine.evaluate_rule(unknown, when) == []
+
+
+def test_cache_loads_only_new_or_edited_rules(db_session):
+    cache = CompiledRuleCache()
+    db_session.add_all([_rule("RC_A"), _rule("RC_B")])
+    db_session.commit()
+
+    first = {r.rule_id: r for r in cache.load_enabled(db_session)}
+    second = {r.rule_id: r for r in cache.load_enabled(db_session)}
+    assert second["RC_A"] is first["RC_A"] and second["RC_B"] is first["RC_B"]
+
+    rule_b = db_session.query(Rule).filter(Rule.rule_id == "RC_B").one()
+    rule_b.conditions[0].target = "taurus"
+    rule_b.updated_at = datetime(2030, 1, 1)
+    db_session.commit()
+
+    third = {r.rule_id: r for r in cache.load_enabled(db_session)}
+    assert third["RC_A"] is first["RC_A"]
+    assert third["RC_B"].conditions[0].target == "taurus"
+
+
+def test_rule_update_route_invalidates_compiled_rule(client, db_session):
+    created = client.post("/api/rules/", json={
+        "rule_id": "RC_API", "name": "api rule",
+        "conditions": [{"planet": "Sun", "relation": "in_sign", "target": "aries"}],
+        "outcomes": [{"effect": "Bullish", "weight": 1.0}],
+    }).json()
+    before = compiled_rules.get(db_session.get(Rule, created["id"]))
+    assert before.conditions[0].target == "aries"
+
+    resp = client.put("/api/rules/RC_API", json={
+        "conditions": [{"planet": "Sun", "relation": "in_sign", "target": "leo"}],
+    })
+    assert resp.status_code == 200
+    after = compiled_rules.get(db_session.get(Rule, created["id"]))
+    assert after.conditions[0].target == "leo"
+    assert after.updated_at != before.updated_at
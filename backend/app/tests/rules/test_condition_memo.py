@@ -0,0 +1,66 @@
+# app/tests/rules/test_condition_memo.py
+from datetime import date, datetime
+
+from app.core.analysis.event_generator import EventGeneratorService
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.rules.engine.compiled_rules import compile_rule
+from app.core.rules.engine.condition_memo import shared_condition_keys
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+
+
+class CountingProvider(StubProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def longitude(self, planet, when):
+        self.calls += 1
+        return super().longitude(planet, when)
+
+
+def _rule(pk, rule_id, conditions):
+    rule = Rule(id=pk, rule_id=rule_id, name=rule_id, enabled=True, confidence=1.0)
+    for planet, relation, target in conditions:
+        rule.conditions.append(Condition(planet=planet, relation=relation, target=target))
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    return compile_rule(rule)
+
+
+SHARED = ("Moon", "in_nakshatra_owned_by", "Ketu")
+RULES = [
+    _rule(1, "RM1", [SHARED]),
+    _rule(2, "RM2", [("moon", "in_nakshatra_owned_by", "ketu")]),   # same canonical condition
+    _rule(3, "RM3", [SHARED, ("Sun", "in_sign", "aries")]),
+]
+
+
+def test_shared_condition_keys_are_canonical():
+    assert shared_condition_keys(RULES) == {RULES[0].conditions[0].key}
+
+
+def test_evaluate_rules_checks_each_condition_once_per_instant():
+    when = datetime(2025, 1, 1)
+    separate, shared = CountingProvider(), CountingProvider()
+
+    expected = [e for r in RULES for e in RulesEngineImpl(separate).evaluate_rule(r, when)]
+    assert RulesEngineImpl(shared).evaluate_rules(RULES, when) == expected
+    assert shared.calls < separate.calls
+
+
+def test_event_generator_reuses_shared_conditions_across_rules():
+    start, end = date(2025, 1, 1), date(2025, 3, 31)
+
+    plain = EventGeneratorService(None, astro_provider_name="stub", exchange="UTC")
+    plain.rules_engine = RulesEngineImpl(CountingProvider())
+    expected = [plain.detect_events(r, start, end) for r in RULES]
+
+    shared = EventGeneratorService(None, astro_provider_name="stub", exchange="UTC")
+    shared.rules_engine = RulesEngineImpl(CountingProvider())
+    assert shared.share_conditions(RULES, start, end) == 1
+    assert [shared.detect_events(r, start, end) for r in RULES] == expected
+    assert any(expected)
+    assert shared.rules_engine.provider.calls < plain.rules_engine.provider.calls
+
+    # a different range does not read the memo
+    shared.detect_events(RULES[0], start, date(2025, 2, 1))
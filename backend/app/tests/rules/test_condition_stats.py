@@ -0,0 +1,82 @@
+# app/tests/rules/test_condition_stats.py
+from datetime import datetime, timedelta
+
+from app.core.astro.providers.skyfield_provider import SkyfieldProvider
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.rules.engine.compiled_rules import compile_rule
+from app.core.rules.engine.condition_stats import ConditionStats
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+from app.core.rules.relations.retrograde_handler import RetrogradeHandler
+from app.core.rules.relations.sign_handler import SignHandler
+from app.core.rules.relations.conjunction_handler import ConjunctionHandler
+
+
+def _rule(*conditions):
+    rule = Rule(id=7, rule_id="RSEL", name="selectivity", enabled=True, confidence=1.0)
+    for planet, relation, target in conditions:
+        rule.conditions.append(Condition(planet=planet, relation=relation, target=target))
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    return compile_rule(rule)
+
+
+def test_a_priori_costs():
+    assert SignHandler().cost(StubProvider()) == 1
+    assert ConjunctionHandler().cost(StubProvider()) == 2
+    assert RetrogradeHandler().cost(StubProvider()) == 1
+    assert RetrogradeHandler().cost(SkyfieldProvider.__new__(SkyfieldProvider)) == 2
+
+    # before any measurements the cheaper condition goes first
+    rule = _rule(("sun", "conjunct_with", "moon"), ("sun", "in_sign", "aries"))
+    assert [c.relation.name for c in ConditionStats().order(rule)] == ["in_sign", "conjunct_with"]
+
+
+def test_selective_condition_moves_first_without_changing_results():
+    provider = StubProvider()
+    provider.set_longitude_map({"sun": 10.0, "moon": 130.0})   # sun in aries, moon in leo
+    rule = _rule(("sun", "in_sign", "aries"), ("moon", "in_sign", "taurus"))  # second always fails
+
+    stats = ConditionStats(min_samples=10_000, reorder_every=10)
+    engine = RulesEngineImpl(provider, stats=stats)
+    plain = RulesEngineImpl(provider)
+    plain.stats = None  # stored order, no statistics
+
+    start = datetime(2025, 1, 1)
+    for i in range(50):
+        when = start + timedelta(days=i)
+        assert engine.evaluate_rule(rule, when) == plain.evaluate_rule(rule, when) == []
+
+    assert stats.order(rule, provider)[0].target == "taurus"
+    by_target = {s["target"]: s for s in stats.snapshot()}
+    assert by_target["taurus"]["checks"] == 50
+    assert by_target["taurus"]["pass_rate"] == 0.0
+    # the always-true condition stopped being checked once the order flipped
+    assert by_target["aries"]["checks"] < 50
+
+
+def test_condition_stats_endpoint(client):
+    resp = client.get("/evaluate/condition_stats")
+    assert resp.status_code == 200
+    assert "conditions" in resp.json()
+    assert client.delete("/evaluate/condition_stats").json() == {"reset": True}
+
+
+def test_order_cache_is_bounded_and_skips_transient_rules(monkeypatch):
+    from app.core.rules.engine import condition_stats as module
+
+    monkeypatch.setattr(module, "MAX_CACHED_ORDERS", 3)
+    stats = ConditionStats()
+    rule = _rule(("sun", "conjunct_with", "moon"), ("sun", "in_sign", "aries"))
+    for version in range(5):
+        stats.order(compile_rule(Rule(id=7, rule_id="RSEL", updated_at=datetime(2025, 1, 1 + version),
+                                      conditions=[Condition(planet="sun", relation="in_sign", target="aries"),
+                                                  Condition(planet="moon", relation="in_sign", target="leo")])))
+    assert len(stats._orders) == 3
+
+    # transient rules sharing a code: each ranked on its own conditions, nothing cached
+    transient = [_rule(("sun", "conjunct_with", "moon"), ("sun", "in_sign", target)) for target in ("aries", "leo")]
+    for t in transient:
+        object.__setattr__(t, "id", None)
+        assert stats.order(t)[0].target == t.conditions[1].target
+    assert len(stats._orders) == 3
+    assert stats.order(rule)[0].relation.name == "in_sign"
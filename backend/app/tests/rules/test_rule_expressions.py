@@ -0,0 +1,91 @@
+# app/tests/rules/test_rule_expressions.py
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.core.analysis.event_generator import EventGeneratorService
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Outcome
+from app.core.rules.engine.compiled_rules import compile_expression, compile_rule
+from app.core.rules.engine.expression import evaluate_packed, pack, unpack
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+
+
+def leaf(planet, relation, target=None, **kw):
+    return {"planet": planet, "relation": relation, "target": target, **kw}
+
+
+# (moon in an odd sign OR mars in a fire sign) AND NOT sun in capricorn
+EXPRESSION = {"op": "and", "args": [
+    {"op": "or", "args": [
+        {"op": "or", "args": [leaf("moon", "in_sign", s) for s in ("aries", "gemini", "leo")]},
+        {"op": "or", "args": [leaf("mars", "in_sign", s) for s in ("aries", "leo", "sagittarius")]},
+    ]},
+    {"op": "not", "args": [leaf("sun", "in_sign", "capricorn")]},
+]}
+
+
+def _rule(expression=EXPRESSION):
+    rule = Rule(id=11, rule_id="REXP", name="expression", enabled=True, confidence=1.0, expression=expression)
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    return compile_rule(rule)
+
+
+def test_expression_at_one_instant():
+    provider = StubProvider()
+    engine = RulesEngineImpl(provider)
+    when = datetime(2025, 1, 1)
+
+    provider.set_longitude_map({"sun": 100.0, "moon": 45.0, "mars": 250.0})   # moon taurus, mars sagittarius
+    assert len(engine.evaluate_rule(_rule(), when)) == 1
+    provider.set_longitude_map({"sun": 280.0, "moon": 5.0, "mars": 250.0})    # sun capricorn → NOT fails
+    assert engine.evaluate_rule(_rule(), when) == []
+    provider.set_longitude_map({"sun": 100.0, "moon": 45.0, "mars": 40.0})    # neither alternative
+    assert engine.evaluate_rule(_rule(), when) == []
+
+
+def test_packed_not_leaves_padding_clear():
+    n = 11
+    node = compile_expression({"op": "not", "args": [leaf("sun", "in_sign", "aries")]})
+    valid = pack(np.ones(n, dtype=bool))
+    out = evaluate_packed(node, lambda cond: pack(np.zeros(n, dtype=bool)), valid)
+    assert unpack(out, n).all()
+    assert np.unpackbits(out).sum() == n
+
+
+def test_bitmask_range_matches_per_instant_evaluation():
+    start, end = date(2025, 1, 1), date(2025, 12, 31)
+    generator = EventGeneratorService(None, astro_provider_name="stub", exchange="UTC")
+    rule = _rule()
+    rows = generator.detect_events(rule, start, end)
+    assert rows
+
+    engine = RulesEngineImpl(StubProvider())
+    expected, active_start, prev = [], None, None
+    day = start
+    while day <= end:
+        hit = bool(engine.evaluate_rule(rule, datetime(day.year, day.month, day.day)))
+        if hit and active_start is None:
+            active_start = day
+        if not hit and active_start is not None:
+            expected.append((active_start, prev))
+            active_start = None
+        prev = day
+        day += timedelta(days=1)
+    if active_start is not None:
+        expected.append((active_start, end))
+    assert [(r["start_date"], r["end_date"]) for r in rows] == expected
+
+
+def test_expression_crud_and_validation(client):
+    bad = client.post("/api/rules/", json={"rule_id": "REX_BAD", "name": "bad",
+                                           "expression": {"op": "not", "args": []}})
+    assert bad.status_code == 400
+
+    ok = client.post("/api/rules/", json={"rule_id": "REX_OK", "name": "ok", "expression": EXPRESSION})
+    assert ok.status_code == 200
+    stored = client.get("/api/rules/REX_OK").json()["expression"]
+    assert stored["op"] == "and" and stored["args"][1]["op"] == "not"
+
+    cleared = client.put("/api/rules/REX_OK", json={"expression": None})
+    assert cleared.status_code == 200 and cleared.json()["expression"] is None
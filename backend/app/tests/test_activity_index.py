@@ -0,0 +1,116 @@
+from datetime import date
+
+from app.core.db.models import Rule
+from app.core.db.models_analysis import RuleEvent, DurationType
+from app.core.services.activity_index import activity_index, bump_events_version
+
+
+def _seed(db):
+    r1 = Rule(rule_id="R-ACT-1", name="first", enabled=True)
+    r2 = Rule(rule_id="R-ACT-2", name="second", enabled=True)
+    db.add_all([r1, r2])
+    db.commit()
+    db.add_all([
+        RuleEvent(rule_id=r1.id, start_date=date(2025, 1, 1), end_date=date(2025, 3, 1),
+                  duration_type=DurationType.interval, provider="stub"),
+        RuleEvent(rule_id=r2.id, start_date=date(2025, 1, 10), end_date=date(2025, 1, 12),
+                  duration_type=DurationType.interval, provider="stub"),
+        RuleEvent(rule_id=r2.id, start_date=date(2025, 2, 1), end_date=None,
+                  duration_type=DurationType.point, provider="swisseph"),
+    ])
+    db.commit()
+    return r1, r2
+
+
+def test_activity_queries(client, db_session):
+    r1, r2 = _seed(db_session)
+    activity_index.load(db_session)
+
+    assert client.get("/api/activity/active", params={"on": "2025-01-11"}).json()["rules"] == ["R-ACT-1", "R-ACT-2"]
+    assert client.get("/api/activity/active", params={"on": "2025-01-20"}).json()["rules"] == ["R-ACT-1"]
+
+    between = client.get("/api/activity/between",
+                         params={"start_date": "2025-01-13", "end_date": "2025-02-01", "provider": "swisseph"}).json()
+    assert between["count"] == 1 and between["events"][0]["start_date"] == "2025-02-01"
+
+    nxt = client.get("/api/activity/next", params={"after": "2025-01-01"}).json()
+    assert nxt["date"] == "2025-01-10" and nxt["rules"] == ["R-ACT-2"]
+    assert client.get("/api/activity/next", params={"after": "2025-02-01"}).json()["date"] is None
+
+
+def test_incremental_updates(db_session):
+    r1, r2 = _seed(db_session)
+    activity_index.load(db_session)
+
+    evt = RuleEvent(rule_id=r1.id, start_date=date(2025, 4, 1), end_date=date(2025, 4, 3),
+                    duration_type=DurationType.interval, provider="stub")
+    db_session.add(evt)
+    db_session.commit()
+    activity_index.add_events([evt], rule_code="R-ACT-1")
+    assert [r["rule_id"] for r in activity_index.active_on(date(2025, 4, 2))] == ["R-ACT-1"]
+
+    assert activity_index.remove_rule_events(r2.id) == 2
+    assert activity_index.active_on(date(2025, 1, 11))[0]["rule_id"] == "R-ACT-1"
+    assert len(activity_index.active_on(date(2025, 1, 11))) == 1
+
+
+def test_refresh_picks_up_out_of_process_writes(client, db_session):
+    r1, r2 = _seed(db_session)
+    activity_index.load(db_session)
+    # written behind the index's back, as a generation job in a worker process would
+    db_session.add(RuleEvent(rule_id=r2.id, start_date=date(2025, 5, 1), end_date=date(2025, 5, 3),
+                             duration_type=DurationType.interval, provider="stub"))
+    bump_events_version(db_session)
+    db_session.commit()
+    assert client.get("/api/activity/active", params={"on": "2025-05-02"}).json()["rules"] == ["R-ACT-2"]
+
+    # an in-place extension changes neither the row count nor the ids
+    evt = db_session.query(RuleEvent).filter(RuleEvent.start_date == date(2025, 5, 1)).one()
+    evt.end_date = date(2025, 5, 20)
+    bump_events_version(db_session)
+    db_session.commit()
+    assert client.get("/api/activity/active", params={"on": "2025-05-10"}).json()["rules"] == ["R-ACT-2"]
+
+
+def test_own_writes_advance_the_stamp(db_session, monkeypatch):
+    r1, r2 = _seed(db_session)
+    activity_index.load(db_session)
+    evt = RuleEvent(rule_id=r1.id, start_date=date(2025, 6, 1), end_date=date(2025, 6, 3),
+                    duration_type=DurationType.interval, provider="stub")
+    db_session.add(evt)
+    version = bump_events_version(db_session)
+    db_session.commit()
+    with activity_index.writing(version) as current:
+        assert current
+        activity_index.add_events([evt], rule_code="R-ACT-1")
+
+    reloads = []
+    monkeypatch.setattr(activity_index, "load", lambda db: reloads.append(db))
+    activity_index.refresh(db_session)
+    assert reloads == []
+
+    # a write from elsewhere in between: the index is left for refresh to reload
+    bump_events_version(db_session)
+    version = bump_events_version(db_session)
+    db_session.commit()
+    with activity_index.writing(version) as current:
+        assert not current
+    activity_index.refresh(db_session)
+    assert reloads == [db_session]
+
+
+def test_long_interval_only_widens_its_bucket(db_session):
+    r1, r2 = _seed(db_session)
+    activity_index.load(db_session)
+    long_evt = RuleEvent(rule_id=r2.id, start_date=date(1990, 1, 1), end_date=date(2030, 1, 1),
+                         duration_type=DurationType.interval, provider="stub")
+    db_session.add(long_evt)
+    db_session.commit()
+    activity_index.add_events([long_evt], rule_code="R-ACT-2")
+    assert {r["rule_id"] for r in activity_index.active_on(date(2025, 1, 11))} == {"R-ACT-1", "R-ACT-2"}
+    # the short intervals' bucket still scans a 2-day window
+    assert activity_index._buckets[(2).bit_length()].max_length == 2
+
+    activity_index.remove_event_ids([long_evt.id])
+    assert max(b.max_length for b in activity_index._buckets.values()) == (date(2025, 3, 1) - date(2025, 1, 1)).days
+    assert len(activity_index) == 3
@@ -0,0 +1,78 @@
+import io
+from datetime import date, datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.analysis import columnar_export, correlation_analyzer
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.db.models_analysis import RuleEvent, DurationType
+from app.core.market.providers.synthetic_provider import SyntheticMarketDataProvider
+from app.core.services import evaluation_service
+
+
+def _read_arrow(payload: bytes) -> pa.Table:
+    return pa.ipc.open_stream(payload).read_all()
+
+
+def test_evaluate_export_matches_json(client, monkeypatch):
+    rule = Rule(id=1, rule_id="R-ARROW", name="always", enabled=True, confidence=0.5, updated_at=datetime(2025, 1, 1),
+                conditions=[Condition(planet="sun", relation="conjunct_with", target="sun", orb=1.0)],
+                outcomes=[Outcome(effect="Bullish", weight=2.0)])
+    monkeypatch.setattr(evaluation_service, "_load_enabled_rules", lambda: [rule])
+    monkeypatch.setattr(evaluation_service, "get_astro_provider", lambda name=None: StubProvider())
+    body = {"start_date": "2025-01-01", "end_date": "2025-03-31", "exchanges": ["NSE", "NYSE"]}
+
+    res = client.post("/export/evaluate", json=body)
+    assert res.status_code == 200 and res.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = _read_arrow(res.content)
+    assert table.num_rows == 180
+    df = table.to_pandas()
+    assert set(df["exchange"]) == {"NSE", "NYSE"} and (df["confidence"] == 0.5).all()
+    assert df["date"].iloc[0] == date(2025, 1, 1)
+
+    parquet = client.post("/export/evaluate", params={"format": "parquet"}, json=body)
+    assert pq.read_table(io.BytesIO(parquet.content)).num_rows == 180
+    assert client.post("/export/evaluate", params={"format": "csv"}, json=body).status_code == 400
+
+
+def test_rule_events_export(client, db_session):
+    rule = Rule(rule_id="R-ARROW-2", name="persisted", enabled=True)
+    db_session.add(rule)
+    db_session.commit()
+    db_session.add_all([
+        RuleEvent(rule_id=rule.id, start_date=date(2025, 1, 1), end_date=date(2025, 1, 4),
+                  duration_type=DurationType.interval, provider="stub", metadata_json={"k": 1}),
+        RuleEvent(rule_id=rule.id, start_date=date(2025, 2, 1), end_date=None,
+                  duration_type=DurationType.point, provider="stub"),
+    ])
+    db_session.commit()
+
+    table = _read_arrow(client.get("/export/rule_events", params={"rule_id": "R-ARROW-2"}).content)
+    assert table.column("start_date").to_pylist() == [date(2025, 1, 1), date(2025, 2, 1)]
+    assert table.column("end_date").to_pylist() == [date(2025, 1, 4), None]
+    assert table.column("duration_type").to_pylist() == ["interval", "point"]
+    assert client.get("/export/rule_events", params={"rule_id": "NOPE"}).status_code == 404
+    assert columnar_export.rule_events_table(db_session, start=date(2025, 3, 1)).num_rows == 0
+
+
+def test_correlation_records_match_analyzer(monkeypatch):
+    monkeypatch.setattr(correlation_analyzer, "get_market_provider", lambda t=None: SyntheticMarketDataProvider(seed=3))
+    rng = np.random.default_rng(0)
+    events = [
+        {"rule_id": f"R{rng.integers(3)}", "name": "n", "date": f"2021-{rng.integers(1, 13):02d}-{rng.integers(1, 29):02d}",
+         "effect": "Bullish" if rng.random() < 0.5 else "Bearish", "weight": 1.0, "confidence": 0.8}
+        for _ in range(200)
+    ]
+    result = correlation_analyzer.analyze_correlation(events, "SYN", [1, 5])
+    arrays = correlation_analyzer.compute_correlation_arrays(events, "SYN", [1, 5])
+    table = columnar_export.correlation_records_table(arrays)
+
+    expected = [dict(rec, rule_id=rid) for rid, data in result["per_rule"].items() for rec in data["records"]]
+    got = table.to_pylist()
+    assert len(got) == len(expected) == 200
+    for g, e in zip(got, expected):
+        assert g["rule_id"] == e["rule_id"] and g["entry_date"] == e["entry_date"]
+        assert g["direction"] == e["direction"] and g["dir_ret_5d"] == e["dir_ret_5d"]
@@ -0,0 +1,116 @@
+# app/tests/test_composite_rules.py
+from datetime import date
+
+from sqlalchemy import select
+
+from app.core.analysis.composite_rules import CompositeEvaluator, composite_cache
+from app.core.analysis.event_generator import EventGeneratorService
+from app.core.analysis.interval_algebra import IntervalSet
+from app.core.db.models import Rule, Outcome
+from app.core.db.models_analysis import RuleEvent, DurationType, EventSubtype
+
+D = date(2025, 1, 1).toordinal()
+
+
+def _days(*pairs):
+    return IntervalSet([D + s for s, _ in pairs], [D + e for _, e in pairs])
+
+
+def test_interval_algebra():
+    a = _days((0, 4), (10, 12))
+    b = _days((3, 11), (20, 20))
+    assert _days((0, 1), (2, 3)) == _days((0, 3))          # adjacent days merge
+    assert IntervalSet.intersect([a, b]) == _days((3, 4), (10, 11))
+    assert IntervalSet.union([a, b]) == _days((0, 12), (20, 20))
+    assert a.complement(D, D + 15) == _days((5, 9), (13, 15))
+    assert a.widen(after=2).clip(D + 1, D + 13) == _days((1, 6), (10, 13))
+    assert IntervalSet.intersect([a, IntervalSet()]) == IntervalSet()
+    assert a.days == 8 and a.contains(date(2025, 1, 11)) and not a.contains(date(2025, 1, 6))
+
+
+def _rule(db, code, composite=None):
+    rule = Rule(rule_id=code, name=code, enabled=True, confidence=1.0, composite=composite)
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    db.add(rule)
+    db.flush()
+    return rule
+
+
+def _event(db, rule, start, end):
+    db.add(RuleEvent(rule_id=rule.id, start_date=start, end_date=end, provider="stub",
+                     duration_type=DurationType.interval, event_subtype=EventSubtype.period))
+
+
+COMPOSITE = {"op": "and", "args": [{"rule": "RC1"}, {"rule": "RC2", "started_within": 3}]}
+
+
+def test_composite_from_persisted_events_is_cached(db_session):
+    db = db_session
+    composite_cache.clear()
+    r1, r2 = _rule(db, "RC1"), _rule(db, "RC2")
+    _event(db, r1, date(2025, 1, 1), date(2025, 1, 20))
+    _event(db, r2, date(2025, 1, 5), date(2025, 1, 6))
+    _event(db, r2, date(2025, 1, 18), date(2025, 1, 25))
+    db.commit()
+
+    evaluator = CompositeEvaluator(db, "stub")
+    start, end = date(2025, 1, 1), date(2025, 1, 31)
+    result = evaluator.evaluate(COMPOSITE, start, end)
+    assert result.to_dates() == [(date(2025, 1, 5), date(2025, 1, 8)), (date(2025, 1, 18), date(2025, 1, 20))]
+
+    misses = composite_cache.misses
+    assert evaluator.evaluate(COMPOSITE, start, end) == result
+    assert composite_cache.misses == misses  # answered from the cache
+
+    # shared branches are reused by a different composite
+    negated = {"op": "not", "args": [COMPOSITE]}
+    assert evaluator.evaluate(negated, start, end) == result.complement(start.toordinal(), end.toordinal())
+    assert composite_cache.misses == misses + 1
+
+    # new events of a referenced rule change its stamp
+    _event(db, r2, date(2025, 1, 12), date(2025, 1, 12))
+    db.commit()
+    assert (date(2025, 1, 12), date(2025, 1, 15)) in evaluator.evaluate(COMPOSITE, start, end).to_dates()
+
+
+def test_generate_for_composite_rule(db_session):
+    db = db_session
+    composite_cache.clear()
+    r1, r2 = _rule(db, "RC1"), _rule(db, "RC2")
+    _event(db, r1, date(2025, 2, 1), date(2025, 2, 10))
+    _event(db, r2, date(2025, 2, 8), date(2025, 2, 15))
+    combo = _rule(db, "RC3", {"op": "and", "args": [{"rule": "RC1"}, {"rule": "RC2"}]})
+    db.commit()
+
+    gen = EventGeneratorService(db, astro_provider_name="stub")
+    events = gen.generate_for_rule(combo.id, date(2025, 2, 1), date(2025, 2, 28))
+    assert [(e.start_date, e.end_date) for e in events] == [(date(2025, 2, 8), date(2025, 2, 10))]
+
+    # composites of composites read the generated events
+    top = _rule(db, "RC4", {"op": "and", "args": [{"rule": "RC3"}, {"op": "not", "args": [{"rule": "RC2"}]}]})
+    db.commit()
+    assert gen.generate_for_rule(top.id, date(2025, 2, 1), date(2025, 2, 28)) == []
+
+
+def test_composite_api_validation_and_preview(client, db_session):
+    composite_cache.clear()
+    r1 = _rule(db_session, "RC1")
+    _event(db_session, r1, date(2025, 3, 1), date(2025, 3, 3))
+    db_session.commit()
+
+    resp = client.post("/api/rules/", json={"rule_id": "RC9", "name": "bad", "composite": {"rule": "NOPE"}})
+    assert resp.status_code == 400
+
+    resp = client.post("/api/rules/", json={"rule_id": "RC5", "name": "c", "composite": {"rule": "RC1"}})
+    assert resp.status_code == 200
+    # RC1 -> RC5 -> RC1 would be a cycle
+    resp = client.put("/api/rules/RC1", json={"composite": {"rule": "RC5"}})
+    assert resp.status_code == 400
+    assert db_session.scalar(select(Rule.composite).where(Rule.rule_id == "RC5")) == {"rule": "RC1"}
+
+    resp = client.post("/api/rules/composite/evaluate", json={
+        "composite": {"op": "not", "args": [{"rule": "RC1"}]},
+        "start_date": "2025-03-01", "end_date": "2025-03-05", "provider": "stub",
+    })
+    assert resp.status_code == 200
+    assert resp.json()["intervals"] == [{"start_date": "2025-03-04", "end_date": "2025-03-05"}]
@@ -48,3 +48,31 @@ def test_analyze_correlation_basic(monkeypatch):
     # allow tiny floating-point rounding around zero
     assert rule_data[1]["avg_return"] > -1e-10
     assert result["aggregate"][1]["count"] == 2
+
+
+def test_analyze_correlation_detail_levels(monkeypatch):
+    import pytest
+    from app.core.market.providers.synthetic_provider import SyntheticMarketDataProvider
+
+    monkeypatch.setattr("app.core.analysis.correlation_analyzer.get_market_provider",
+                        lambda t=None: SyntheticMarketDataProvider(seed=7))
+    events = [
+        {"rule_id": "R001", "name": "r1", "date": f"2024-{m:02d}-{d:02d}", "effect": "Bullish"}
+        for m in range(1, 13) for d in (3, 10, 17, 24)
+    ]
+
+    full = analyze_correlation(events, ticker="SYN", lookahead_days=[1, 5])
+    summary = analyze_correlation(events, ticker="SYN", lookahead_days=[1, 5], detail="summary")
+    sample = analyze_correlation(events, ticker="SYN", lookahead_days=[1, 5], detail="sample", sample_size=5)
+
+    assert "records" not in summary["per_rule"]["R001"]
+    assert summary["per_rule"]["R001"]["stats"] == full["per_rule"]["R001"]["stats"]
+    assert summary["aggregate"] == full["aggregate"] and summary["per_rule"]["R001"]["count"] == 48
+
+    sampled = sample["per_rule"]["R001"]["records"]
+    assert len(sampled) == 5
+    assert sampled[0] == full["per_rule"]["R001"]["records"][0]
+    assert sampled[-1] == full["per_rule"]["R001"]["records"][-1]
+
+    with pytest.raises(ValueError):
+        analyze_correlation(events, ticker="SYN", detail="verbose")
@@ -0,0 +1,83 @@
+from app.core.common.config import settings
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.db.models_analysis import CorrelationCacheEntry
+from app.core.services import correlation_cache
+
+
+def _events(start_date, end_date, **kwargs):
+    return [
+        {"rule_id": "RC1", "name": "cache rule", "date": f"2024-03-{d:02d}", "effect": "Bullish",
+         "weight": 1.0, "confidence": 1.0}
+        for d in (4, 11, 18)
+    ]
+
+
+def test_correlation_run_is_served_from_cache(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "market_provider_type", "synthetic")
+    monkeypatch.setattr(settings, "correlation_cache_enabled", True)
+    calls = []
+
+    def fake_evaluate(start_date, end_date, **kwargs):
+        calls.append((start_date, end_date))
+        return _events(start_date, end_date)
+
+    monkeypatch.setattr("app.api.routes_correlation.evaluate_rules_for_range", fake_evaluate)
+
+    rule = Rule(rule_id="RC1", name="cache rule", enabled=True, confidence=1.0)
+    rule.conditions.append(Condition(planet="Jupiter", relation="in_sign", target="Taurus"))
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    db_session.add(rule)
+    db_session.commit()
+
+    body = {"start_date": "2024-03-01", "end_date": "2024-03-31", "ticker": "^SYN", "lookahead_days": [1, 5]}
+    first = client.post("/correlation/run", json=body)
+    assert first.status_code == 200, first.text
+    second = client.post("/correlation/run", json=body)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert len(calls) == 1
+
+    stats = client.get("/correlation/cache").json()
+    assert stats["entries"] == 1 and stats["hits"] == 1
+
+    # different horizons or a bypass → recomputed
+    client.post("/correlation/run", json={**body, "lookahead_days": [1]})
+    client.post("/correlation/run", json={**body, "use_cache": False})
+    assert len(calls) == 3
+
+    # editing a condition changes the rules fingerprint even though updated_at may not move
+    rule = db_session.query(Rule).filter(Rule.rule_id == "RC1").one()
+    rule.conditions[0].target = "Gemini"
+    db_session.commit()
+    client.post("/correlation/run", json=body)
+    assert len(calls) == 4
+
+    assert client.delete("/correlation/cache").json()["deleted"] == 3
+    assert client.get("/correlation/cache").json()["entries"] == 0
+
+
+def test_cache_key_tracks_market_data_version(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "market_provider_type", "synthetic")
+    params = {"start_date": "2024-01-01", "end_date": "2024-02-01", "ticker": "^SYN"}
+    key = correlation_cache.correlation_cache_key(db_session, params)
+    assert key == correlation_cache.correlation_cache_key(db_session, dict(params))
+
+    monkeypatch.setattr(settings, "synthetic_market_seed", settings.synthetic_market_seed + 1)
+    assert correlation_cache.correlation_cache_key(db_session, params) != key
+
+
+def test_cache_eviction_is_lru_and_bounded(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "correlation_cache_max_entries", 2)
+    result = {"ticker": "^SYN", "lookahead_days": [1], "per_rule": {}, "aggregate": {}}
+
+    correlation_cache.store_result(db_session, "a" * 64, "^SYN", result)
+    correlation_cache.store_result(db_session, "b" * 64, "^SYN", result)
+    assert correlation_cache.get_cached_result(db_session, "a" * 64) == result  # a is now most recent
+    correlation_cache.store_result(db_session, "c" * 64, "^SYN", result)
+
+    keys = {e.cache_key for e in db_session.query(CorrelationCacheEntry).all()}
+    assert keys == {"a" * 64, "c" * 64}
+
+    monkeypatch.setattr(settings, "correlation_cache_max_bytes", 0)
+    correlation_cache.store_result(db_session, "d" * 64, "^SYN", result)
+    assert db_session.query(CorrelationCacheEntry).count() == 0
@@ -0,0 +1,24 @@
+from sqlalchemy import text
+
+from app.core.db.db import create_db_engine
+
+
+def test_sqlite_engine_applies_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+        assert engine.pool.size() == 5
+    finally:
+        engine.dispose()
+
+
+def test_memory_sqlite_engine_skips_pool_sizing():
+    engine = create_db_engine("sqlite://")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        engine.dispose()
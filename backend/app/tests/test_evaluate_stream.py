@@ -0,0 +1,43 @@
+import gzip
+import json
+from datetime import datetime
+
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.common import serialization
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.services import evaluation_service
+
+
+def _always_rule():
+    rule = Rule(id=1, rule_id="R-STREAM", name="always", enabled=True, confidence=1.0,
+                updated_at=datetime(2025, 1, 1))
+    rule.conditions = [Condition(planet="sun", relation="conjunct_with", target="sun", orb=1.0)]
+    rule.outcomes = [Outcome(effect="Bullish", weight=1.0)]
+    return rule
+
+
+def test_ndjson_chunks_and_gzip():
+    records = [{"i": i, "when": datetime(2025, 1, 1)} for i in range(1000)]
+    chunks = list(serialization.iter_ndjson(records, flush_bytes=1024))
+    assert len(chunks) > 1
+    lines = b"".join(chunks).splitlines()
+    assert json.loads(lines[-1]) == {"i": 999, "when": "2025-01-01T00:00:00"}
+    assert gzip.decompress(b"".join(serialization.iter_ndjson(records, gzip=True))) == b"".join(chunks)
+
+
+def test_stream_matches_buffered_evaluation(client, monkeypatch):
+    monkeypatch.setattr(evaluation_service, "_load_enabled_rules", lambda: [_always_rule()])
+    monkeypatch.setattr(evaluation_service, "get_astro_provider", lambda name=None: StubProvider())
+    evaluation_service.clear_evaluation_cache()
+    body = {"start_date": "2025-01-01", "end_date": "2025-12-31", "exchange": "NSE"}
+
+    expected = evaluation_service.evaluate_rules_for_range(body["start_date"], body["end_date"], exchange="NSE")
+    res = client.post("/evaluate/stream", json=body)
+    assert res.status_code == 200 and res.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in res.text.splitlines()] == expected
+
+    zipped = client.post("/evaluate/stream", params={"gzip": "true"}, json=body)
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert len(zipped.text.splitlines()) == 365
+
+    assert client.post("/evaluate/stream", json={"start_date": "2025-02-01", "end_date": "2025-01-01"}).status_code == 400
@@ -2,6 +2,7 @@ from datetime import date
 
 import pytest
 from app.core.db.models import Rule, Condition, Outcome
+from app.core.db.models_analysis import RuleEvent
 from app.core.db.enums import Planet, Relation, OutcomeEffect
 from app.core.analysis.event_generator import EventGeneratorService
 from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
@@ -77,3 +78,30 @@ def test_event_generation_flow(db_session, monkeypatch):
     assert evt.end_date == date(2025, 1, 4)
     assert evt.duration_type.name == "interval"
     assert evt.metadata_json.get("note").startswith("event-generator-rule active")
+
+
+def test_aborted_overwrite_keeps_existing_events(db_session, monkeypatch):
+    """A run aborted from the progress callback (job cancel) must not lose the rule's events."""
+    db = db_session
+    rule = Rule(rule_id="R-EVT-2", name="abort-rule", enabled=True)
+    rule.conditions = [Condition(planet=Planet.mars.value, relation=Relation.in_axis.value,
+                                 target="Venus", orb=3.0, value=None)]
+    rule.outcomes = [Outcome(sector_id=None, effect=OutcomeEffect.Bullish.value, weight=1.0)]
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+
+    def fake_evaluate_rule(self, rule_obj, dt):
+        return (date(2025, 1, 2) <= dt <= date(2025, 1, 4)), {}
+
+    monkeypatch.setattr(RulesEngineImpl, "evaluate_rule", fake_evaluate_rule)
+    generator = EventGeneratorService(db_session=db, astro_provider_name="stub")
+    generator.generate_for_rule(rule.id, date(2025, 1, 1), date(2025, 1, 7), provider="stub")
+
+    def cancel(done, total):
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        generator.generate_for_rule(rule.id, date(2025, 1, 1), date(2025, 1, 7), provider="stub",
+                                    overwrite=True, progress=cancel)
+    assert db.query(RuleEvent).filter(RuleEvent.rule_id == rule.id).count() == 1
@@ -0,0 +1,144 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.core.astro.providers.cached_provider import CachedAstroProvider
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.market.exchanges import evaluation_instant, get_exchange
+from app.core.services import evaluation_service
+from app.core.common.config import settings
+
+
+class CountingStub(StubProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def longitude(self, planet, when):
+        self.calls += 1
+        return super().longitude(planet, when)
+
+
+def test_session_open_instants_in_utc():
+    assert evaluation_instant(date(2025, 1, 2), "NSE") == datetime(2025, 1, 2, 3, 45)
+    assert evaluation_instant(date(2025, 1, 2), "nyse") == datetime(2025, 1, 2, 14, 30)
+    # daylight saving time moves the UTC instant
+    assert evaluation_instant(date(2025, 7, 1), "NYSE") == datetime(2025, 7, 1, 13, 30)
+    assert evaluation_instant(date(2025, 1, 2)) == datetime(2025, 1, 2)
+    with pytest.raises(ValueError):
+        get_exchange("XXX")
+
+
+def test_cached_provider_primes_once():
+    stub = CountingStub()
+    sky = CachedAstroProvider(stub)
+    instants = [datetime(2025, 1, d) for d in range(1, 6)]
+    sky.prime(instants, ["sun", "Mars"])
+    calls = stub.calls
+    assert calls == 10
+    assert sky.longitude("mars", date(2025, 1, 3)) == stub.longitude("mars", datetime(2025, 1, 3))
+    assert sky.longitude("sun", instants[0]) == stub.longitude("sun", instants[0])
+    assert stub.calls == calls + 2  # only the two direct stub calls above
+
+
+def test_exchanges_share_instants_and_cache(monkeypatch):
+    rule = Rule(id=1, rule_id="R-EX", name="always", enabled=True, confidence=1.0,
+                updated_at=datetime(2025, 1, 1))
+    # sun is always within 180 degrees of itself
+    rule.conditions = [Condition(planet="sun", relation="conjunct_with", target="sun", orb=1.0)]
+    rule.outcomes = [Outcome(effect="Bullish", weight=1.0)]
+
+    stub = CountingStub()
+    monkeypatch.setattr(evaluation_service, "_load_enabled_rules", lambda: [rule])
+    monkeypatch.setattr(evaluation_service, "get_astro_provider", lambda name=None: stub)
+    evaluation_service.clear_evaluation_cache()
+
+    res = evaluation_service.evaluate_rules_for_exchanges("2025-01-01", "2025-01-03", ["NSE", "BSE", "NYSE"])
+    assert [len(res[ex]) for ex in ("NSE", "BSE", "NYSE")] == [3, 3, 3]
+    assert res["NSE"][0]["date"] == "2025-01-01" and res["NSE"][0]["exchange"] == "NSE"
+    # NSE and BSE open at the same instant -> 2 distinct instants per day, 1 planet
+    assert stub.calls == 6
+
+    again = evaluation_service.evaluate_rules_for_exchanges("2025-01-01", "2025-01-03", ["NYSE"])
+    assert again["NYSE"] == res["NYSE"]
+    assert stub.calls == 6
+
+
+def test_result_cache_key_and_size_bound(monkeypatch):
+    rule = Rule(id=1, rule_id="R-EX", name="always", enabled=True, confidence=1.0,
+                updated_at=datetime(2025, 1, 1))
+    rule.conditions = [Condition(planet="sun", relation="conjunct_with", target="sun", orb=1.0)]
+    rule.outcomes = [Outcome(effect="Bullish", weight=1.0)]
+    monkeypatch.setattr(evaluation_service, "_load_enabled_rules", lambda: [rule])
+    monkeypatch.setattr(evaluation_service, "get_astro_provider", lambda name=None: CountingStub())
+    evaluation_service.clear_evaluation_cache()
+
+    monkeypatch.setenv("ASTRO_AYANAMSA_MODE", "lahiri")
+    evaluation_service.evaluate_rules_for_range("2025-01-01", "2025-01-10")
+    # a different ayanamsa is a different sky: not served from the cache
+    monkeypatch.setenv("ASTRO_AYANAMSA_MODE", "raman")
+    evaluation_service.evaluate_rules_for_range("2025-01-01", "2025-01-10")
+    assert len(evaluation_service._exchange_results) == 2
+
+    # an edit that keeps updated_at still changes the key
+    rule.outcomes = [Outcome(effect="Bearish", weight=1.0)]
+    evaluation_service.compiled_rules.invalidate()
+    assert evaluation_service.evaluate_rules_for_range("2025-01-01", "2025-01-10")[0]["effect"] == "Bearish"
+
+    monkeypatch.setattr(settings, "eval_cache_max_events", 25)
+    evaluation_service.evaluate_rules_for_range("2025-02-01", "2025-02-20")
+    assert sum(len(v) for v in evaluation_service._exchange_results.values()) <= 25
+    evaluation_service.clear_evaluation_cache()
+
+
+def test_each_exchange_uses_its_own_sessions(monkeypatch):
+    from app.core.market.trading_calendar import TradingCalendar
+
+    rule = Rule(id=1, rule_id="R-EX", name="always", enabled=True, confidence=1.0,
+                updated_at=datetime(2025, 1, 1))
+    rule.conditions = [Condition(planet="sun", relation="conjunct_with", target="sun", orb=1.0)]
+    rule.outcomes = [Outcome(effect="Bullish", weight=1.0)]
+    monkeypatch.setattr(evaluation_service, "_load_enabled_rules", lambda: [rule])
+    monkeypatch.setattr(evaluation_service, "get_astro_provider", lambda name=None: CountingStub())
+    # NSE was shut on Jan 2, NYSE on Jan 3
+    sessions = {"NSE": [date(2025, 1, 1), date(2025, 1, 3)], "NYSE": [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 6)]}
+    calls = []
+
+    def fake_calendar(exchange, start, end, market_provider_type=None):
+        calls.append((exchange, start, end))
+        return TradingCalendar(sessions=sessions[exchange])
+
+    monkeypatch.setattr(evaluation_service, "exchange_calendar", fake_calendar)
+    evaluation_service.clear_evaluation_cache()
+    results = evaluation_service.evaluate_rules_for_exchanges(
+        "2025-01-01", "2025-01-03", ["NSE", "NYSE"], trading_days_only=True)
+    assert sorted(ex for ex, _s, _e in calls) == ["NSE", "NYSE"]
+    assert [e["date"] for e in results["NSE"]] == ["2025-01-01", "2025-01-03"]
+    assert [e["date"] for e in results["NYSE"]] == ["2025-01-01", "2025-01-02"]
+
+    streamed = evaluation_service.iter_evaluated_events(
+        "2025-01-01", "2025-01-03", trading_days_only=True, exchanges=["NSE", "NYSE"])
+    assert sorted((e["exchange"], e["date"]) for e in streamed) == sorted(
+        (ex, e["date"]) for ex, evs in results.items() for e in evs)
+    evaluation_service.clear_evaluation_cache()
+
+
+def test_result_cache_is_thread_safe(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(settings, "eval_cache_max_events", 200)
+    evaluation_service.clear_evaluation_cache()
+
+    def hammer(worker):
+        for i in range(2000):
+            key = ("NSE", (worker + i) % 40)
+            if evaluation_service._cached_results(key) is None:
+                evaluation_service._cache_results(key, [{}] * (i % 7))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(hammer, range(8)))
+    held = sum(len(v) for v in evaluation_service._exchange_results.values())
+    assert evaluation_service._cached_events == held <= 200
+    assert len(evaluation_service._exchange_results) <= evaluation_service.MAX_CACHED_EXCHANGE_RESULTS
+    evaluation_service.clear_evaluation_cache()
@@ -0,0 +1,77 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.core.analysis.forward_returns import (
+    ForwardReturnMatrix,
+    get_forward_return_matrix,
+    invalidate_forward_returns,
+)
+
+
+def _prices(start="2025-01-01", periods=10, step=0.01):
+    idx = pd.bdate_range(start=start, periods=periods)
+    return pd.DataFrame({"Adj Close": 100 * (1 + step) ** np.arange(periods)}, index=idx)
+
+
+def test_matrix_matches_row_offsets():
+    df = _prices()
+    frm = ForwardReturnMatrix.from_prices(df, max_horizon=5)
+
+    assert frm.matrix.shape == (10, 5)
+    # horizon h is h trading rows later, so a constant 1% step compounds
+    assert abs(frm.forward_return(date(2025, 1, 1), 1) - 0.01) < 1e-12
+    assert abs(frm.forward_return(date(2025, 1, 1), 3) - (1.01 ** 3 - 1)) < 1e-12
+    # weekend entry rolls forward to Monday's row
+    assert frm.rows_for([date(2025, 1, 4)])[0] == 3
+    # not enough rows left for the horizon
+    assert frm.forward_return(date(2025, 1, 13), 2) is None
+    # entry past end of series
+    assert frm.forward_return(date(2026, 1, 1), 1) is None
+
+
+def test_cache_reuses_and_invalidates_on_series_change():
+    invalidate_forward_returns()
+    df = _prices()
+    first = get_forward_return_matrix("^TEST", df, 3, provider_key="dummy")
+    assert get_forward_return_matrix("^TEST", df.copy(), 2, provider_key="dummy") is first
+
+    # longer horizon request rebuilds
+    longer = get_forward_return_matrix("^TEST", df, 5, provider_key="dummy")
+    assert longer is not first and longer.max_horizon == 5
+
+    # changed prices rebuild
+    changed = df.copy()
+    changed.iloc[-1, 0] = 1.0
+    assert get_forward_return_matrix("^TEST", changed, 5, provider_key="dummy") is not longer
+
+
+def test_full_series_matrix_reused_across_spans_until_version_changes():
+    from app.core.analysis.forward_returns import get_series_forward_returns
+    from app.core.market.providers.synthetic_provider import SyntheticMarketDataProvider
+
+    class VersionedSynthetic(SyntheticMarketDataProvider):
+        version = "v1"
+        fetches = 0
+
+        def fetch_data(self, ticker, start, end):
+            self.fetches += 1
+            return super().fetch_data(ticker, start, end)
+
+        def data_version(self, ticker):
+            return self.version
+
+    invalidate_forward_returns()
+    provider = VersionedSynthetic(seed=3)
+    first = get_series_forward_returns(provider, "^SYN", date(2010, 3, 1), 5, provider_key="synthetic")
+    # a different event span inside the fetched series is served from the same matrix
+    assert get_series_forward_returns(provider, "^SYN", date(1995, 6, 1), 3, provider_key="synthetic") is first
+    assert provider.fetches == 1
+    # slicing the full matrix matches a matrix built over the span alone
+    span = ForwardReturnMatrix.from_prices(provider.fetch_data("^SYN", date(2010, 1, 1), date(2010, 3, 1)), 5)
+    days = [date(2010, 1, 4), date(2010, 2, 1)]
+    np.testing.assert_allclose(first.lookup(first.rows_for(days), [1, 5]), span.lookup(span.rows_for(days), [1, 5]))
+
+    provider.version = "v2"
+    assert get_series_forward_returns(provider, "^SYN", date(2010, 3, 1), 5, provider_key="synthetic") is not first
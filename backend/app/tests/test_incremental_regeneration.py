@@ -0,0 +1,107 @@
+# app/tests/test_incremental_regeneration.py
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.core.analysis.event_generator import EventGeneratorService
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.db.models_analysis import RuleEvent
+
+START, END = date(2025, 1, 1), date(2025, 6, 30)
+
+
+def _spans(db, rule_pk):
+    return [(s, e) for s, e in db.execute(
+        select(RuleEvent.start_date, RuleEvent.end_date)
+        .where(RuleEvent.rule_id == rule_pk).order_by(RuleEvent.start_date)
+    ).all()]
+
+
+def _rule(db):
+    rule = Rule(rule_id="R-INC", name="incremental", enabled=True, confidence=1.0)
+    rule.conditions.append(Condition(planet="Moon", relation="in_nakshatra_owned_by", target="Ketu"))
+    rule.conditions.append(Condition(planet="Moon", relation="in_sign", target="Aries"))
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    db.add(rule)
+    db.commit()
+    return rule
+
+
+def test_edit_recomputes_only_the_changed_condition(db_session):
+    db = db_session
+    rule = _rule(db)
+    gen = EventGeneratorService(db, astro_provider_name="stub", exchange="UTC")
+    gen.generate_for_rule(rule.id, START, END)
+    before = _spans(db, rule.id)
+    assert before
+
+    # cold cache: both conditions evaluated, events already current
+    summary = gen.regenerate_incremental(rule.id, START, END)
+    assert summary["conditions_computed"] == 2
+    assert summary["unchanged"] == len(before)
+    assert summary["inserted"] == summary["updated"] == summary["deleted"] == 0
+
+    # edit one condition
+    rule.conditions[1].target = "Cancer"
+    rule.updated_at = datetime.utcnow()
+    db.commit()
+
+    summary = gen.regenerate_incremental(rule.id, START, END)
+    assert summary["conditions_computed"] == 1
+    assert summary["conditions_cached"] == 1
+
+    after = _spans(db, rule.id)
+    expected = [(r["start_date"], r["end_date"]) for r in gen.detect_events(rule, START, END)]
+    assert after == expected and after != before
+    assert summary["unchanged"] + summary["updated"] + summary["inserted"] == len(after)
+
+
+def test_update_rule_with_regenerate(client, db_session):
+    rule = _rule(db_session)
+    EventGeneratorService(db_session, astro_provider_name="stub", exchange="UTC").generate_for_rule(rule.id, START, END)
+
+    resp = client.put("/api/rules/R-INC", json={
+        "conditions": [
+            {"planet": "Moon", "relation": "in_nakshatra_owned_by", "target": "Ketu"},
+            {"planet": "Moon", "relation": "in_sign", "target": "Cancer"},
+        ],
+        "regenerate": {"start_date": START.isoformat(), "end_date": END.isoformat(),
+                       "provider": "stub", "exchange": "UTC"},
+    })
+    assert resp.status_code == 200
+    regenerated = resp.json()["regenerated"]
+    assert regenerated["rule_id"] == "R-INC"
+    assert regenerated["deleted"] + regenerated["updated"] + regenerated["inserted"] > 0
+
+
+def test_events_crossing_the_window_edges_are_kept(db_session):
+    db = db_session
+    rule = Rule(rule_id="R-EDGE", name="moon in aries", enabled=True, confidence=1.0)
+    rule.conditions.append(Condition(planet="Moon", relation="in_sign", target="Aries"))
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    db.add(rule)
+    db.commit()
+    gen = EventGeneratorService(db, astro_provider_name="stub", exchange="UTC")
+    gen.generate_for_rule(rule.id, START, END)
+    before = _spans(db, rule.id)
+    # a window cutting through the first and the last multi-day event
+    multi = [span for span in before if span[0] < span[1]]
+    first, last = multi[0], multi[-1]
+    lo, hi = first[1], last[0]
+    assert lo < hi
+
+    summary = gen.regenerate_incremental(rule.id, lo, hi)
+    assert _spans(db, rule.id) == before
+    assert summary["updated"] == summary["inserted"] == summary["deleted"] == 0
+
+    # after an edit the edge days no longer match (Libra is opposite Aries): the crossing
+    # events keep their days outside the window
+    rule.conditions[0].target = "Libra"
+    rule.updated_at = datetime.utcnow()
+    db.commit()
+    gen.regenerate_incremental(rule.id, lo, hi)
+    after = _spans(db, rule.id)
+    assert (first[0], date.fromordinal(lo.toordinal() - 1)) in after
+    assert (date.fromordinal(hi.toordinal() + 1), last[1]) in after
+    assert [span for span in after if span[1] < first[0] or span[0] > last[1]] == \
+        [span for span in before if span[1] < first[0] or span[0] > last[1]]
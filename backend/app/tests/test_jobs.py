@@ -0,0 +1,112 @@
+import zlib
+
+import pytest
+
+from app.core.common.config import settings
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.db.models_jobs import Job, JobStatus
+from app.core.services import job_service
+
+
+@pytest.fixture
+def inline_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "job_workers", 0)
+    monkeypatch.setattr(settings, "job_progress_interval", 0.0)
+
+
+def _rule(db):
+    rule = Rule(rule_id="R-JOB-1", name="job rule", enabled=True,
+                conditions=[Condition(planet="moon", relation="in_sign", target="Taurus", orb=1.0)],
+                outcomes=[Outcome(effect="Bullish", weight=1.0)])
+    db.add(rule)
+    db.commit()
+    return rule
+
+
+def test_generate_job_lifecycle(client, db_session, inline_jobs):
+    _rule(db_session)
+    body = {"rule_id": "R-JOB-1", "start_date": "2025-01-01", "end_date": "2025-03-31", "provider": "stub",
+            "exchange": "UTC"}
+    res = client.post("/jobs/generate_events", json=body)
+    assert res.status_code == 202
+    job = res.json()
+    assert job["created"] and job["status"] == "succeeded" and job["progress"] == 100.0
+    assert job["result_compressed_size"] <= job["result_size"]
+
+    # a finished job is not reused: resubmitting regenerates
+    again = client.post("/jobs/generate_events", json=body).json()
+    assert again["id"] != job["id"] and again["created"]
+
+    result = client.get(f"/jobs/{job['id']}/result").json()
+    assert result and all(e["provider"] == "stub" for e in result)
+    raw = client.get(f"/jobs/{job['id']}/result", headers={"Accept-Encoding": "identity"}).json()
+    assert raw == result
+
+    assert client.get(f"/jobs/{job['id']}/progress").json()["progress"] == 100.0
+    assert client.post(f"/jobs/{job['id']}/cancel").status_code == 409
+    assert client.post("/jobs/generate_events", json=dict(body, rule_id="NOPE")).status_code == 404
+
+
+def test_cancel_queued_and_running(client, db_session, inline_jobs):
+    queued = Job(id="q1", kind="evaluate", params_json={}, params_hash="x", status=JobStatus.queued)
+    db_session.add(queued)
+    db_session.commit()
+    assert client.post("/jobs/q1/cancel").json()["status"] == "cancelled"
+    assert client.get("/jobs/q1/result").status_code == 409
+
+    # a running job stops at its next progress report once cancelled
+    def runner(params, ctx):
+        ctx.report(10)
+        job_service.cancel_job(ctx.db, ctx.job_id)
+        ctx.report(20)
+        return {"unreachable": True}
+
+    job_service.JOB_RUNNERS["test_cancel"] = runner
+    try:
+        job, _ = job_service.submit_job(db_session, "test_cancel", {"n": 1})
+    finally:
+        del job_service.JOB_RUNNERS["test_cancel"]
+    assert job.status == JobStatus.cancelled and job.result_blob is None
+
+
+def test_identical_submission_folds_into_active_job(db_session, inline_jobs):
+    params = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+    digest = job_service.params_hash("evaluate", params)
+    db_session.add(Job(id="r1", kind="evaluate", params_json=params, params_hash=digest, status=JobStatus.running))
+    db_session.commit()
+
+    job, created = job_service.submit_job(db_session, "evaluate", params)
+    assert job.id == "r1" and not created
+
+
+@pytest.fixture
+def committed_session(test_engine):
+    """A plain session: failing jobs roll back, which would discard the transactional fixture's data."""
+    session = sessionmaker(bind=test_engine)()
+    yield session
+    session.execute(delete(Job))
+    session.commit()
+    session.close()
+
+
+def test_failed_job_and_compression(committed_session, inline_jobs):
+    def runner(params, ctx):
+        raise RuntimeError("boom")
+
+    job_service.JOB_RUNNERS["test_fail"] = runner
+    try:
+        job, _ = job_service.submit_job(committed_session, "test_fail", {})
+        # failed jobs are not reused
+        retry, created = job_service.submit_job(committed_session, "test_fail", {})
+    finally:
+        del job_service.JOB_RUNNERS["test_fail"]
+    assert job.status == JobStatus.failed and "boom" in job.error
+    assert created and retry.id != job.id
+
+    blob, size = job_service.compress_result({"events": [{"rule_id": "R1"}] * 1000})
+    assert len(blob) < size / 10
+    assert job_service.decompress_result(blob) == {"events": [{"rule_id": "R1"}] * 1000}
+    assert zlib.decompress(blob)
@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+from app.core.common.config import settings
+from app.core.db.models import Rule, Condition, Outcome, Sector
+from app.core.services import evaluation_service
+
+
+def _rules():
+    it = Sector(id=1, code="IT", name="Tech")
+    return [
+        Rule(id=1, rule_id="R-PAR-1", name="moon taurus", confidence=1.0,
+             conditions=[Condition(planet="moon", relation="in_sign", target="Taurus", orb=1.0)],
+             outcomes=[Outcome(effect="Bullish", weight=1.0, sector=it)]),
+        Rule(id=2, rule_id="R-PAR-2", name="mars aries", confidence=0.5,
+             conditions=[Condition(planet="mars", relation="in_sign", target="Aries", orb=1.0)],
+             outcomes=[Outcome(effect="Bearish", weight=2.0, sector=it)]),
+    ]
+
+
+def test_date_shards_are_contiguous_and_batch_aligned(monkeypatch):
+    monkeypatch.setattr(settings, "eval_min_days_per_shard", 300)
+    days = [date(2000, 1, 1) + timedelta(days=i) for i in range(3000)]
+    shards = evaluation_service._date_shards(days, 4)
+    assert [d for s in shards for d in s] == days
+    assert all(len(s) % evaluation_service.SKY_BATCH_DAYS == 0 for s in shards[:-1])
+    assert len(shards) == 6
+
+
+def test_parallel_matches_sequential(monkeypatch):
+    monkeypatch.setattr(settings, "provider_type", "stub")
+    monkeypatch.setattr(settings, "eval_workers", 2)
+    monkeypatch.setattr(settings, "eval_min_days_per_shard", 256)
+    days = [date(2020, 1, 1) + timedelta(days=i) for i in range(1200)]
+    rules = _rules()
+    progress = []
+    try:
+        parallel = evaluation_service._evaluate_days_parallel(
+            rules, days, ["UTC", "NSE"], progress=lambda done, total: progress.append((done, total))
+        )
+    finally:
+        evaluation_service.shutdown_eval_pool(wait=True)
+    sequential = evaluation_service._evaluate_days(rules, days, ["UTC", "NSE"])
+
+    assert parallel == sequential
+    assert parallel["NSE"] and [e["date"] for e in parallel["NSE"]] == sorted(e["date"] for e in parallel["NSE"])
+    assert progress[-1] == (1200, 1200) and len(progress) == 3
@@ -0,0 +1,65 @@
+# app/tests/test_parameter_sweep.py
+from datetime import date, datetime, timedelta
+
+from app.core.analysis.correlation_analyzer import analyze_correlation
+from app.core.analysis.parameter_sweep import run_sweep
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+
+START, END = date(2020, 1, 1), date(2021, 12, 31)
+HORIZONS = [1, 5]
+FIXED = [{"planet": "moon", "relation": "in_nakshatra_owned_by", "target": "ketu"}]
+
+
+def _per_day_stats(relation, target, orb, conditions=()):
+    """Reference: the same rule evaluated day by day and run through analyze_correlation."""
+    rule = Rule(rule_id="RSWEEP", name="sweep", enabled=True, confidence=1.0)
+    rule.conditions.append(Condition(planet="moon", relation=relation, target=target, orb=orb))
+    for c in conditions:
+        rule.conditions.append(Condition(**c))
+    rule.outcomes.append(Outcome(effect="Bullish", weight=1.0))
+    engine = RulesEngineImpl(StubProvider())
+    events = []
+    for i in range((END - START).days + 1):
+        day = START + timedelta(days=i)
+        events += engine.evaluate_rule(rule, datetime(day.year, day.month, day.day))
+    result = analyze_correlation(events, "SWEEP", HORIZONS, market_provider_type="synthetic", detail="summary")
+    return len(events), result["per_rule"].get("RSWEEP", {}).get("stats")
+
+
+def _sweep(template, grid, workers=1):
+    return run_sweep(template, grid, START, END, "SWEEP", horizons=HORIZONS, provider="stub",
+                     market_provider_type="synthetic", workers=workers)
+
+
+def test_angular_sweep_matches_per_day_correlation():
+    template = {"planet": "moon", "relation": "square_with", "effect": "Bullish", "conditions": FIXED}
+    result = _sweep(template, {"targets": ["sun", "mars"], "orbs": [2, 6]})
+    assert [(p["target"], p["orb"]) for p in result["points"]] == [("sun", 2), ("sun", 6), ("mars", 2), ("mars", 6)]
+    for point in result["points"]:
+        count, stats = _per_day_stats("square_with", point["target"], point["orb"], FIXED)
+        assert point["active_days"] == count
+        if count:
+            assert point["stats"] == stats
+    assert any(p["active_days"] for p in result["points"])
+
+
+def test_handler_relations_and_worker_processes():
+    template = {"planet": "moon", "relation": "in_sign", "effect": "Bullish"}
+    result = _sweep(template, {"targets": ["aries", "leo"]})
+    for point in result["points"]:
+        assert point["active_days"] == _per_day_stats("in_sign", point["target"], None)[0]
+
+    template = {"planet": "moon", "relation": "aspect_with", "target": "sun", "effect": "Bullish"}
+    grid = {"angles": [60, 90, 120], "orbs": [1, 3]}
+    assert _sweep(template, grid, workers=2)["points"] == _sweep(template, grid, workers=1)["points"]
+
+
+def test_sweep_api_rejects_bad_template(client):
+    resp = client.post("/correlation/sweep", json={
+        "template": {"planet": "moon", "relation": "conjunct_with", "target": "sun"},
+        "grid": {"angles": [10]},
+        "start_date": "2020-01-01", "end_date": "2020-02-01",
+    })
+    assert resp.status_code == 400
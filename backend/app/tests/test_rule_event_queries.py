@@ -0,0 +1,58 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from app.core.db.models import Rule
+from app.core.db.models_analysis import RuleEvent, DurationType
+
+
+def _seed(db):
+    rule = Rule(rule_id="R-Q-1", name="query-rule", enabled=True)
+    db.add(rule)
+    db.commit()
+    spans = [(date(2025, 1, d), date(2025, 1, d + 2)) for d in (1, 5, 9, 13, 17)]
+    for start, end in spans:
+        db.add(RuleEvent(rule_id=rule.id, start_date=start, end_date=end,
+                         duration_type=DurationType.interval, provider="stub"))
+    db.add(RuleEvent(rule_id=rule.id, start_date=date(2025, 1, 6), end_date=date(2025, 1, 6),
+                     duration_type=DurationType.point, provider="swisseph"))
+    db.commit()
+    return rule
+
+
+def test_keyset_pagination_and_filters(client, db_session):
+    _seed(db_session)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "provider": "stub"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/rules/R-Q-1/events/page", params=params).json()
+        seen.extend(e["start_date"] for e in page["events"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == ["2025-01-01", "2025-01-05", "2025-01-09", "2025-01-13", "2025-01-17"]
+
+    # overlap filter: 2025-01-07 .. 2025-01-10 touches the 5-7 and 9-11 intervals and the 6th point
+    rows = client.get("/api/rules/R-Q-1/events",
+                      params={"start_date": "2025-01-07", "end_date": "2025-01-10"}).json()
+    assert [r["start_date"] for r in rows] == ["2025-01-05", "2025-01-09"]
+
+    assert client.get("/api/rules/R-Q-1/events/page", params={"cursor": "bogus"}).status_code == 400
+    assert client.get("/api/rules/NOPE/events").status_code == 404
+
+
+def test_active_on_date_uses_interval_index(client, db_session):
+    _seed(db_session)
+
+    rows = client.get("/api/rules/events/active", params={"on": "2025-01-06"}).json()
+    assert sorted((r["start_date"], r["provider"]) for r in rows) == [
+        ("2025-01-05", "stub"), ("2025-01-06", "swisseph")]
+    assert rows[0]["rule_code"] == "R-Q-1"
+
+    plan = db_session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM rule_events WHERE start_date <= '2025-01-06' AND end_date >= '2025-01-06'"
+    )).all()
+    assert any("ix_rule_events_start_end" in str(row) for row in plan)
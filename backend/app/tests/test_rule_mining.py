@@ -0,0 +1,63 @@
+# app/tests/test_rule_mining.py
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.analysis.correlation_analyzer import analyze_correlation
+from app.core.analysis.rule_mining import mine_rules
+from app.core.astro.providers.stub_provider import StubProvider
+from app.core.db.models import Rule, Condition, Outcome
+from app.core.rules.engine.rules_engine_impl import RulesEngineImpl
+
+START, END = date(2020, 1, 1), date(2021, 12, 31)
+HORIZONS = [1, 5]
+
+
+def _mine(workers=1, **kwargs):
+    params = {"planets": ["sun", "moon", "mars"], "relations": ["in_sign", "square_with", "in_nakshatra_owned_by"],
+              "min_days": 5, "pair_pool": 20, "top": 500, **kwargs}
+    return mine_rules(START, END, "MINE", horizons=HORIZONS, provider="stub",
+                      market_provider_type="synthetic", workers=workers, **params)
+
+
+def _per_day_stats(conditions, effect):
+    rule = Rule(rule_id="RMINE", name="mined", enabled=True, confidence=1.0)
+    for c in conditions:
+        rule.conditions.append(Condition(**c))
+    rule.outcomes.append(Outcome(effect=effect, weight=1.0))
+    engine = RulesEngineImpl(StubProvider())
+    events = []
+    for i in range((END - START).days + 1):
+        day = START + timedelta(days=i)
+        events += engine.evaluate_rule(rule, datetime(day.year, day.month, day.day))
+    result = analyze_correlation(events, "MINE", HORIZONS, market_provider_type="synthetic", detail="summary")
+    return len(events), result["per_rule"]["RMINE"]["stats"]
+
+
+def test_mined_candidates_match_per_day_correlation():
+    result = _mine()
+    assert result["evaluated"] == result["singles"] + result["pairs"]
+    candidates = result["candidates"]
+    scores = [c["score"] for c in candidates]
+    assert scores == sorted(scores, reverse=True)
+
+    single = next(c for c in candidates if len(c["conditions"]) == 1)
+    pair = next(c for c in candidates if len(c["conditions"]) == 2)
+    for candidate in (single, pair):
+        count, stats = _per_day_stats(candidate["conditions"], candidate["effect"])
+        assert candidate["active_days"] == count
+        for h in HORIZONS:
+            mined, expected = candidate["stats"][h], stats[h]
+            assert mined["count"] == expected["count"]
+            assert mined["hit_rate"] == pytest.approx(expected["hit_rate"])
+            assert mined["avg_return"] == pytest.approx(expected["avg_return"])
+        assert candidate["stats"][HORIZONS[0]]["excess_return"] >= 0
+
+
+def test_worker_processes_and_validation(client):
+    assert _mine(workers=2, top=20, pair_pool=40)["candidates"] == _mine(workers=1, top=20, pair_pool=40)["candidates"]
+
+    resp = client.post("/correlation/mine", json={
+        "start_date": "2020-01-01", "end_date": "2020-03-01", "relations": ["levitating_over"],
+    })
+    assert resp.status_code == 400
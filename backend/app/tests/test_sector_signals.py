@@ -0,0 +1,61 @@
+from datetime import date
+
+from app.core.db.models import Rule, Outcome, Sector
+from app.core.db.models_analysis import RuleEvent, DurationType
+from app.core.analysis import signal_materializer
+
+
+def _seed(db):
+    it = Sector(code="IT", name="Tech")
+    bank = Sector(code="BANK", name="Banks")
+    db.add_all([it, bank])
+    db.commit()
+    r1 = Rule(rule_id="R-SIG-1", name="bull it", confidence=0.5, enabled=True,
+              outcomes=[Outcome(effect="Bullish", weight=2.0, sector_id=it.id)])
+    r2 = Rule(rule_id="R-SIG-2", name="bear it+bank", confidence=1.0, enabled=True,
+              outcomes=[Outcome(effect="Bearish", weight=1.0, sector_id=it.id),
+                        Outcome(effect="Bearish", weight=3.0, sector_id=bank.id)])
+    db.add_all([r1, r2])
+    db.commit()
+    db.add_all([
+        RuleEvent(rule_id=r1.id, start_date=date(2025, 1, 1), end_date=date(2025, 1, 5),
+                  duration_type=DurationType.interval, provider="stub"),
+        RuleEvent(rule_id=r2.id, start_date=date(2025, 1, 4), end_date=date(2025, 1, 8),
+                  duration_type=DurationType.interval, provider="stub"),
+        RuleEvent(rule_id=r2.id, start_date=date(2025, 1, 20), end_date=None,
+                  duration_type=DurationType.point, provider="stub"),
+    ])
+    db.commit()
+    return r1, r2
+
+
+def test_difference_array_sweep(db_session):
+    _seed(db_session)
+    rows = signal_materializer.compute_signals(db_session, date(2025, 1, 1), date(2025, 1, 31))
+    by_key = {(r["signal_date"], r["sector_code"]): r for r in rows}
+
+    assert by_key[(date(2025, 1, 2), "IT")]["score"] == 1.0
+    overlap = by_key[(date(2025, 1, 5), "IT")]
+    assert overlap["score"] == 0.0 and overlap["active_rules"] == 2
+    assert overlap["bullish"] == 1 and overlap["bearish"] == 1
+    assert by_key[(date(2025, 1, 8), "BANK")]["score"] == -3.0
+    assert (date(2025, 1, 9), "IT") not in by_key
+    assert by_key[(date(2025, 1, 20), "BANK")]["active_rules"] == 1
+
+    # a window clipping the intervals only sees the in-window days
+    clipped = signal_materializer.compute_signals(db_session, date(2025, 1, 7), date(2025, 1, 7))
+    assert sorted(r["sector_code"] for r in clipped) == ["BANK", "IT"]
+
+
+def test_refresh_and_endpoint(client, db_session):
+    r1, _ = _seed(db_session)
+    assert signal_materializer.refresh_signals(db_session, date(2025, 1, 1), date(2025, 1, 31)) == 15
+
+    res = client.get("/signals/", params={"start_date": "2025-01-04", "end_date": "2025-01-05", "sector": "IT"}).json()
+    assert res["count"] == 2 and all(s["conflicting"] for s in res["signals"])
+
+    # incremental: deleting a rule re-materializes only its span
+    client.delete("/api/rules/R-SIG-1")
+    res = client.get("/signals/", params={"start_date": "2025-01-01", "end_date": "2025-01-31", "sector": "IT"}).json()
+    assert [s["date"] for s in res["signals"]] == ["2025-01-04", "2025-01-05", "2025-01-06", "2025-01-07", "2025-01-08", "2025-01-20"]
+    assert all(s["score"] == -1.0 for s in res["signals"])